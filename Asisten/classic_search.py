@@ -28,7 +28,7 @@ class ClassicSearchEngine:
         try:
             conn = db.get_connection()
             query = """
-            SELECT t.nama, t.lokasi, u.teks_mentah 
+            SELECT t.id, t.nama, t.lokasi, u.teks_mentah 
             FROM ulasan u 
             JOIN tempat t ON u.tempat_id = t.id
             WHERE u.teks_mentah IS NOT NULL AND u.teks_mentah != ''
@@ -63,6 +63,7 @@ class ClassicSearchEngine:
                 
                 row = self.df.iloc[idx]
                 results.append({
+                    "ID Tempat": int(row['id']),
                     "Nama Tempat": row['nama'],
                     "Lokasi": row['lokasi'],
                     "Isi Ulasan": row['teks_mentah'],
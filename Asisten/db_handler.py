@@ -1,135 +1,426 @@
 import sqlite3
 import pandas as pd
 import os
+import sys
+import time
+import random
+import threading
 import json
+from collections import OrderedDict
 import hashlib
 from datetime import datetime
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DB_PATH = os.path.join(BASE_DIR, 'camping.db')
+SCRIPTS_DIR = os.path.join(BASE_DIR, 'scripts') # setup_db (migrasi) & rollup_analitik
+if SCRIPTS_DIR not in sys.path: sys.path.append(SCRIPTS_DIR)
+
+try:
+    from src.log_writer import BackgroundLogWriter, SqliteLogSink
+except ImportError:
+    sys.path.append(BASE_DIR)
+    from src.log_writer import BackgroundLogWriter, SqliteLogSink
+
+LOG_INSERT_SQL = """INSERT INTO riwayat 
+                   (waktu, query_user, query_bersih, intent, region, jumlah_hasil, hasil_teratas, durasi_detik) 
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)"""
+# Retensi riwayat (dijalankan sekali per hari oleh penulis log, memakai idx_riwayat_waktu).
+# Hanya baris yang sudah masuk rollup analitik (id <= high-water mark) yang boleh dihapus.
+LOG_RETENTION_SQL = """DELETE FROM riwayat WHERE waktu < ?
+                       AND id <= COALESCE((SELECT nilai FROM analitik_state WHERE nama = 'riwayat_id'), 0)"""
+
+# Pragma koneksi (WAL: pembaca tidak terblokir penulis; NORMAL aman di WAL & jauh lebih cepat dari FULL)
+DB_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-16000",      # ~16 MB page cache per koneksi
+    "PRAGMA mmap_size=268435456",    # 256 MB dibaca lewat mmap
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+)
+STATEMENT_CACHE = 256 # Statement yang sudah di-prepare dipakai ulang per koneksi (SQL harus identik)
+DETAIL_BATCH = 500    # Maks id per query IN (...) (di bawah batas variabel SQLite)
+DETAIL_CACHE_SIZE = 2048 # Maks tempat di cache detail (LRU, dibagi semua thread/sesi di proses ini)
+DETAIL_TABLES = ("tempat", "harga", "fasilitas") # Versi gabungan tabel-tabel ini menandai isi cache
+ADMIN_PAGE_SIZE = 20  # Pesanan per halaman dashboard admin
+WRITE_RETRIES = 6     # Percobaan ulang transaksi tulis saat database sibuk (SQLITE_BUSY / locked)
+WRITE_BACKOFF = 0.02  # Detik, dilipatgandakan tiap percobaan (+ jitter)
+
+def _empty_details():
+    return {"info": {}, "harga": [], "fasilitas": []}
+
+def _is_busy(e):
+    msg = str(e).lower()
+    return "locked" in msg or "busy" in msg
 
 class DBHandler:
-    def __init__(self):
-        self.db_path = DB_PATH
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local() # 1 koneksi awet per thread (runner Streamlit multi-thread)
+        self._lock = threading.Lock()
+        # Peta nama (lowercase) -> id tempat, dimuat ulang jika data_version 'tempat' berubah
+        self._name_map = {}
+        self._name_map_version = None
+        # Cache detail tempat {id: detail}, dikosongkan jika versi data tempat/harga/fasilitas berubah
+        self._detail_cache = OrderedDict()
+        self._detail_cache_version = None
+        self.detail_cache_hits = 0
+        self.detail_cache_misses = 0
         self.init_tables()
+        # Log pencarian ditulis per batch oleh thread latar belakang
+        self.log_writer = BackgroundLogWriter(
+            SqliteLogSink(self.db_path, LOG_INSERT_SQL, retention_sql=LOG_RETENTION_SQL), name="db-log-writer")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False,
+                               cached_statements=STATEMENT_CACHE)
+        for pragma in DB_PRAGMAS:
+            conn.execute(pragma)
+        return conn
 
     def get_connection(self):
-        return sqlite3.connect(self.db_path, check_same_thread=False)
+        """Koneksi BARU (milik pemanggil, wajib di-close). Untuk kode lama / query besar sekali jalan."""
+        return self._connect()
+
+    def connection(self):
+        """Koneksi awet milik thread ini (JANGAN di-close). Dipakai semua method DBHandler."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    def close_connection(self):
+        """Menutup koneksi awet thread ini (mis. sebelum file DB dihapus/diganti)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _write(self, fn, retries=WRITE_RETRIES):
+        """
+        Menjalankan fn(conn) dalam satu transaksi BEGIN IMMEDIATE: lock tulis diambil di awal,
+        jadi tidak ada kegagalan upgrade baca->tulis di tengah transaksi. Jika database sibuk
+        (penulis lain), transaksi diulang dengan backoff eksponensial + jitter, maks `retries` kali.
+        """
+        conn = self.connection()
+        for attempt in range(retries + 1):
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                result = fn(conn)
+                conn.execute("COMMIT")
+                return result
+            except sqlite3.OperationalError as e:
+                if conn.in_transaction: conn.rollback()
+                if not _is_busy(e) or attempt == retries: raise
+                time.sleep(WRITE_BACKOFF * (2 ** attempt) * (0.5 + random.random()))
+            except Exception:
+                if conn.in_transaction: conn.rollback()
+                raise
 
     def init_tables(self):
         try:
-            import sys
-            sys.path.append(os.path.join(BASE_DIR, 'scripts'))
             import setup_db
-            setup_db.create_tables()
+            setup_db.create_tables(self.db_path)
         except:
             pass # Fallback handled by setup_db if available
 
     # ================= LOGGING PENCARIAN =================
     def log_search(self, query, query_clean, count, top_result, duration=0.0, intent=None, region=None):
-        conn = self.get_connection()
-        try:
-            conn.execute(
-                """INSERT INTO riwayat 
-                   (waktu, query_user, query_bersih, intent, region, jumlah_hasil, hasil_teratas, durasi_detik) 
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""", 
-                (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), query, query_clean, intent, region, count, top_result, duration)
-            )
-            conn.commit()
-        except Exception as e: print(f"❌ Log Error: {e}")
-        finally: conn.close()
+        # Hanya masuk antrean (tanpa I/O di jalur pencarian); jika penuh, dihitung di log_writer.dropped
+        self.log_writer.submit(
+            (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), query, query_clean, intent, region, count, top_result, duration)
+        )
+
+    def flush_logs(self):
+        self.log_writer.flush()
 
     def get_search_history(self, limit=50):
-        conn = self.get_connection()
+        self.flush_logs()
         try:
-            return pd.read_sql_query(f"SELECT waktu, query_user, intent, region, jumlah_hasil, hasil_teratas FROM riwayat ORDER BY id DESC LIMIT {limit}", conn)
+            # ORDER BY id DESC = scan mundur rowid: biaya sebanding limit, bukan ukuran tabel
+            return pd.read_sql_query("SELECT waktu, query_user, intent, region, jumlah_hasil, hasil_teratas FROM riwayat ORDER BY id DESC LIMIT ?", self.connection(), params=(int(limit),))
         except: return pd.DataFrame()
-        finally: conn.close()
+
+    # ================= ANALITIK PENCARIAN (ROLLUP) =================
+    def refresh_search_analytics(self):
+        """Masukkan riwayat baru ke tabel rollup (inkremental, per batch). Mengembalikan jumlah baris baru."""
+        import rollup_analitik
+        self.flush_logs()
+        total = 0
+        try:
+            while True:
+                n = self._write(rollup_analitik.rollup_batch)
+                if not n: return total
+                total += n
+        except sqlite3.OperationalError as e:
+            print(f"⚠️ Rollup analitik gagal: {e}")
+            return total
+
+    def get_search_trend(self, granularitas='hari', limit=30):
+        """
+        Tren per periode dari analitik_pencarian (terlama dulu): jumlah, % tanpa hasil,
+        rata-rata & persentil latensi (p50/p95 dari histogram bucket). % & latensi hanya dari
+        pencarian yang terukur (None jika periode itu seluruhnya hasil impor log CSV).
+        """
+        import rollup_analitik
+        conn = self.connection()
+        try:
+            rows = conn.execute("SELECT periode, jumlah, terukur, nol_hasil, total_durasi FROM analitik_pencarian "
+                                "WHERE granularitas = ? ORDER BY periode DESC LIMIT ?", (granularitas, int(limit))).fetchall()
+        except sqlite3.OperationalError:
+            return pd.DataFrame()
+        if not rows: return pd.DataFrame()
+        rows.reverse()
+
+        buckets = {}
+        for periode, nilai, jumlah in conn.execute(
+                "SELECT periode, nilai, jumlah FROM analitik_dimensi WHERE granularitas = ? AND periode >= ? AND dimensi = 'durasi'",
+                (granularitas, rows[0][0])):
+            buckets.setdefault(periode, {})[nilai] = jumlah
+
+        return pd.DataFrame([{
+            "periode": periode,
+            "jumlah": jumlah,
+            "nol_hasil_pct": round(nol / terukur * 100, 1) if terukur else None,
+            "durasi_rata2": total_durasi / terukur if terukur else None,
+            "durasi_p50": rollup_analitik.percentile_from_buckets(buckets.get(periode, {}), 0.50),
+            "durasi_p95": rollup_analitik.percentile_from_buckets(buckets.get(periode, {}), 0.95),
+        } for periode, jumlah, terukur, nol, total_durasi in rows])
+
+    def get_search_breakdown(self, dimensi, granularitas='hari', periode_mulai=None, limit=10):
+        """Sebaran 'query' / 'region' / 'intent' sejak periode_mulai (None = semua), terbanyak dulu."""
+        try:
+            return pd.read_sql_query(
+                "SELECT nilai, SUM(jumlah) AS jumlah FROM analitik_dimensi "
+                "WHERE granularitas = ? AND periode >= ? AND dimensi = ? GROUP BY nilai ORDER BY jumlah DESC LIMIT ?",
+                self.connection(), params=(granularitas, periode_mulai or '', dimensi, int(limit)))
+        except Exception:
+            return pd.DataFrame()
 
     # ================= TEMPAT & DETAIL (PERBAIKAN UTAMA DI SINI) =================
+    def get_data_version(self, tabel):
+        """Nomor versi data sebuah tabel (naik otomatis lewat trigger). None jika belum dimigrasi."""
+        try:
+            res = self.connection().execute("SELECT versi FROM data_version WHERE tabel = ?", (tabel,)).fetchone()
+            return res[0] if res else None
+        except sqlite3.OperationalError:
+            return None
+
+    def place_id_map(self):
+        """Peta {nama lowercase: id} di memori, dimuat ulang hanya jika tabel tempat berubah."""
+        version = self.get_data_version('tempat')
+        if version is not None and version == self._name_map_version:
+            return self._name_map
+        with self._lock:
+            if version is None or version != self._name_map_version:
+                rows = self.connection().execute("SELECT id, nama FROM tempat").fetchall()
+                self._name_map = {str(nama).strip().lower(): pid for pid, nama in rows}
+                self._name_map_version = version
+        return self._name_map
+
+    def _fts_place_id(self, name):
+        """Fallback nama tidak persis lewat index FTS5 (frasa utuh dulu, lalu kata per kata)."""
+        words = [w.replace('"', '""') for w in str(name).split() if len(w) >= 3]
+        if not words: return None
+        phrase = '"' + " ".join(words) + '"'
+        any_word = " OR ".join(f'"{w}"' for w in words)
+        conn = self.connection()
+        for match in (phrase, any_word):
+            res = conn.execute("SELECT rowid FROM tempat_fts WHERE tempat_fts MATCH ? ORDER BY rank LIMIT 1", (match,)).fetchone()
+            if res: return res[0]
+        return None
+
     def get_place_by_name(self, name):
-        conn = self.get_connection()
-        res = conn.execute("SELECT id FROM tempat WHERE nama LIKE ? LIMIT 1", (f"%{name}%",)).fetchone()
-        conn.close()
-        return res[0] if res else None
+        """id tempat dari nama: cocok persis (peta di memori), lalu fuzzy (FTS5)."""
+        if not name: return None
+        pid = self.place_id_map().get(str(name).strip().lower())
+        if pid is not None: return pid
+        try:
+            return self._fts_place_id(name)
+        except sqlite3.OperationalError:
+            # DB lama tanpa tempat_fts (belum migrasi v3)
+            res = self.connection().execute("SELECT id FROM tempat WHERE nama LIKE ? LIMIT 1", (f"%{name}%",)).fetchone()
+            return res[0] if res else None
+
+    def get_details_version(self):
+        """Versi gabungan sumber detail tempat (jumlah versi tiap tabel, hanya bisa naik)."""
+        try:
+            marks = ",".join("?" * len(DETAIL_TABLES))
+            res = self.connection().execute(
+                f"SELECT COUNT(*), SUM(versi) FROM data_version WHERE tabel IN ({marks})", DETAIL_TABLES).fetchone()
+            # DB lama (belum migrasi v5) -> None = cache tidak dipakai
+            return res[1] if res[0] == len(DETAIL_TABLES) else None
+        except sqlite3.OperationalError:
+            return None
+
+    def clear_detail_cache(self):
+        with self._lock:
+            self._detail_cache.clear()
+            self._detail_cache_version = None
 
     def get_place_details(self, place_id):
-        conn = self.get_connection()
-        conn.row_factory = sqlite3.Row
-        c = conn.cursor()
-        
-        # 1. Info Utama
-        info = c.execute("SELECT * FROM tempat WHERE id = ?", (place_id,)).fetchone()
-        info = dict(info) if info else {}
-        
-        # 2. Ambil Harga dari Tabel 'harga' (PRIORITAS UTAMA)
-        db_harga = c.execute("SELECT item, harga, kategori FROM harga WHERE tempat_id = ?", (place_id,)).fetchall()
-        
-        # Format ke List of Dict
-        harga_list = [{"item": h['item'], "harga": h['harga'], "kategori": h['kategori']} for h in db_harga]
-        
-        # Fallback ke JSON hanya jika tabel kosong
-        if not harga_list and info.get('harga_json'):
-            try: harga_list = json.loads(info['harga_json'])
-            except: pass
-        
-        # 3. Ambil Fasilitas dari Tabel 'fasilitas' (PRIORITAS UTAMA)
-        db_fas = c.execute("SELECT nama_fasilitas FROM fasilitas WHERE tempat_id = ?", (place_id,)).fetchall()
-        
-        fasilitas_list = [f['nama_fasilitas'] for f in db_fas]
-        
-        # Fallback ke string fasilitas di tabel tempat
-        if not fasilitas_list and info.get('fasilitas'):
-            fasilitas_list = [f.strip() for f in info['fasilitas'].split(',')]
-        
-        conn.close()
-        return {"info": info, "harga": harga_list, "fasilitas": fasilitas_list}
+        if place_id is None: return _empty_details()
+        return self.get_places_details_many([place_id]).get(int(place_id), _empty_details())
+
+    def get_places_details_many(self, place_ids):
+        """
+        Detail banyak tempat sekaligus. Hasil: {id: {"info", "harga", "fasilitas"}} (read-only, jangan diubah).
+        Read-through cache: tempat yang sudah pernah dimuat diambil dari memori selama versi data
+        tidak berubah (update_db.py / trigger menaikkan versi); sisanya dimuat dengan 3 query.
+        """
+        ids = list(dict.fromkeys(int(pid) for pid in place_ids if pid is not None))
+        if not ids: return {}
+
+        version = self.get_details_version()
+        if version is None: return self._load_places_details(ids)
+
+        details, missing = {}, []
+        with self._lock:
+            if version != self._detail_cache_version:
+                self._detail_cache.clear()
+                self._detail_cache_version = version
+            for pid in ids:
+                det = self._detail_cache.get(pid)
+                if det is None:
+                    missing.append(pid)
+                else:
+                    self._detail_cache.move_to_end(pid)
+                    details[pid] = det
+            self.detail_cache_hits += len(details)
+            self.detail_cache_misses += len(missing)
+        if not missing: return details
+
+        loaded = self._load_places_details(missing)
+        with self._lock:
+            # Data dimuat saat versi masih sama -> aman disimpan
+            if version == self._detail_cache_version:
+                self._detail_cache.update(loaded)
+                while len(self._detail_cache) > DETAIL_CACHE_SIZE:
+                    self._detail_cache.popitem(last=False)
+        details.update(loaded)
+        return details
+
+    def _load_places_details(self, ids):
+        """3 query berbasis himpunan (tempat, harga, fasilitas) untuk semua id, bukan 3 query per tempat."""
+        c = self.connection().cursor()
+        c.row_factory = sqlite3.Row
+        details = {}
+        for start in range(0, len(ids), DETAIL_BATCH):
+            chunk = ids[start:start + DETAIL_BATCH]
+            marks = ",".join("?" * len(chunk))
+
+            # 1. Info Utama
+            for row in c.execute(f"SELECT * FROM tempat WHERE id IN ({marks})", chunk):
+                details[row['id']] = {"info": dict(row), "harga": [], "fasilitas": []}
+
+            # 2. Ambil Harga dari Tabel 'harga' (PRIORITAS UTAMA)
+            for h in c.execute(f"SELECT tempat_id, item, harga, kategori FROM harga WHERE tempat_id IN ({marks}) ORDER BY id", chunk):
+                if h['tempat_id'] in details:
+                    details[h['tempat_id']]['harga'].append({"item": h['item'], "harga": h['harga'], "kategori": h['kategori']})
+
+            # 3. Ambil Fasilitas dari Tabel 'fasilitas' (PRIORITAS UTAMA)
+            for f in c.execute(f"SELECT tempat_id, nama_fasilitas FROM fasilitas WHERE tempat_id IN ({marks}) ORDER BY id", chunk):
+                if f['tempat_id'] in details:
+                    details[f['tempat_id']]['fasilitas'].append(f['nama_fasilitas'])
+        c.close()
+
+        for det in details.values():
+            info = det['info']
+            # Fallback ke JSON hanya jika tabel kosong
+            if not det['harga'] and info.get('harga_json'):
+                try: det['harga'] = json.loads(info['harga_json'])
+                except: pass
+            # Fallback ke string fasilitas di tabel tempat
+            if not det['fasilitas'] and info.get('fasilitas'):
+                det['fasilitas'] = [f.strip() for f in info['fasilitas'].split(',')]
+        return details
 
     # ================= USER & BOOKING =================
     def register_user(self, username, password):
-        conn = self.get_connection()
+        conn = self.connection()
         try:
             h_pw = hashlib.sha256(password.encode()).hexdigest()
-            conn.execute("INSERT INTO users (username, password) VALUES (?, ?)", (username, h_pw))
-            conn.commit()
+            with conn:
+                conn.execute("INSERT INTO users (username, password) VALUES (?, ?)", (username, h_pw))
             return True, "Sukses"
         except: return False, "Username sudah ada"
-        finally: conn.close()
 
     def verify_login(self, username, password):
-        conn = self.get_connection()
         h_pw = hashlib.sha256(password.encode()).hexdigest()
-        user = conn.execute("SELECT id, username, role FROM users WHERE username=? AND password=?", (username, h_pw)).fetchone()
-        conn.close()
+        user = self.connection().execute("SELECT id, username, role FROM users WHERE username=? AND password=?", (username, h_pw)).fetchone()
         if user: return {"id": user[0], "username": user[1], "role": user[2]}
         return None
 
-    def add_booking(self, uid, pid, tgl, qty, tot):
-        conn = self.get_connection()
+    def add_booking(self, uid, pid, tgl, qty, tot, idempotency_key=None):
+        """
+        Menyimpan pesanan. Mengembalikan id pesanan, atau None jika gagal.
+        idempotency_key: submit ulang dengan kunci yang sama (klik ganda / rerun) mengembalikan
+        id pesanan yang sudah ada, tanpa membuat pesanan baru.
+        """
+        def _insert(conn):
+            if idempotency_key:
+                res = conn.execute("SELECT id FROM bookings WHERE idempotency_key = ?", (idempotency_key,)).fetchone()
+                if res: return res[0]
+            cur = conn.execute("INSERT INTO bookings (user_id, tempat_id, tanggal_checkin, jumlah_orang, total_harga, idempotency_key) VALUES (?, ?, ?, ?, ?, ?)",
+                               (uid, pid, tgl, qty, tot, idempotency_key))
+            return cur.lastrowid
         try:
-            conn.execute("INSERT INTO bookings (user_id, tempat_id, tanggal_checkin, jumlah_orang, total_harga) VALUES (?, ?, ?, ?, ?)", 
-                         (uid, pid, tgl, qty, tot))
-            conn.commit()
-            return True
-        except: return False
-        finally: conn.close()
+            return self._write(_insert)
+        except Exception as e:
+            print(f"⚠️ Booking gagal disimpan: {e}")
+            return None
 
     def get_user_bookings(self, uid):
-        conn = self.get_connection()
-        df = pd.read_sql_query("SELECT b.id, t.nama, b.tanggal_checkin, b.total_harga, b.status, b.jumlah_orang FROM bookings b JOIN tempat t ON b.tempat_id = t.id WHERE b.user_id = ? ORDER BY b.id DESC", conn, params=(uid,))
-        conn.close()
-        return df
+        return pd.read_sql_query("SELECT b.id, t.nama, b.tanggal_checkin, b.total_harga, b.status, b.jumlah_orang FROM bookings b JOIN tempat t ON b.tempat_id = t.id WHERE b.user_id = ? ORDER BY b.id DESC", self.connection(), params=(uid,))
+
+    def get_booking_summary(self):
+        """
+        Ringkasan pesanan dari tabel booking_summary (dijaga trigger, migrasi v6): biaya tetap
+        berapa pun jumlah pesanan. Hasil: {"total", "pendapatan" (CONFIRMED), "pending", "per_status"}.
+        """
+        try:
+            rows = self.connection().execute("SELECT status, jumlah, total_harga FROM booking_summary").fetchall()
+        except sqlite3.OperationalError:
+            # DB lama (belum migrasi v6)
+            rows = self.connection().execute(
+                "SELECT COALESCE(status, 'PENDING'), COUNT(*), COALESCE(SUM(total_harga), 0) FROM bookings GROUP BY 1").fetchall()
+        per_status = {status: {"jumlah": jumlah, "total_harga": total} for status, jumlah, total in rows}
+        return {
+            "total": sum(v["jumlah"] for v in per_status.values()),
+            "pendapatan": per_status.get('CONFIRMED', {}).get("total_harga", 0),
+            "pending": per_status.get('PENDING', {}).get("jumlah", 0),
+            "per_status": per_status,
+        }
+
+    def get_bookings_admin_page(self, limit=ADMIN_PAGE_SIZE, before_id=None, status=None):
+        """
+        Satu halaman pesanan terbaru (keyset: id < before_id), opsional per status.
+        Halaman berikutnya: before_id = id terkecil halaman ini. Memakai rowid / idx_bookings_status,
+        jadi biayanya sebanding limit, bukan jumlah pesanan.
+        """
+        sql = "SELECT b.id, u.username, t.nama, b.tanggal_checkin, b.total_harga, b.status FROM bookings b JOIN users u ON b.user_id = u.id JOIN tempat t ON b.tempat_id = t.id"
+        where, params = [], []
+        if before_id is not None:
+            where.append("b.id < ?"); params.append(int(before_id))
+        if status:
+            where.append("b.status = ?"); params.append(status)
+        if where: sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY b.id DESC LIMIT ?"
+        params.append(int(limit))
+        return pd.read_sql_query(sql, self.connection(), params=params)
 
     def get_all_bookings_admin(self):
-        conn = self.get_connection()
-        df = pd.read_sql_query("SELECT b.id, u.username, t.nama, b.tanggal_checkin, b.total_harga, b.status FROM bookings b JOIN users u ON b.user_id = u.id JOIN tempat t ON b.tempat_id = t.id ORDER BY b.id DESC", conn)
-        conn.close()
-        return df
+        return pd.read_sql_query("SELECT b.id, u.username, t.nama, b.tanggal_checkin, b.total_harga, b.status FROM bookings b JOIN users u ON b.user_id = u.id JOIN tempat t ON b.tempat_id = t.id ORDER BY b.id DESC", self.connection())
 
     def update_booking_status(self, bid, status):
-        conn = self.get_connection()
-        conn.execute("UPDATE bookings SET status = ? WHERE id = ?", (status, bid))
-        conn.commit()
-        conn.close()
+        return self.update_booking_status_many([bid], status) > 0
+
+    def update_booking_status_many(self, bids, status):
+        """Ubah status banyak pesanan dalam SATU transaksi. Mengembalikan jumlah pesanan yang berubah."""
+        params = [(status, int(bid), status) for bid in dict.fromkeys(bids)]
+        if not params: return 0
+        return self._write(lambda conn: conn.executemany(
+            "UPDATE bookings SET status = ? WHERE id = ? AND status IS NOT ?", params).rowcount)
 
 db = DBHandler()
\ No newline at end of file
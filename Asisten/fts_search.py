@@ -0,0 +1,140 @@
+import pandas as pd
+import os
+import re
+import sys
+
+# --- SETUP PATH ---
+# File ini ada di: Asisten/fts_search.py
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(CURRENT_DIR)
+
+try:
+    from Asisten.db_handler import db
+except ImportError:
+    # Fallback jika dijalankan langsung sebagai script
+    sys.path.append(BASE_DIR)
+    from Asisten.db_handler import db
+from src import utils
+
+# ================= KONFIGURASI =================
+MIN_TOKEN_LEN = 2   # Kata lebih pendek dari ini tidak dikirim ke MATCH
+MAX_TOKENS = 16     # Batas jumlah kata query (query sangat panjang tetap cepat)
+MAX_CANDIDATES = 5000 # Ulasan terbaik (bm25) yang dikelompokkan per tempat
+
+# Skor bm25() di SQLite bernilai negatif (makin kecil makin relevan).
+# Satu baris per tempat: ulasan dengan skor terbaik (kolom "bare" ikut baris MIN()).
+# LIMIT di subquery wajib: mencegah subquery di-flatten (bm25 hanya sah di query FTS itu sendiri).
+# Filter wilayah ada DI DALAM subquery (sebelum LIMIT): kandidat teratas dari wilayah lain
+# tidak boleh menyingkirkan tempat di wilayah yang diminta. Lokasi & kode wilayah dibandingkan
+# tanpa spasi ('Kulon Progo, DIY' cocok dengan kode 'kulonprogo').
+FTS_QUERY = """
+    SELECT t.id, t.nama, t.lokasi, t.rating_gmaps, u.teks_mentah, MIN(h.skor) AS skor
+    FROM (SELECT ulasan_fts.rowid AS ulasan_id, bm25(ulasan_fts) AS skor
+          FROM ulasan_fts
+          JOIN ulasan ON ulasan.id = ulasan_fts.rowid
+          JOIN tempat ON tempat.id = ulasan.tempat_id
+          WHERE ulasan_fts MATCH ? AND (? IS NULL OR REPLACE(LOWER(tempat.lokasi), ' ', '') LIKE '%' || ? || '%')
+          ORDER BY skor LIMIT ?) h
+    JOIN ulasan u ON u.id = h.ulasan_id
+    JOIN tempat t ON t.id = u.tempat_id
+    GROUP BY t.id
+    ORDER BY skor, t.rating_gmaps DESC
+    LIMIT ?
+"""
+REGION_EXISTS_QUERY = "SELECT 1 FROM tempat WHERE REPLACE(LOWER(lokasi), ' ', '') LIKE '%' || ? || '%' LIMIT 1"
+
+def normalize_region(region):
+    """Kode wilayah -> bentuk pembanding (huruf kecil, tanpa spasi)."""
+    return re.sub(r'\s+', '', str(region).lower())
+
+class FtsSearchEngine:
+    """
+    Mesin pencari leksikal di atas index FTS5 'ulasan_fts' (migrasi v4).
+    Tidak memuat tabel ulasan / model ke RAM: startup instan, cocok untuk server kecil.
+    Antarmuka sama dengan SmartSearchEngine: search() -> (DataFrame Hasil, Debug Dictionary).
+    """
+    def __init__(self):
+        self.region_lookup = {}
+        self.region_pattern = None
+        self.is_ready = False
+        self.prepare_engine()
+
+    def prepare_engine(self):
+        """Cek index FTS tersedia & siapkan pendeteksi wilayah (tanpa stemmer/NLTK)."""
+        try:
+            ok = db.connection().execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'ulasan_fts'").fetchone()
+            if not ok:
+                print("❌ [FTS] Index ulasan_fts belum ada. Jalankan 'python scripts/setup_db.py'.")
+                return
+        except Exception as e:
+            print(f"❌ [FTS] Error init: {e}")
+            return
+
+        region_map = utils.load_map_from_csv('config_region_map.csv')
+        self.region_lookup = {k.lower(): v.lower() for k, v in region_map.items() if k and v}
+        keys = sorted(self.region_lookup, key=len, reverse=True)
+        if keys:
+            self.region_pattern = re.compile(r'(?<!\w)(' + '|'.join(map(re.escape, keys)) + r')(?!\w)')
+        self.is_ready = True
+
+    def detect_region(self, query):
+        """Mengembalikan (query tanpa nama wilayah, kode wilayah / None). Wilayah terpanjang menang."""
+        if self.region_pattern is None: return query, None
+        matches = list(self.region_pattern.finditer(query))
+        if not matches: return query, None
+        term = max((m.group(0) for m in matches), key=len)
+        return self.region_pattern.sub(lambda m: " " if m.group(0) == term else m.group(0), query), self.region_lookup[term]
+
+    def build_match(self, query):
+        """Kata query -> ekspresi MATCH FTS5 ("a" OR "b" ...). Kata dikutip agar aman dari sintaks FTS."""
+        tokens = [t for t in re.findall(r'[a-z0-9]+', query) if len(t) >= MIN_TOKEN_LEN]
+        tokens = list(dict.fromkeys(tokens))[:MAX_TOKENS]
+        return " OR ".join(f'"{t}"' for t in tokens)
+
+    def _debug_info(self, query, clean_query="", region=None):
+        return {
+            "query_original": query,
+            "query_clean": clean_query,
+            "region": region,
+            "top_result": "-"
+        }
+
+    def search(self, query, top_k=20, region=None):
+        """
+        Mengembalikan: (DataFrame Hasil, Debug Dictionary)
+        region: kode wilayah (mis. 'diy'); jika None dideteksi dari query.
+        """
+        query_lower = str(query).lower()
+        if region is None:
+            query_lower, region = self.detect_region(query_lower)
+        match = self.build_match(query_lower)
+        debug_info = self._debug_info(query, match, region)
+        if not self.is_ready or not match: return pd.DataFrame(), debug_info
+
+        try:
+            conn = db.connection()
+            region_key = normalize_region(region) if region else None
+            # Kode wilayah yang tidak muncul di lokasi tempat mana pun (mis. 'ungaran') tidak dipakai
+            # sebagai filter: hasil tetap keluar, sama seperti mesin Word2Vec yang tidak memfilter.
+            if region_key and not conn.execute(REGION_EXISTS_QUERY, (region_key,)).fetchone():
+                debug_info['region'] = f"{region} (tidak ada di data, tanpa filter)"
+                region_key = None
+            rows = conn.execute(FTS_QUERY, (match, region_key, region_key, MAX_CANDIDATES, top_k)).fetchall()
+        except Exception as e:
+            print(f"❌ [FTS] Error search: {e}")
+            return pd.DataFrame(), debug_info
+
+        # Skor relatif terhadap hasil terbaik (0-100) agar sebanding dengan engine lain
+        best = rows[0][5] if rows and rows[0][5] else -1.0
+        results = [{
+            "ID Tempat": pid,
+            "Nama Tempat": nama,
+            "Lokasi": lokasi,
+            "Isi Ulasan": teks,
+            "Skor Relevansi": round(skor / best * 100, 1)
+        } for pid, nama, lokasi, rating, teks, skor in rows]
+
+        df_res = pd.DataFrame(results)
+        debug_info['top_result'] = df_res.iloc[0]['Nama Tempat'] if not df_res.empty else "Tidak ditemukan"
+        return df_res, debug_info
@@ -82,7 +82,7 @@ try:
     print("\n✅ SUKSES!")
     print(f"File '{FINAL_OUTPUT_FILE}' telah berhasil dibuat ulang.")
     print("---------------------------------------------------------")
-    print("Alur Kerja Selesai. Sekarang jalankan 'python train_w2v.py'")
+    print("Alur Kerja Selesai. Sekarang jalankan 'python build_metadata.py'")
     print("---------------------------------------------------------")
 
 except FileNotFoundError as e:
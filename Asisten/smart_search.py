@@ -3,7 +3,6 @@ import numpy as np
 import os
 import re
 import sys
-from gensim.models import Word2Vec
 from sklearn.metrics.pairwise import cosine_similarity
 
 # --- 1. SETUP PATH ---
@@ -17,10 +16,15 @@ try:
 except ImportError:
     sys.path.append(BASE_DIR)
     from Asisten.db_handler import db
+from src import utils
+from src import query_expansion
 
 class SmartSearchEngine:
-    def __init__(self):
-        self.model = None
+    def __init__(self, model_path=MODEL_PATH, expand_query=False):
+        self.model_path = model_path
+        self.expand_query = expand_query
+        self.wv = None
+        self.expander = None
         self.df = None
         self.doc_vectors = None
         self.is_ready = False
@@ -48,49 +52,79 @@ class SmartSearchEngine:
             return
 
         # 2. Load Model
-        if os.path.exists(MODEL_PATH):
-            try: 
-                self.model = Word2Vec.load(MODEL_PATH)
-                self.vector_size = self.model.vector_size
-            except: pass
+        # KeyedVectors di-mmap (read-only) agar banyak proses berbagi satu salinan
+        self.wv = utils.load_word_vectors(self.model_path)
+        if self.wv is not None:
+            self.vector_size = self.wv.vector_size
+            if self.expand_query:
+                self.expander = query_expansion.load_expander(self.wv, self.model_path)
         
         # 3. Vectorization
-        if not self.df.empty and self.model:
+        if not self.df.empty and self.wv is not None:
             vectors = [self.get_vector(t) for t in self.df['teks_bersih']]
             self.doc_vectors = np.vstack(vectors)
             self.is_ready = True
 
     def get_vector(self, text):
-        if not self.model: return np.zeros(self.vector_size)
+        if self.wv is None: return np.zeros(self.vector_size)
         words = str(text).split()
-        valid_vectors = [self.model.wv[w] for w in words if w in self.model.wv]
+        valid_vectors = [self.wv[w] for w in words if w in self.wv]
         if not valid_vectors: return np.zeros(self.vector_size)
         return np.mean(valid_vectors, axis=0)
 
+    def get_query_vector(self, clean_query):
+        # Query diperluas dengan sinonim dari tabel tetangga (O(k) per kata)
+        if self.expander is None: return self.get_vector(clean_query)
+        return self.expander.vector(clean_query.split())
+
+    def clean_query(self, query):
+        return re.sub(r'[^a-z0-9\s]', '', query.lower())
+
     # --- FUNGSI PENCARIAN (Updated Return Type) ---
     def search(self, query, top_k=20):
         """
         Mengembalikan: (DataFrame Hasil, Debug Dictionary)
         """
-        debug_info = {
-            "query_original": query,
-            "query_clean": "",
-            "top_result": "-"
-        }
-
-        if not self.is_ready: return pd.DataFrame(), debug_info
+        if not self.is_ready: return pd.DataFrame(), self._debug_info(query)
 
         # 1. Cleaning & Debug Data
-        clean_query = re.sub(r'[^a-z0-9\s]', '', query.lower())
-        debug_info['query_clean'] = clean_query
+        clean_query = self.clean_query(query)
 
         # 2. Proses AI
-        query_vec = self.get_vector(clean_query).reshape(1, -1)
+        query_vec = self.get_query_vector(clean_query).reshape(1, -1)
         
         # A. Semantic Score
         if np.all(query_vec == 0): semantic_scores = np.zeros(len(self.df))
         else: semantic_scores = cosine_similarity(query_vec, self.doc_vectors)[0]
         
+        return self._rank(query, clean_query, semantic_scores, top_k)
+
+    def search_many(self, queries, top_k=20):
+        """
+        Versi batch dari search(): semua query divektorkan sekaligus lalu skor semantik
+        dihitung dengan satu perkalian matriks. Mengembalikan list (DataFrame, debug) sesuai urutan.
+        """
+        if not self.is_ready: return [(pd.DataFrame(), self._debug_info(q)) for q in queries]
+        if not queries: return []
+
+        clean_queries = [self.clean_query(q) for q in queries]
+        query_matrix = np.vstack([self.get_query_vector(c) for c in clean_queries])
+        semantic_matrix = cosine_similarity(query_matrix, self.doc_vectors) # Vektor nol -> skor 0
+
+        return [self._rank(q, c, semantic_matrix[i], top_k)
+                for i, (q, c) in enumerate(zip(queries, clean_queries))]
+
+    def _debug_info(self, query, clean_query=""):
+        return {
+            "query_original": query,
+            "query_clean": clean_query,
+            "top_result": "-"
+        }
+
+    def _rank(self, query, clean_query, semantic_scores, top_k):
+        """Menggabungkan skor semantik + keyword + nama, lalu format hasil."""
+        debug_info = self._debug_info(query, clean_query)
+
         # B. Keyword Score
         keyword_scores = self.df['teks_bersih'].str.contains(clean_query, regex=False).astype(float)
         
@@ -112,6 +146,7 @@ class SmartSearchEngine:
                 seen.add(nama)
                 
                 results.append({
+                    "ID Tempat": int(self.df.iloc[idx]['id']),
                     "Nama Tempat": nama,
                     "Lokasi": self.df.iloc[idx]['lokasi'],
                     "Isi Ulasan": self.df.iloc[idx]['teks_mentah'],
@@ -127,4 +162,4 @@ class SmartSearchEngine:
         else:
             debug_info['top_result'] = "Tidak ditemukan"
 
-        return df_res, debug_info
\ No newline at end of file
+        return df_res, debug_info
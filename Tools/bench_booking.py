@@ -0,0 +1,91 @@
+import os
+import sys
+import time
+import random
+import shutil
+import sqlite3
+import tempfile
+import multiprocessing
+
+# Tambahkan folder root ke path agar bisa import 'Asisten'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Asisten.db_handler import DBHandler, DB_PATH
+
+WORKERS = 8             # Proses penulis bersamaan (setara banyak sesi Streamlit)
+BOOKINGS_PER_WORKER = 250
+DUPLICATE_RATE = 0.2    # Porsi submit ulang dengan kunci idempotensi yang sama (klik ganda)
+KEY_PREFIX = "loadtest"
+
+def _worker(args):
+    db_path, worker_id, n = args
+    handler = DBHandler(db_path)
+    conn = handler.connection()
+    uid = conn.execute("SELECT id FROM users ORDER BY id LIMIT 1").fetchone()[0]
+    place_ids = [r[0] for r in conn.execute("SELECT id FROM tempat")]
+    rng = random.Random(worker_id)
+
+    failed, mismatched = 0, 0
+    for i in range(n):
+        key = f"{KEY_PREFIX}-{worker_id}-{i}"
+        args = (uid, rng.choice(place_ids), "2026-01-01", 2, 50000)
+        bid = handler.add_booking(*args, idempotency_key=key)
+        if bid is None:
+            failed += 1
+        elif rng.random() < DUPLICATE_RATE and handler.add_booking(*args, idempotency_key=key) != bid:
+            mismatched += 1
+    handler.log_writer.close()
+    return failed, mismatched
+
+def bench_booking():
+    print("⏱️ --- LOAD TEST BOOKING: PENULIS BERSAMAAN + SUBMIT GANDA ---")
+    if not os.path.exists(DB_PATH):
+        print(f"❌ Database tidak ditemukan: {DB_PATH}")
+        return
+
+    tmp_dir = tempfile.mkdtemp(prefix="bench_booking_")
+    db_path = os.path.join(tmp_dir, "camping.db")
+    try:
+        shutil.copy(DB_PATH, db_path) # Salinan: database asli tidak tersentuh
+        DBHandler(db_path).log_writer.close() # Migrasi salinan sebelum worker mulai
+
+        total = WORKERS * BOOKINGS_PER_WORKER
+        print(f"📂 {WORKERS} proses x {BOOKINGS_PER_WORKER} booking | submit ganda ~{DUPLICATE_RATE:.0%}")
+        start = time.perf_counter()
+        with multiprocessing.Pool(WORKERS) as pool:
+            results = pool.map(_worker, [(db_path, w, BOOKINGS_PER_WORKER) for w in range(WORKERS)])
+        elapsed = time.perf_counter() - start
+
+        failed = sum(r[0] for r in results)
+        mismatched = sum(r[1] for r in results)
+        conn = sqlite3.connect(db_path)
+        stored = conn.execute("SELECT COUNT(*) FROM bookings WHERE idempotency_key LIKE ?", (f"{KEY_PREFIX}-%",)).fetchone()[0]
+        summary = conn.execute("SELECT COALESCE(SUM(jumlah), 0) FROM booking_summary").fetchone()[0]
+        all_rows = conn.execute("SELECT COUNT(*) FROM bookings").fetchone()[0]
+
+        # Persetujuan massal: satu transaksi vs satu transaksi per pesanan
+        handler = DBHandler(db_path)
+        ids = [r[0] for r in conn.execute("SELECT id FROM bookings WHERE idempotency_key LIKE ?", (f"{KEY_PREFIX}-%",))]
+        conn.close()
+        half = len(ids) // 2
+        t = time.perf_counter()
+        for bid in ids[:half]: handler.update_booking_status(bid, 'CONFIRMED')
+        t_single = time.perf_counter() - t
+        t = time.perf_counter()
+        handler.update_booking_status_many(ids[half:], 'CONFIRMED')
+        t_batch = time.perf_counter() - t
+        handler.log_writer.close()
+
+        print("-" * 60)
+        print(f"Throughput            : {total / elapsed:.0f} booking/detik ({elapsed:.2f} detik)")
+        print(f"Booking gagal         : {failed}")
+        print(f"Tersimpan / diharapkan: {stored} / {total} {'✅' if stored == total and not failed else '❌'}")
+        print(f"Submit ganda beda id  : {mismatched} {'✅' if not mismatched else '❌'}")
+        print(f"booking_summary cocok : {'✅' if summary == all_rows else '❌'} ({summary} vs {all_rows})")
+        print(f"Approve {half} satu-satu  : {t_single * 1000:.1f} ms")
+        print(f"Approve {len(ids) - half} batch      : {t_batch * 1000:.1f} ms")
+        print("-" * 60)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    bench_booking()
@@ -0,0 +1,77 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+
+# Tambahkan folder root ke path agar bisa import 'Asisten'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Asisten.db_handler import db, DB_PATH
+
+N_CARDS = 20   # Jumlah kartu hasil di 1 halaman Streamlit
+REPEAT = 20    # Render halaman berulang, ambil median
+
+def _legacy_place_by_name(name):
+    """Cara lama: koneksi baru per panggilan."""
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    res = conn.execute("SELECT id FROM tempat WHERE nama LIKE ? LIMIT 1", (f"%{name}%",)).fetchone()
+    conn.close()
+    return res[0] if res else None
+
+def _legacy_place_details(place_id):
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    c = conn.cursor()
+    info = c.execute("SELECT * FROM tempat WHERE id = ?", (place_id,)).fetchone()
+    info = dict(info) if info else {}
+    harga = [dict(h) for h in c.execute("SELECT item, harga, kategori FROM harga WHERE tempat_id = ?", (place_id,)).fetchall()]
+    if not harga and info.get('harga_json'):
+        try: harga = json.loads(info['harga_json'])
+        except: pass
+    fasilitas = [f['nama_fasilitas'] for f in c.execute("SELECT nama_fasilitas FROM fasilitas WHERE tempat_id = ?", (place_id,)).fetchall()]
+    conn.close()
+    return {"info": info, "harga": harga, "fasilitas": fasilitas}
+
+def _render_page(names, by_name, details):
+    """Pola akses DB halaman hasil: cari id lalu detail untuk tiap kartu."""
+    for name in names:
+        details(by_name(name))
+
+def _render_page_batch(names):
+    """Pola baru: cari id semua kartu, lalu detail diambil sekaligus (3 query)."""
+    db.get_places_details_many([db.get_place_by_name(name) for name in names])
+
+def _median_ms(fn):
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return sorted(times)[len(times) // 2] * 1000
+
+def bench_db():
+    print("⏱️ --- BENCHMARK DB: WAKTU DB PER RENDER HALAMAN HASIL ---")
+    if not os.path.exists(DB_PATH):
+        print(f"❌ Database tidak ditemukan: {DB_PATH}")
+        return
+
+    names = [r[0] for r in db.connection().execute("SELECT nama FROM tempat ORDER BY id LIMIT ?", (N_CARDS,))]
+    print(f"📂 {len(names)} kartu per halaman | median dari {REPEAT} render")
+
+    before = _median_ms(lambda: _render_page(names, _legacy_place_by_name, _legacy_place_details))
+    after = _median_ms(lambda: _render_page(names, db.get_place_by_name, db.get_place_details))
+    db.clear_detail_cache()
+    batch = _median_ms(lambda: (db.clear_detail_cache(), _render_page_batch(names)))
+    cached = _median_ms(lambda: _render_page_batch(names))
+
+    print("-" * 50)
+    print(f"{'MODE':<28} | {'MS/HALAMAN':<10} | {'SPEEDUP'}")
+    print("-" * 50)
+    print(f"{'Sebelum (connect per query)':<28} | {before:<10.2f} | -")
+    print(f"{'Sesudah (koneksi awet + WAL)':<28} | {after:<10.2f} | {before / after:.2f}x")
+    print(f"{'Batch detail (3 query)':<28} | {batch:<10.2f} | {before / batch:.2f}x")
+    print(f"{'Batch + cache detail':<28} | {cached:<10.2f} | {before / cached:.2f}x")
+    print("-" * 50)
+
+if __name__ == "__main__":
+    bench_db()
@@ -0,0 +1,66 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import joblib
+import pandas as pd
+
+# Tambahkan folder root ke path agar bisa import 'src'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src import utils
+
+SCALES = [1, 100]  # Ukuran hari ini & 100x jumlah tempat
+REPEAT = 5         # Ambil median dari beberapa kali muat
+
+def _scaled(df_meta, factor):
+    """Duplikasi metadata dengan nama tempat unik untuk simulasi jumlah tempat x factor."""
+    if factor == 1: return df_meta
+    parts = []
+    for i in range(factor):
+        part = df_meta.copy()
+        part.index = [f"{name} #{i}" for name in df_meta.index]
+        parts.append(part)
+    df = pd.concat(parts)
+    df.index.name = 'Nama_Tempat'
+    return df
+
+def _median_load(fn):
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return sorted(times)[len(times) // 2]
+
+def bench_metadata_load():
+    print("⏱️ --- BENCHMARK LOAD METADATA: joblib pickle vs Arrow mmap ---")
+
+    df_meta = utils.load_metadata()
+    if df_meta.empty:
+        print("❌ Metadata belum ada. Jalankan 'python build_metadata.py' dulu.")
+        return
+
+    tmp_dir = tempfile.mkdtemp(prefix="bench_meta_")
+    try:
+        print("-" * 72)
+        print(f"{'TEMPAT':<8} | {'FORMAT':<8} | {'UKURAN (KB)':<11} | {'LOAD (ms)':<9} | {'SPEEDUP'}")
+        print("-" * 72)
+        for factor in SCALES:
+            df = _scaled(df_meta, factor)
+            pkl_path = os.path.join(tmp_dir, f"meta_{factor}.pkl")
+            arrow_path = os.path.join(tmp_dir, f"meta_{factor}.arrow")
+            joblib.dump(df, pkl_path)
+            utils.save_metadata(df, arrow_path)
+
+            t_pkl = _median_load(lambda: joblib.load(pkl_path))
+            t_arrow = _median_load(lambda: utils.load_metadata(arrow_path))
+            for label, path, dur in (("pickle", pkl_path, t_pkl), ("arrow", arrow_path, t_arrow)):
+                speedup = f"{t_pkl / dur:.2f}x" if label == "arrow" else "-"
+                print(f"{len(df):<8} | {label:<8} | {os.path.getsize(path) / 1024:<11.1f} | {dur * 1000:<9.2f} | {speedup}")
+        print("-" * 72)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    bench_metadata_load()
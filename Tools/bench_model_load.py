@@ -0,0 +1,52 @@
+import os
+import sys
+import json
+import subprocess
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_PATH = os.path.join(ROOT_DIR, "Assets", "word2vec.model")
+KV_PATH = os.path.join(ROOT_DIR, "Assets", "word2vec.kv")
+
+# Kode yang dijalankan di proses terpisah agar RSS tiap cara muat bersih
+CHILD_CODE = r"""
+import json, sys, time, resource
+mode, path = sys.argv[1], sys.argv[2]
+start = time.time()
+if mode == 'full':
+    from gensim.models import Word2Vec
+    wv = Word2Vec.load(path).wv
+else:
+    from gensim.models import KeyedVectors
+    wv = KeyedVectors.load(path, mmap='r')
+_ = wv[wv.index_to_key[0]]
+dur = time.time() - start
+rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps({"load_sec": dur, "rss_mb": rss_mb, "vocab": len(wv.index_to_key)}))
+"""
+
+def bench_model_load():
+    print("⏱️ --- BENCHMARK LOAD MODEL: Word2Vec.load vs KeyedVectors mmap ---")
+
+    if sys.platform.startswith("win"):
+        print("⚠️ Pengukuran RSS memakai modul 'resource' (Linux/Mac saja).")
+        return
+
+    cases = [("full", MODEL_PATH, "Word2Vec.load (lengkap)"), ("mmap", KV_PATH, "KeyedVectors mmap='r'")]
+    print("-" * 65)
+    print(f"{'CARA MUAT':<28} | {'DETIK':<7} | {'PEAK RSS (MB)':<13} | {'VOCAB'}")
+    print("-" * 65)
+    for mode, path, label in cases:
+        if not os.path.exists(path):
+            print(f"{label:<28} | ❌ File tidak ada: {os.path.basename(path)}")
+            continue
+        out = subprocess.run([sys.executable, "-c", CHILD_CODE, mode, path], capture_output=True, text=True)
+        if out.returncode != 0:
+            print(f"{label:<28} | ❌ Gagal: {out.stderr.strip().splitlines()[-1]}")
+            continue
+        res = json.loads(out.stdout.strip().splitlines()[-1])
+        print(f"{label:<28} | {res['load_sec']:<7.3f} | {res['rss_mb']:<13.1f} | {res['vocab']}")
+    print("-" * 65)
+    print("💡 Dengan mmap, N proses pencari berbagi satu salinan vektor di page cache OS.")
+
+if __name__ == "__main__":
+    bench_model_load()
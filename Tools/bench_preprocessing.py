@@ -0,0 +1,52 @@
+import os
+import sys
+import time
+import multiprocessing
+import pandas as pd
+
+# Tambahkan folder root ke path agar bisa import 'src'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src import preprocessing
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORPUS_PATH = os.path.join(ROOT_DIR, "Documents", "corpus_master.csv")
+
+def cek_serial_vs_paralel(texts, n=2000):
+    """Jalur serial (input kecil) dan jalur pool harus menghasilkan token yang identik & berurutan sama."""
+    sample = texts[:n]
+    serial = list(preprocessing.preprocess_many(sample, workers=1))
+    paralel = list(preprocessing.preprocess_many(iter(sample), workers=2, chunksize=64)) # 2 x 64 < n -> pool
+    kecil = list(preprocessing.preprocess_many(sample[:100], workers=2, chunksize=64))   # < 2 x 64 -> serial
+    ok = serial == paralel and serial[:100] == kecil
+    print(f"{'✅' if ok else '❌'} Serial vs paralel ({len(sample)} ulasan): {'identik' if ok else 'BERBEDA'}")
+    return ok
+
+def bench_preprocess_many():
+    print("⏱️ --- BENCHMARK PREPROCESSING (TOKEN/DETIK) ---")
+
+    if not os.path.exists(CORPUS_PATH):
+        print(f"❌ File tidak ditemukan: {CORPUS_PATH}")
+        return
+
+    texts = pd.read_csv(CORPUS_PATH)['Teks_Mentah'].fillna('').tolist()
+    print(f"📂 {len(texts)} ulasan | {multiprocessing.cpu_count()} core")
+    cek_serial_vs_paralel(texts)
+
+    # Catatan: stem cache di disk ikut terpakai, jadi angka ini adalah kondisi 'hangat'.
+    worker_list = sorted({1, 2, 4, multiprocessing.cpu_count()})
+    print("-" * 50)
+    print(f"{'WORKERS':<8} | {'DETIK':<8} | {'TOKEN/DETIK':<12} | {'SPEEDUP'}")
+    print("-" * 50)
+
+    base = None
+    for workers in worker_list:
+        start = time.time()
+        n_tokens = sum(len(tokens) for tokens in preprocessing.preprocess_many(texts, workers=workers))
+        dur = time.time() - start
+        base = base or dur
+        print(f"{workers:<8} | {dur:<8.2f} | {n_tokens / dur:<12,.0f} | {base / dur:.2f}x")
+
+    print("-" * 50)
+
+if __name__ == "__main__":
+    bench_preprocess_many()
@@ -0,0 +1,52 @@
+import os
+import sys
+import shutil
+import sqlite3
+import tempfile
+
+# Tambahkan folder root ke path agar bisa import 'Asisten'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Asisten.fts_search import FTS_QUERY, normalize_region
+from setup_db import create_tables # scripts/ sudah di sys.path (Asisten.db_handler)
+
+CANDIDATE_CAP = 10   # Batas kandidat bm25 kecil agar kasusnya mudah dibuat
+N_LUAR_WILAYAH = 50  # Ulasan sangat relevan di wilayah lain (> CANDIDATE_CAP)
+
+def cek_fts_region():
+    """
+    Tempat di wilayah yang diminta harus tetap ditemukan walau semua ulasannya
+    berperingkat bm25 di bawah batas kandidat (kandidat teratas dari wilayah lain),
+    termasuk wilayah dua kata yang kodenya tanpa spasi ('Kulon Progo, DIY' -> 'kulonprogo').
+    """
+    print("🔎 --- CEK FTS: FILTER WILAYAH SEBELUM BATAS KANDIDAT ---")
+    tmp_dir = tempfile.mkdtemp(prefix="cek_fts_")
+    db_path = os.path.join(tmp_dir, "camping.db")
+    try:
+        create_tables(db_path)
+        conn = sqlite3.connect(db_path)
+        luar = conn.execute("INSERT INTO tempat (nama, lokasi) VALUES ('Bumi Perkemahan Luar', 'Sleman, DIY')").lastrowid
+        target = conn.execute("INSERT INTO tempat (nama, lokasi) VALUES ('Camp Wilayah Target', 'Klaten, Jawa Tengah')").lastrowid
+        target2 = conn.execute("INSERT INTO tempat (nama, lokasi) VALUES ('Camp Dua Kata', 'Kulon Progo, DIY')").lastrowid
+        conn.executemany("INSERT INTO ulasan (tempat_id, teks_mentah) VALUES (?, ?)",
+                         [(luar, "toilet toilet toilet bersih")] * N_LUAR_WILAYAH)
+        conn.execute("INSERT INTO ulasan (tempat_id, teks_mentah) VALUES (?, ?)",
+                     (target, "pemandangan bagus, parkir luas, warung banyak, ada toilet di dekat parkiran"))
+        conn.execute("INSERT INTO ulasan (tempat_id, teks_mentah) VALUES (?, ?)",
+                     (target2, "udara sejuk, jalan menanjak, tenda disewakan, toilet agak jauh dari area camp"))
+        conn.commit()
+
+        semua = [r[0] for r in conn.execute(FTS_QUERY, ('"toilet"', None, None, CANDIDATE_CAP, 20))]
+        ok_all = True
+        for kode, expected in (('klaten', target), ('kulonprogo', target2)):
+            key = normalize_region(kode)
+            rows = conn.execute(FTS_QUERY, ('"toilet"', key, key, CANDIDATE_CAP, 20)).fetchall()
+            ok = [r[0] for r in rows] == [expected] and expected not in semua
+            ok_all = ok_all and ok
+            print(f"{'✅' if ok else '❌'} Region '{kode}' dengan batas {CANDIDATE_CAP} kandidat: {[r[1] for r in rows] or 'tidak ada hasil'}")
+        conn.close()
+        return ok_all
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    cek_fts_region()
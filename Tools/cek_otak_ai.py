@@ -1,23 +1,28 @@
-from gensim.models import Word2Vec
 import sys
 import os
 
 # Tambahkan folder root ke path agar bisa import 'src'
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src import mesin_pencari
+from src import utils
+from src import query_expansion
 
 # Path ke model
 MODEL_PATH = os.path.join('Assets', 'word2vec.model')
 
 def cek_kepintaran():
-    if not os.path.exists(MODEL_PATH):
+    print("🧠 Memuat Otak AI...")
+    wv = utils.load_word_vectors(MODEL_PATH)
+    if wv is None:
         print("❌ Model belum ada. Jalankan train_w2v.py dulu.")
         return
-
-    print("🧠 Memuat Otak AI...")
-    model = Word2Vec.load(MODEL_PATH)
     
-    print(f"📊 Total Kosa Kata yang dipelajari: {len(model.wv.index_to_key)} kata.")
+    print(f"📊 Total Kosa Kata yang dipelajari: {len(wv.index_to_key)} kata.")
+
+    # Pakai tabel tetangga hasil training jika ada (tanpa scan seluruh vocabulary)
+    expander = query_expansion.load_expander(wv, MODEL_PATH)
+    if expander is None:
+        print("ℹ️ Tabel tetangga belum ada, memakai wv.most_similar (lebih lambat).")
     
     # Daftar kata yang ingin dites
     kata_tes = [
@@ -27,11 +32,14 @@ def cek_kepintaran():
     
     print("\n--- 🧪 TES ASOSIASI KATA ---")
     for kata in kata_tes:
-        if kata in model.wv:
+        if kata in wv:
             print(f"\nKata: '{kata.upper()}' mirip dengan:")
             # Tampilkan 5 kata teratas
             try:
-                mirip = model.wv.most_similar(kata, topn=5)
+                if expander is not None:
+                    mirip = expander.neighbours(kata, topn=5)
+                else:
+                    mirip = wv.most_similar(kata, topn=5)
                 for k, skor in mirip:
                     print(f"   - {k} (Kemiripan: {skor:.2f})")
             except:
@@ -0,0 +1,185 @@
+import pandas as pd
+import os
+import json
+import ast
+import runpy
+import hashlib
+import argparse
+import time
+from src import utils
+
+# ================= KONFIGURASI =================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DOCS_DIR = os.path.join(BASE_DIR, 'Documents')
+ASSETS_DIR = os.path.join(BASE_DIR, 'Assets')
+
+CORPUS_PATH = os.path.join(DOCS_DIR, 'corpus_master.csv')   # Sumber Rating & Lokasi
+INFO_PATH = os.path.join(DOCS_DIR, 'info_tempat.csv')       # Foto/Harga/Fasilitas (hasil konversi_data.py)
+KONVERSI_SCRIPT = os.path.join(BASE_DIR, 'Asisten', 'konversi_data.py')
+INPUT_FILES = [os.path.join(DOCS_DIR, f) for f in ('input_info_statis.csv', 'input_harga.csv', 'input_fasilitas.csv')]
+
+METADATA_PATH = utils.METADATA_PATH # Arrow IPC, dibaca utils.load_metadata() dengan mmap
+STAMP_PATH = os.path.join(ASSETS_DIR, 'df_metadata.stamp.json') # Sidik jari input build terakhir
+
+DEFAULT_PHOTO = 'https://via.placeholder.com/400x300?text=No+Image'
+
+# ================= SIDIK JARI INPUT =================
+def _file_stamp(path):
+    """Identitas murah sebuah file (ukuran + waktu ubah). None jika tidak ada."""
+    if not os.path.exists(path): return None
+    st = os.stat(path)
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+def load_stamp():
+    try:
+        if os.path.exists(STAMP_PATH):
+            with open(STAMP_PATH, 'r', encoding='utf-8') as f:
+                return json.load(f)
+    except Exception as e:
+        print(f"⚠️ Stamp metadata rusak, diabaikan: {e}")
+    return {}
+
+def save_stamp(stamp):
+    tmp_path = STAMP_PATH + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(stamp, f, indent=2)
+    os.replace(tmp_path, STAMP_PATH)
+
+# ================= PARSING HARGA =================
+def parse_price_safe(price_str):
+    """Mengubah string "[{'item':...}]" menjadi List Python asli."""
+    try:
+        if isinstance(price_str, list):
+            return price_str
+        if pd.isna(price_str) or price_str == "":
+            return []
+        # konversi_data.py menulis JSON; literal_eval untuk format lama (kutip tunggal)
+        try:
+            return json.loads(price_str)
+        except ValueError:
+            return ast.literal_eval(str(price_str))
+    except:
+        return []
+
+def normalize_price_items(items):
+    """Setiap item jadi dict bertipe tetap: item (str), harga (int), kategori (str)."""
+    result = []
+    for it in items:
+        if not isinstance(it, dict): continue
+        try:
+            harga = int(float(it.get('harga') or 0))
+        except (TypeError, ValueError):
+            harga = 0
+        result.append({
+            'item': str(it.get('item', '')),
+            'harga': harga,
+            'kategori': str(it.get('kategori', '')),
+        })
+    return result
+
+# ================= TAHAP-TAHAP BUILD =================
+def refresh_info_tempat():
+    """Jalankan konversi_data.py jika salah satu file input lebih baru dari info_tempat.csv."""
+    existing = [p for p in INPUT_FILES if os.path.exists(p)]
+    if not existing or not os.path.exists(KONVERSI_SCRIPT): return
+    info_mtime = os.path.getmtime(INFO_PATH) if os.path.exists(INFO_PATH) else 0
+    if any(os.path.getmtime(p) > info_mtime for p in existing):
+        print("🔄 Input harga/fasilitas berubah, menyusun ulang info_tempat.csv...")
+        runpy.run_path(KONVERSI_SCRIPT, run_name='__main__')
+
+def compute_place_stats():
+    """Lokasi (baris pertama) + rating rata-rata per tempat dari corpus. Hanya 3 kolom dibaca."""
+    df_corpus = pd.read_csv(CORPUS_PATH, usecols=['Nama_Tempat', 'Lokasi', 'Rating'])
+    df_corpus['Nama_Tempat'] = df_corpus['Nama_Tempat'].str.strip()
+
+    avg_ratings = df_corpus.groupby('Nama_Tempat', sort=False)['Rating'].mean().rename('Avg_Rating')
+    df_locations = df_corpus.drop_duplicates(subset='Nama_Tempat')[['Nama_Tempat', 'Lokasi']]
+    return df_locations.merge(avg_ratings.reset_index(), on='Nama_Tempat', how='left')
+
+def _stats_hash(df_stats):
+    """Hash hasil agregasi: ulasan baru yang tidak mengubah rating/lokasi tidak memicu build."""
+    return hashlib.md5(pd.util.hash_pandas_object(df_stats, index=False).values.tobytes()).hexdigest()
+
+def merge_info(df_stats):
+    """Gabungkan Foto, Harga (sudah di-parse & bertipe), Fasilitas, Waktu Buka."""
+    df_meta = df_stats
+    if os.path.exists(INFO_PATH):
+        df_info = pd.read_csv(INFO_PATH)
+        df_info['Nama_Tempat'] = df_info['Nama_Tempat'].str.strip()
+        df_meta = df_meta.merge(
+            df_info[['Nama_Tempat', 'Photo_URL', 'Gmaps_Link', 'Facilities', 'Price_Items', 'Waktu_Buka']],
+            on='Nama_Tempat',
+            how='left'
+        )
+        print(f"   ✅ Info ditemukan untuk {len(df_info)} tempat.")
+    else:
+        print("⚠️ WARNING: 'info_tempat.csv' tidak ditemukan. Foto/Harga akan kosong.")
+        df_meta['Photo_URL'] = ""
+        df_meta['Gmaps_Link'] = ""
+        df_meta['Price_Items'] = [[] for _ in range(len(df_meta))]
+        df_meta['Facilities'] = ""
+        df_meta['Waktu_Buka'] = "Info belum tersedia"
+
+    # Harga di-parse SEKALI di sini, pembaca tinggal memakai list-nya
+    df_meta['Price_Items'] = df_meta['Price_Items'].apply(lambda x: normalize_price_items(parse_price_safe(x)))
+
+    df_meta['Photo_URL'] = df_meta['Photo_URL'].fillna(DEFAULT_PHOTO)
+    df_meta['Gmaps_Link'] = df_meta['Gmaps_Link'].fillna('')
+    df_meta['Facilities'] = df_meta['Facilities'].fillna('Fasilitas standar')
+    df_meta['Waktu_Buka'] = df_meta['Waktu_Buka'].fillna('Cek Gmaps')
+    df_meta['Avg_Rating'] = df_meta['Avg_Rating'].astype(float)
+    return df_meta.set_index('Nama_Tempat')
+
+def write_metadata(df_meta):
+    utils.save_metadata(df_meta, METADATA_PATH)
+
+# ================= MAIN =================
+def build_metadata(force=False):
+    """
+    Menyusun metadata UI (rating, lokasi, foto, harga) TANPA menyentuh model AI.
+    Dilewati jika corpus, info_tempat.csv, dan file input harga/fasilitas tidak berubah.
+    """
+    print("\n" + "="*60)
+    print("📦 MENYUSUN METADATA TEMPAT (FOTO, HARGA, RATING)")
+    print("="*60)
+    start = time.time()
+
+    if not os.path.exists(CORPUS_PATH):
+        print(f"❌ Error: Corpus tidak ditemukan di {CORPUS_PATH}")
+        return False
+
+    refresh_info_tempat()
+
+    old = load_stamp()
+    stamp = {
+        "corpus": _file_stamp(CORPUS_PATH),
+        "info_tempat": _file_stamp(INFO_PATH),
+        "schema_version": utils.METADATA_SCHEMA_VERSION,
+    }
+    output_ok = utils.read_metadata_schema_version(METADATA_PATH) == utils.METADATA_SCHEMA_VERSION
+    if not force and output_ok and all(old.get(k) == v for k, v in stamp.items()):
+        print("✅ Input tidak berubah, metadata sudah terbaru. (Pakai --force untuk build ulang)")
+        return True
+
+    # Rating hanya dihitung ulang jika corpus berubah; jika hasilnya sama & info tetap, tidak perlu tulis
+    df_stats = compute_place_stats()
+    stamp["stats_hash"] = _stats_hash(df_stats)
+    if not force and output_ok and old.get("info_tempat") == stamp["info_tempat"] \
+            and old.get("stats_hash") == stamp["stats_hash"]:
+        save_stamp(stamp)
+        print("✅ Corpus berubah tetapi rating & lokasi tetap. Metadata tidak perlu ditulis ulang.")
+        return True
+
+    print("🔧 Menggabungkan Rating, Lokasi, Foto & Harga...")
+    df_meta = merge_info(df_stats)
+    write_metadata(df_meta)
+    save_stamp(stamp)
+
+    print(f"🎉 SELESAI! {len(df_meta)} tempat ditulis dalam {time.time() - start:.2f} detik.")
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build metadata tempat (terpisah dari training AI)")
+    parser.add_argument('--force', action='store_true', help="Build ulang walaupun input tidak berubah")
+    args = parser.parse_args()
+    build_metadata(force=args.force)
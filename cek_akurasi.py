@@ -11,6 +11,18 @@ except ImportError as e:
     print(f"❌ Error Import: {e}")
     sys.exit()
 
+# DAFTAR QUERY YANG AKAN DIUJI
+# Kita uji kasus-kasus yang kemarin bermasalah
+TEST_QUERIES = [
+    "kamar mandi bersih",  # Uji: Apakah review "kotor" masih muncul?
+    "tempat angker",       # Uji: Apakah tempat biasa (non-seram) masih dapat skor tinggi?
+    "pemandangan bagus",   # Uji: Kualitas umum
+    "jogja",               # Uji: Filter wilayah (Harusnya tidak ada Semarang/Jateng)
+    "jawa tengah",         # Uji: Filter wilayah (Harusnya tidak ada Jogja/Sleman)
+    "tidak rekomen",       # Uji: Sentimen negatif
+    "semua tempat"         # Uji: Intent ALL
+]
+
 def run_test():
     print("⏳ Sedang memuat AI Engine (Tunggu sebentar)...")
     engine = SmartSearchEngine()
@@ -21,19 +33,7 @@ def run_test():
 
     print("✅ Engine SIAP! Memulai pengujian...\n")
 
-    # DAFTAR QUERY YANG AKAN DIUJI
-    # Kita uji kasus-kasus yang kemarin bermasalah
-    test_queries = [
-        "kamar mandi bersih",  # Uji: Apakah review "kotor" masih muncul?
-        "tempat angker",       # Uji: Apakah tempat biasa (non-seram) masih dapat skor tinggi?
-        "pemandangan bagus",   # Uji: Kualitas umum
-        "jogja",               # Uji: Filter wilayah (Harusnya tidak ada Semarang/Jateng)
-        "jawa tengah",         # Uji: Filter wilayah (Harusnya tidak ada Jogja/Sleman)
-        "tidak rekomen",       # Uji: Sentimen negatif
-        "semua tempat"         # Uji: Intent ALL
-    ]
-
-    for query in test_queries:
+    for query in TEST_QUERIES:
         print("="*60)
         print(f"🔎 QUERY: '{query}'")
         print("="*60)
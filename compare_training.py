@@ -0,0 +1,51 @@
+import os
+import json
+from advanced_evaluation import evaluate
+from Asisten.smart_search import SmartSearchEngine
+
+# ================= KONFIGURASI =================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODELS_DIR = os.path.join(BASE_DIR, 'Assets', 'models')
+MANIFEST_PATH = os.path.join(MODELS_DIR, 'manifest.json')
+
+def compare_training_modes():
+    """Membandingkan versi FULL vs INCREMENTAL terakhir: waktu training & kualitas (F1)."""
+    print("\n" + "="*60)
+    print("⚖️  FULL RETRAIN vs INCREMENTAL UPDATE")
+    print("="*60)
+
+    if not os.path.exists(MANIFEST_PATH):
+        print("❌ Manifest belum ada. Jalankan 'python train_w2v.py' dulu.")
+        return
+
+    with open(MANIFEST_PATH, 'r', encoding='utf-8') as f:
+        versions = json.load(f)['versions']
+
+    latest = {}
+    for v in versions:
+        latest[v['mode']] = v # Versi terakhir per mode
+
+    if 'full' not in latest or 'incremental' not in latest:
+        print("⚠️ Butuh minimal 1 versi 'full' dan 1 versi 'incremental'.")
+        print("   Jalankan: python train_w2v.py --mode full  lalu  python train_w2v.py --mode incremental")
+        return
+
+    rows = []
+    for mode in ('full', 'incremental'):
+        v = latest[mode]
+        engine = SmartSearchEngine(model_path=os.path.join(MODELS_DIR, v['file']))
+        if not engine.is_ready:
+            print(f"❌ Engine gagal dimuat untuk v{v['version']:03d}.")
+            return
+        f1 = evaluate(engine, f"v{v['version']:03d} ({mode})")
+        rows.append((mode, v, f1))
+
+    print("\n" + "-" * 75)
+    print(f"{'MODE':<12} | {'VERSI':<6} | {'KALIMAT':<8} | {'EPOCH':<5} | {'WAKTU (s)':<9} | {'VOCAB':<6} | {'F1':<5}")
+    print("-" * 75)
+    for mode, v, f1 in rows:
+        print(f"{mode:<12} | v{v['version']:03d}  | {v['corpus_count']:<8} | {v['epochs']:<5} | {v['wall_time_sec']:<9} | {v['vocab_size']:<6} | {f1:.2f}")
+    print("-" * 75)
+
+if __name__ == "__main__":
+    compare_training_modes()
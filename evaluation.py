@@ -1,8 +1,6 @@
 import pandas as pd
 import numpy as np
 import warnings
-from nltk.translate.bleu_score import sentence_bleu, SmoothingFunction
-from rouge_score import rouge_scorer
 
 # Import Engine dari Folder Asisten
 try:
@@ -13,7 +11,20 @@ except ImportError:
 
 warnings.filterwarnings("ignore")
 
+# --- DATASET PENGUJIAN ---
+TEST_CASES = [
+    {"query": "kamar mandi bersih", "reference": "toilet wangi kamar mandi bersih terawat air lancar"},
+    {"query": "pemandangan gunung merapi", "reference": "view gunung merapi terlihat jelas indah sekali pagi hari"},
+    {"query": "akses jalan mobil mudah", "reference": "akses jalan aspal mulus bisa masuk mobil sampai lokasi parkir luas"},
+    {"query": "tidak angker dan aman", "reference": "tempat nyaman aman penjaga ramah tidak seram lampu terang"},
+    {"query": "pantai pasir putih", "reference": "pantai ngrumput pinggir laut pasir putih ombak tenang"}
+]
+
 def calculate_metrics():
+    # Import di sini agar TEST_CASES bisa dipakai script lain tanpa nltk/rouge
+    from nltk.translate.bleu_score import sentence_bleu, SmoothingFunction
+    from rouge_score import rouge_scorer
+
     print("\n⏳ Memuat AI Engine...")
     engine = SmartSearchEngine()
     
@@ -21,23 +32,14 @@ def calculate_metrics():
         print("❌ Engine belum siap (Cek apakah word2vec.model ada?).")
         return
 
-    # --- DATASET PENGUJIAN ---
-    test_cases = [
-        {"query": "kamar mandi bersih", "reference": "toilet wangi kamar mandi bersih terawat air lancar"},
-        {"query": "pemandangan gunung merapi", "reference": "view gunung merapi terlihat jelas indah sekali pagi hari"},
-        {"query": "akses jalan mobil mudah", "reference": "akses jalan aspal mulus bisa masuk mobil sampai lokasi parkir luas"},
-        {"query": "tidak angker dan aman", "reference": "tempat nyaman aman penjaga ramah tidak seram lampu terang"},
-        {"query": "pantai pasir putih", "reference": "pantai ngrumput pinggir laut pasir putih ombak tenang"}
-    ]
-
-    print(f"\n📊 MEMULAI EVALUASI PADA {len(test_cases)} SKENARIO UJI")
+    print(f"\n📊 MEMULAI EVALUASI PADA {len(TEST_CASES)} SKENARIO UJI")
     print("="*60)
 
     results = []
     rouge = rouge_scorer.RougeScorer(['rouge1', 'rougeL'], use_stemmer=True)
     smooth = SmoothingFunction().method1
 
-    for case in test_cases:
+    for case in TEST_CASES:
         query = case['query']
         ref = case['reference']
         
@@ -1,6 +1,7 @@
 import os
 import sys
 import getpass
+import sqlite3
 import pandas as pd
 from datetime import datetime, timedelta
 
@@ -147,6 +148,8 @@ def flow_pencarian():
             continue
             
         df = df.reset_index(drop=True)
+        # Detail semua hasil diambil sekaligus (3 query) sebelum user memilih
+        details = db.get_places_details_many(df['ID Tempat'].tolist()) if 'ID Tempat' in df else {}
         
         # Loop Tampilan Hasil
         while True:
@@ -172,7 +175,8 @@ def flow_pencarian():
                 # Validasi index sesuai panjang data (bukan label)
                 if 0 <= idx < len(df):
                     selected_row = df.iloc[idx]
-                    sukses_booking = flow_detail_tempat(selected_row)
+                    pid = int(selected_row['ID Tempat']) if 'ID Tempat' in selected_row else None
+                    sukses_booking = flow_detail_tempat(selected_row, details.get(pid))
                     if sukses_booking: 
                         break 
                 else:
@@ -181,10 +185,10 @@ def flow_pencarian():
             except ValueError:
                 pass
 
-def flow_detail_tempat(row):
+def flow_detail_tempat(row, detail=None):
     nama = row['Nama Tempat']
-    place_id = db.get_place_by_name(nama)
-    detail = db.get_place_details(place_id)
+    place_id = int(row['ID Tempat']) if 'ID Tempat' in row else db.get_place_by_name(nama)
+    if detail is None: detail = db.get_place_details(place_id)
     info = detail['info']
     
     print_header(f"DETAIL: {nama}")
@@ -321,28 +325,40 @@ def flow_tiket_saya():
 
 # ================= ADMIN =================
 def menu_admin_dashboard():
+    pages = [None] # Kursor keyset: id terkecil halaman sebelumnya
     while True:
         if not CURRENT_USER or CURRENT_USER['role'] != 'admin': break
         print_header("ADMIN DASHBOARD")
-        df = db.get_all_bookings_admin()
+        summary = db.get_booking_summary()
+        print(f"📦 Total: {summary['total']} | 💰 Pendapatan: {format_rp(summary['pendapatan'])} | ⏳ Perlu Konfirmasi: {summary['pending']}")
+        df = db.get_bookings_admin_page(limit=10, before_id=pages[-1])
         
         if df.empty: print("📭 Kosong.")
         else:
-            view = df[['id', 'username', 'nama', 'tanggal_checkin', 'status']].head(10)
+            view = df[['id', 'username', 'nama', 'tanggal_checkin', 'status']]
             print(tabulate(view, headers=["ID", "User", "Tempat", "Tanggal", "Status"], tablefmt="grid", showindex=False))
+            print(f"[Halaman {len(pages)}]")
             
         print("\n1. ✅ Proses (Approve/Reject)")
+        if len(df) >= 10: print("2. ➡️ Halaman berikutnya")
+        if len(pages) > 1: print("3. ⬅️ Halaman sebelumnya")
         print("0. 🚪 Logout Admin")
         p = input_clean("Pilih")
         
-        if p == '1':
-            tid = input_clean("ID Transaksi")
-            if tid.isdigit():
+        if p == '2' and len(df) >= 10: pages.append(int(df['id'].min()))
+        elif p == '3' and len(pages) > 1: pages.pop()
+        elif p == '1':
+            # Bisa banyak sekaligus, contoh: 12,13,15 (diproses dalam satu transaksi)
+            tids = [t.strip() for t in input_clean("ID Transaksi (pisahkan koma)").split(',')]
+            if tids and all(t.isdigit() for t in tids):
                 act = input_clean("1=Terima, 2=Tolak")
                 stat = 'CONFIRMED' if act == '1' else 'CANCELLED' if act == '2' else None
                 if stat:
-                    db.update_booking_status(tid, stat)
-                    print(f"✅ Status -> {stat}")
+                    try:
+                        n = db.update_booking_status_many(tids, stat)
+                        print(f"✅ {n} pesanan -> {stat}")
+                    except sqlite3.OperationalError as e:
+                        print(f"❌ Gagal memperbarui pesanan (database sibuk), coba lagi: {e}")
             pause()
         elif p == '0':
             do_logout()
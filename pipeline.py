@@ -22,7 +22,7 @@ def print_header():
     print("   (Scraping -> CSV Pipeline -> Database -> AI)")
     print("="*60)
 
-def run_script(script_name, folder="", description=""):
+def run_script(script_name, folder="", description="", args=None):
     """
     Menjalankan script python lain dengan path yang benar.
     """
@@ -47,7 +47,7 @@ def run_script(script_name, folder="", description=""):
     
     try:
         # Menjalankan script sebagai subprocess
-        result = subprocess.run([PYTHON_EXE, script_path], check=True)
+        result = subprocess.run([PYTHON_EXE, script_path] + (args or []), check=True)
         if result.returncode == 0:
             print(f"✅ SUKSES.")
             return True
@@ -103,6 +103,9 @@ def menu_update_csv():
     # 3. KONVERSI METADATA
     if not run_script('konversi_data.py', folder='Asisten', description="3. Integrasi Harga & Fasilitas"): return
 
+    # 3b. METADATA UI (hanya dibangun ulang jika input berubah)
+    if not run_script('build_metadata.py', description="3b. Menyusun Metadata Tempat"): return
+
     # 4. GENERATE SCORECARD
     if not run_script('scorecard_generator.py', folder='Asisten', description="4. Membuat Rapor & Insight"): return
 
@@ -118,9 +121,13 @@ def menu_database_ai():
         print("1. 🔥 ONE-CLICK RESET (Hapus DB -> Import CSV -> Train AI)")
         print("2. 📥 Import CSV ke Database Saja")
         print("3. 🧠 Train AI (Word2Vec) Saja")
+        print("4. ⚡ Update AI Inkremental (Hanya Ulasan Baru)")
+        print("5. 🖼️ Refresh Metadata (Foto/Harga/Rating) Saja")
+        print("6. 🧱 Migrasi Skema Database (Tanpa Hapus Data)")
+        print("7. 📊 Rollup Analitik Pencarian")
         print("0. Kembali")
         
-        pilihan = input("\nPilih menu (0-3): ").strip()
+        pilihan = input("\nPilih menu (0-7): ").strip()
         
         if pilihan == '1':
             confirm = input("⚠️  HAPUS 'camping.db' dan buat ulang dari CSV? (y/n): ").lower()
@@ -130,6 +137,9 @@ def menu_database_ai():
                 if os.path.exists("camping.db"):
                     os.remove("camping.db")
                     print("\n🗑️  Database lama dihapus.")
+                # File pendamping mode WAL harus ikut dihapus agar tidak diterapkan ke DB baru
+                for ext in ("-wal", "-shm"):
+                    if os.path.exists("camping.db" + ext): os.remove("camping.db" + ext)
                 
                 # 2. Setup Database (Tabel Baru)
                 # Kita panggil scripts/setup_db.py jika ada, atau andalkan db_handler
@@ -143,6 +153,8 @@ def menu_database_ai():
                 if run_script("scripts/update_db.py", description="2. Mengimpor Data dari CSV ke SQLite"):
                     # 4. Train AI
                     run_script("train_w2v.py", description="3. Melatih Kecerdasan AI")
+                    run_script("build_metadata.py", description="4. Menyusun Metadata Tempat")
+                    run_script("scripts/rollup_analitik.py", description="5. Rollup Analitik Pencarian")
                 else:
                     print("❌ Gagal Import: Pastikan 'scripts/update_db.py' ada!")
 
@@ -157,6 +169,22 @@ def menu_database_ai():
             run_script("train_w2v.py", description="Training Word2Vec dari Database")
             input("Tekan Enter...")
 
+        elif pilihan == '4':
+            run_script("train_w2v.py", description="Update Word2Vec Inkremental", args=["--mode", "incremental"])
+            input("Tekan Enter...")
+
+        elif pilihan == '5':
+            run_script("build_metadata.py", description="Menyusun Metadata Tempat (Tanpa Training)")
+            input("Tekan Enter...")
+
+        elif pilihan == '6':
+            run_script("scripts/setup_db.py", description="Menjalankan Migrasi Skema Database")
+            input("Tekan Enter...")
+
+        elif pilihan == '7':
+            run_script("scripts/rollup_analitik.py", description="Rollup Riwayat Pencarian (Per Jam & Per Hari)")
+            input("Tekan Enter...")
+
         elif pilihan == '0':
             break
 
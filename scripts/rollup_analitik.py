@@ -0,0 +1,126 @@
+import sqlite3
+import os
+import time
+from collections import Counter
+
+# --- SETUP PATH ---
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(CURRENT_DIR)
+DB_PATH = os.path.join(ROOT_DIR, 'camping.db')
+
+# ================= KONFIGURASI =================
+ROLLUP_BATCH = 50_000    # Baris riwayat per transaksi
+GRANULARITAS = {'jam': 13, 'hari': 10} # Panjang prefix kolom waktu ("YYYY-MM-DD HH:MM:SS")
+# Batas atas bucket latensi (detik). Histogram bisa dijumlahkan antar periode -> persentil tetap bisa dihitung
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+TANPA_REGION = '(semua)'
+TANPA_INTENT = '(umum)'
+
+def latency_bucket(durasi):
+    for batas in LATENCY_BUCKETS:
+        if durasi <= batas: return str(batas)
+    return 'inf'
+
+def percentile_from_buckets(bucket_counts, q):
+    """Persentil (0-1) dari histogram {batas_atas: jumlah}: batas atas bucket tempat persentil jatuh."""
+    total = sum(bucket_counts.values())
+    if not total: return None
+    target = q * total
+    running = 0
+    for batas in sorted(bucket_counts, key=float): # float('inf') ikut terurut paling akhir
+        running += bucket_counts[batas]
+        if running >= target: return float(batas)
+    return None
+
+def rollup_batch(conn, batch_size=ROLLUP_BATCH):
+    """
+    Memasukkan riwayat baru (id > high-water mark) ke rollup per jam & per hari, lalu menggeser
+    high-water mark. Harus dipanggil di dalam transaksi (rollup & mark berubah bersama, tidak
+    ada baris yang terhitung dua kali). Mengembalikan jumlah baris riwayat yang diproses.
+    """
+    hwm = conn.execute("SELECT nilai FROM analitik_state WHERE nama = 'riwayat_id'").fetchone()[0]
+    rows = conn.execute("""
+        SELECT id, waktu, query_user, jumlah_hasil, region, intent, durasi_detik
+        FROM riwayat WHERE id > ? ORDER BY id LIMIT ?
+    """, (hwm, batch_size)).fetchall()
+    if not rows: return 0
+
+    periode = Counter()   # (granularitas, periode) -> jumlah
+    terukur = Counter()   # Baris dengan jumlah hasil & durasi diketahui (impor CSV lama: NULL)
+    nol = Counter()
+    durasi = Counter()
+    dimensi = Counter()   # (granularitas, periode, dimensi, nilai) -> jumlah
+    for _, waktu, query, jumlah_hasil, region, intent, durasi_detik in rows:
+        if not waktu or len(waktu) < 13: continue
+        measured = jumlah_hasil is not None and durasi_detik is not None
+        values = [
+            ('query', str(query or '').strip().lower()),
+            ('region', region or TANPA_REGION),
+            ('intent', intent or TANPA_INTENT),
+        ]
+        if measured: values.append(('durasi', latency_bucket(float(durasi_detik))))
+        for gran, panjang in GRANULARITAS.items():
+            key = (gran, waktu[:panjang])
+            periode[key] += 1
+            if measured:
+                terukur[key] += 1
+                durasi[key] += float(durasi_detik)
+                if not jumlah_hasil: nol[key] += 1
+            for dim, nilai in values:
+                if nilai: dimensi[key + (dim, nilai)] += 1
+
+    conn.executemany("""
+        INSERT INTO analitik_pencarian (granularitas, periode, jumlah, terukur, nol_hasil, total_durasi) VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT (granularitas, periode) DO UPDATE SET
+            jumlah = jumlah + excluded.jumlah,
+            terukur = terukur + excluded.terukur,
+            nol_hasil = nol_hasil + excluded.nol_hasil,
+            total_durasi = total_durasi + excluded.total_durasi
+    """, [key + (n, terukur[key], nol[key], durasi[key]) for key, n in periode.items()])
+    conn.executemany("""
+        INSERT INTO analitik_dimensi (granularitas, periode, dimensi, nilai, jumlah) VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (granularitas, periode, dimensi, nilai) DO UPDATE SET jumlah = jumlah + excluded.jumlah
+    """, [key + (n,) for key, n in dimensi.items()])
+    conn.execute("UPDATE analitik_state SET nilai = ? WHERE nama = 'riwayat_id'", (rows[-1][0],))
+    return len(rows)
+
+def rebuild(conn):
+    """Kosongkan rollup & mulai ulang dari riwayat.id pertama (mis. setelah riwayat diimpor ulang)."""
+    conn.execute("DELETE FROM analitik_pencarian")
+    conn.execute("DELETE FROM analitik_dimensi")
+    conn.execute("UPDATE analitik_state SET nilai = 0 WHERE nama = 'riwayat_id'")
+
+def run_rollup(db_path=DB_PATH, full=False):
+    print("📊 ROLLUP ANALITIK PENCARIAN (PER JAM & PER HARI)")
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.isolation_level = None # Transaksi diatur manual, satu per batch
+    start = time.time()
+    total = 0
+    try:
+        if full:
+            conn.execute("BEGIN IMMEDIATE"); rebuild(conn); conn.execute("COMMIT")
+        while True:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                n = rollup_batch(conn)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            if not n: break
+            total += n
+            print(f"   ⏳ {total} baris riwayat diproses...")
+    except sqlite3.OperationalError as e:
+        print(f"❌ Gagal rollup (sudah migrasi v10? jalankan scripts/setup_db.py): {e}")
+        return 0
+    finally:
+        conn.close()
+    print(f"✅ Selesai: {total} baris baru dalam {time.time() - start:.2f} detik.")
+    return total
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Rollup inkremental tabel riwayat ke tabel analitik")
+    parser.add_argument('--full', action='store_true', help="Hitung ulang semua rollup dari awal")
+    args = parser.parse_args()
+    run_rollup(full=args.full)
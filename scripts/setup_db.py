@@ -1,17 +1,18 @@
 import sqlite3
 import os
 import hashlib
+from collections import Counter
 
 # --- SETUP PATH ---
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 ROOT_DIR = os.path.dirname(CURRENT_DIR)
 DB_PATH = os.path.join(ROOT_DIR, 'camping.db')
 
-def create_tables():
-    print(f"🔨 Membuat struktur database di: {DB_PATH}")
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+# ================= MIGRASI SKEMA (BERVERSI) =================
+# Setiap langkah dijalankan SEKALI, berurutan, dalam transaksi sendiri, lalu dicatat di
+# tabel schema_version. Tambahkan langkah baru di AKHIR daftar; jangan ubah langkah lama.
 
+def _v1_tabel_dasar(cursor):
     # 1. Tabel TEMPAT (Master Data)
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS tempat (
@@ -104,6 +105,312 @@ def create_tables():
         )
     ''')
 
+def _v2_index_jalur_cepat(cursor):
+    # Detail tempat (harga/fasilitas/ulasan per tempat_id)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_ulasan_tempat ON ulasan (tempat_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_harga_tempat ON harga (tempat_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_fasilitas_tempat ON fasilitas (tempat_id)")
+    # Booking milik user (ORDER BY id DESC ikut terpakai karena rowid ada di ujung index)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_bookings_user ON bookings (user_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_bookings_status ON bookings (status)")
+    # Riwayat: retensi & rekap per waktu (urutan terbaru memakai rowid/id)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_riwayat_waktu ON riwayat (waktu)")
+
+def _v3_lookup_tempat(cursor):
+    # Nomor versi data per tabel, dinaikkan trigger -> cache di memori tahu kapan harus dimuat ulang
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS data_version (
+            tabel TEXT PRIMARY KEY,
+            versi INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    cursor.execute("INSERT OR IGNORE INTO data_version (tabel, versi) VALUES ('tempat', 0)")
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_tempat_versi_{event.lower()} AFTER {event} ON tempat
+            BEGIN UPDATE data_version SET versi = versi + 1 WHERE tabel = 'tempat'; END
+        """)
+
+    # Index teks nama tempat untuk pencarian nama yang tidak persis (trigram: cocok sebagian kata)
+    try:
+        cursor.execute("CREATE VIRTUAL TABLE IF NOT EXISTS tempat_fts USING fts5("
+                       "nama, content='tempat', content_rowid='id', tokenize='trigram')")
+    except sqlite3.OperationalError:
+        # SQLite < 3.34 belum punya tokenizer trigram -> cocok per kata
+        cursor.execute("CREATE VIRTUAL TABLE IF NOT EXISTS tempat_fts USING fts5("
+                       "nama, content='tempat', content_rowid='id')")
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_tempat_fts_insert AFTER INSERT ON tempat
+        BEGIN INSERT INTO tempat_fts (rowid, nama) VALUES (new.id, new.nama); END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_tempat_fts_delete AFTER DELETE ON tempat
+        BEGIN INSERT INTO tempat_fts (tempat_fts, rowid, nama) VALUES ('delete', old.id, old.nama); END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_tempat_fts_update AFTER UPDATE OF nama ON tempat
+        BEGIN
+            INSERT INTO tempat_fts (tempat_fts, rowid, nama) VALUES ('delete', old.id, old.nama);
+            INSERT INTO tempat_fts (rowid, nama) VALUES (new.id, new.nama);
+        END
+    """)
+    cursor.execute("INSERT INTO tempat_fts (tempat_fts) VALUES ('rebuild')")
+
+def _v4_fts_ulasan(cursor):
+    # Index teks ulasan (external content: teks tidak disalin, hanya index-nya) untuk FtsSearchEngine.
+    # Tokenizer per kata agar bm25() bermakna; trigger menjaga index tetap sinkron dengan import.
+    cursor.execute("CREATE VIRTUAL TABLE IF NOT EXISTS ulasan_fts USING fts5("
+                   "teks_mentah, content='ulasan', content_rowid='id', tokenize='unicode61 remove_diacritics 2')")
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_ulasan_fts_insert AFTER INSERT ON ulasan
+        BEGIN INSERT INTO ulasan_fts (rowid, teks_mentah) VALUES (new.id, new.teks_mentah); END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_ulasan_fts_delete AFTER DELETE ON ulasan
+        BEGIN INSERT INTO ulasan_fts (ulasan_fts, rowid, teks_mentah) VALUES ('delete', old.id, old.teks_mentah); END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_ulasan_fts_update AFTER UPDATE OF teks_mentah ON ulasan
+        BEGIN
+            INSERT INTO ulasan_fts (ulasan_fts, rowid, teks_mentah) VALUES ('delete', old.id, old.teks_mentah);
+            INSERT INTO ulasan_fts (rowid, teks_mentah) VALUES (new.id, new.teks_mentah);
+        END
+    """)
+    cursor.execute("INSERT INTO ulasan_fts (ulasan_fts) VALUES ('rebuild')")
+
+def _v5_versi_detail(cursor):
+    # Harga & fasilitas ikut diberi nomor versi -> cache detail tempat di DBHandler tahu kapan basi
+    for tabel in ("harga", "fasilitas"):
+        cursor.execute("INSERT OR IGNORE INTO data_version (tabel, versi) VALUES (?, 0)", (tabel,))
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{tabel}_versi_{event.lower()} AFTER {event} ON {tabel}
+                BEGIN UPDATE data_version SET versi = versi + 1 WHERE tabel = '{tabel}'; END
+            """)
+
+def _v6_ringkasan_booking(cursor):
+    # Penghitung per status (jumlah & total harga) diperbarui trigger di transaksi yang sama dengan
+    # perubahan bookings -> dashboard admin cukup membaca beberapa baris, bukan scan semua pesanan
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS booking_summary (
+            status TEXT PRIMARY KEY,
+            jumlah INTEGER NOT NULL DEFAULT 0,
+            total_harga REAL NOT NULL DEFAULT 0
+        )
+    """)
+    cursor.execute("DELETE FROM booking_summary")
+    cursor.execute("""
+        INSERT INTO booking_summary (status, jumlah, total_harga)
+        SELECT COALESCE(status, 'PENDING'), COUNT(*), COALESCE(SUM(total_harga), 0) FROM bookings
+        GROUP BY COALESCE(status, 'PENDING')
+    """)
+    tambah = """
+        INSERT INTO booking_summary (status, jumlah, total_harga)
+        VALUES (COALESCE(new.status, 'PENDING'), 1, COALESCE(new.total_harga, 0))
+        ON CONFLICT (status) DO UPDATE SET jumlah = jumlah + 1, total_harga = total_harga + excluded.total_harga;
+    """
+    kurang = """
+        UPDATE booking_summary SET jumlah = jumlah - 1, total_harga = total_harga - COALESCE(old.total_harga, 0)
+        WHERE status = COALESCE(old.status, 'PENDING');
+    """
+    cursor.execute(f"CREATE TRIGGER IF NOT EXISTS trg_bookings_ringkasan_insert AFTER INSERT ON bookings BEGIN {tambah} END")
+    cursor.execute(f"CREATE TRIGGER IF NOT EXISTS trg_bookings_ringkasan_delete AFTER DELETE ON bookings BEGIN {kurang} END")
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_bookings_ringkasan_update AFTER UPDATE OF status, total_harga ON bookings
+        BEGIN {kurang} {tambah} END
+    """)
+
+def _v7_idempotensi_booking(cursor):
+    # Kunci idempotensi: submit ulang (klik ganda / rerun Streamlit) tidak membuat pesanan kedua.
+    # NULL boleh berulang (pesanan lama & kode yang tidak mengirim kunci).
+    kolom = [r[1] for r in cursor.execute("PRAGMA table_info(bookings)")]
+    if 'idempotency_key' not in kolom:
+        cursor.execute("ALTER TABLE bookings ADD COLUMN idempotency_key TEXT")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_bookings_idempotensi ON bookings (idempotency_key)")
+
+def _v8_analitik_pencarian(cursor):
+    # Rollup riwayat per jam & per hari (diisi scripts/rollup_analitik.py, inkremental per riwayat.id)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS analitik_pencarian (
+            granularitas TEXT NOT NULL,     -- 'jam' (YYYY-MM-DD HH) | 'hari' (YYYY-MM-DD)
+            periode TEXT NOT NULL,
+            jumlah INTEGER NOT NULL DEFAULT 0,
+            nol_hasil INTEGER NOT NULL DEFAULT 0,
+            total_durasi REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (granularitas, periode)
+        ) WITHOUT ROWID
+    """)
+    # Sebaran per dimensi: 'query', 'region', 'intent', dan 'durasi' (histogram latensi per bucket)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS analitik_dimensi (
+            granularitas TEXT NOT NULL,
+            periode TEXT NOT NULL,
+            dimensi TEXT NOT NULL,
+            nilai TEXT NOT NULL,
+            jumlah INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (granularitas, periode, dimensi, nilai)
+        ) WITHOUT ROWID
+    """)
+    # High-water mark: riwayat.id terakhir yang sudah masuk rollup
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS analitik_state (
+            nama TEXT PRIMARY KEY,
+            nilai INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    cursor.execute("INSERT OR IGNORE INTO analitik_state (nama, nilai) VALUES ('riwayat_id', 0)")
+
+def review_hash(nama_tempat, teks, waktu):
+    """Sidik ulasan yang stabil (nama tempat + teks + waktu): kunci unik untuk impor idempoten."""
+    parts = ['' if v is None else str(v) for v in (nama_tempat, teks, waktu)]
+    return hashlib.sha1("\x1f".join(parts).encode('utf-8')).hexdigest()
+
+def _v9_impor_idempoten(cursor):
+    # 1. Ulasan: kolom sidik isi + backfill, duplikat lama (hasil impor berulang) dibuang, lalu UNIQUE
+    kolom = [r[1] for r in cursor.execute("PRAGMA table_info(ulasan)")]
+    if 'content_hash' not in kolom:
+        cursor.execute("ALTER TABLE ulasan ADD COLUMN content_hash TEXT")
+    rows = cursor.execute("""
+        SELECT u.id, t.nama, u.teks_mentah, u.waktu_ulasan FROM ulasan u
+        LEFT JOIN tempat t ON t.id = u.tempat_id WHERE u.content_hash IS NULL
+    """).fetchall()
+    cursor.executemany("UPDATE ulasan SET content_hash = ? WHERE id = ?",
+                       [(review_hash(nama, teks, waktu), uid) for uid, nama, teks, waktu in rows])
+    cursor.execute("DELETE FROM ulasan WHERE id NOT IN (SELECT MIN(id) FROM ulasan GROUP BY content_hash)")
+    if cursor.rowcount > 0: print(f"   🧹 {cursor.rowcount} ulasan duplikat dihapus.")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_ulasan_hash ON ulasan (content_hash)")
+
+    # 2. Fasilitas: satu baris per (tempat, fasilitas)
+    cursor.execute("DELETE FROM fasilitas WHERE id NOT IN (SELECT MIN(id) FROM fasilitas GROUP BY tempat_id, nama_fasilitas)")
+    if cursor.rowcount > 0: print(f"   🧹 {cursor.rowcount} fasilitas duplikat dihapus.")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_fasilitas_unik ON fasilitas (tempat_id, nama_fasilitas)")
+
+    # 3. Checkpoint per file sumber update_db.py (sidik file & posisi baca untuk log yang hanya bertambah)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS import_checkpoint (
+            sumber TEXT PRIMARY KEY,
+            sidik TEXT,
+            byte_offset INTEGER NOT NULL DEFAULT 0,
+            baris INTEGER NOT NULL DEFAULT 0,
+            diperbarui TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+def _v10_riwayat_terukur(cursor):
+    import rollup_analitik
+    # Rollup: jumlah baris yang hasil & durasinya terukur (penyebut % tanpa hasil & latensi)
+    kolom = [r[1] for r in cursor.execute("PRAGMA table_info(analitik_pencarian)")]
+    if 'terukur' not in kolom:
+        cursor.execute("ALTER TABLE analitik_pencarian ADD COLUMN terukur INTEGER NOT NULL DEFAULT 0")
+        cursor.execute("UPDATE analitik_pencarian SET terukur = jumlah")
+
+    # Riwayat hasil impor CSV (update_db.py) tidak punya jumlah hasil & durasi: tersimpan 0/0 -> NULL.
+    # Yang sudah masuk rollup dikurangi di tempat (tanpa rebuild: periode yang riwayatnya sudah
+    # dihapus retensi tetap utuh).
+    unmeasured = "COALESCE(jumlah_hasil, 0) = 0 AND COALESCE(durasi_detik, 0) = 0"
+    hwm = cursor.execute("SELECT nilai FROM analitik_state WHERE nama = 'riwayat_id'").fetchone()[0]
+    per_periode = Counter()
+    for (waktu,) in cursor.execute(f"SELECT waktu FROM riwayat WHERE id <= ? AND {unmeasured}", (hwm,)):
+        if not waktu or len(waktu) < 13: continue # Sama seperti rollup_batch: tidak pernah dihitung
+        for gran, panjang in rollup_analitik.GRANULARITAS.items():
+            per_periode[(gran, waktu[:panjang])] += 1
+    cursor.executemany("""
+        UPDATE analitik_pencarian SET terukur = terukur - ?, nol_hasil = nol_hasil - ?
+        WHERE granularitas = ? AND periode = ?
+    """, [(n, n) + key for key, n in per_periode.items()])
+    cursor.executemany("""
+        UPDATE analitik_dimensi SET jumlah = jumlah - ?
+        WHERE granularitas = ? AND periode = ? AND dimensi = 'durasi' AND nilai = ?
+    """, [(n,) + key + (rollup_analitik.latency_bucket(0.0),) for key, n in per_periode.items()])
+    cursor.execute("DELETE FROM analitik_dimensi WHERE dimensi = 'durasi' AND jumlah <= 0")
+    cursor.execute(f"UPDATE riwayat SET jumlah_hasil = NULL, durasi_detik = NULL WHERE {unmeasured}")
+    if cursor.rowcount > 0: print(f"   🧹 {cursor.rowcount} riwayat tanpa hasil/durasi ditandai tidak terukur.")
+
+MIGRATIONS = [
+    (1, "Tabel dasar (tempat, harga, fasilitas, ulasan, users, bookings, riwayat)", _v1_tabel_dasar),
+    (2, "Index jalur cepat DBHandler", _v2_index_jalur_cepat),
+    (3, "Versi data & index FTS5 nama tempat", _v3_lookup_tempat),
+    (4, "Index FTS5 teks ulasan (bm25)", _v4_fts_ulasan),
+    (5, "Versi data harga & fasilitas (cache detail tempat)", _v5_versi_detail),
+    (6, "Ringkasan booking per status (dashboard admin)", _v6_ringkasan_booking),
+    (7, "Kunci idempotensi booking", _v7_idempotensi_booking),
+    (8, "Rollup analitik pencarian (per jam & per hari)", _v8_analitik_pencarian),
+    (9, "Impor idempoten (hash ulasan, fasilitas unik, checkpoint file)", _v9_impor_idempoten),
+    (10, "Riwayat tanpa hasil/durasi tidak ikut statistik (kolom terukur)", _v10_riwayat_terukur),
+]
+
+DETAIL_TABLES = ("tempat", "harga", "fasilitas") # Sumber detail tempat (lihat DBHandler.get_place_details)
+
+def suspend_ulasan_indexes(cursor):
+    """
+    Untuk impor massal: lepas index tempat_id & trigger FTS ulasan agar INSERT tidak memperbarui
+    index per baris. Mengembalikan nama yang dilepas (untuk restore_ulasan_indexes).
+    """
+    suspended = {r[0] for r in cursor.execute(
+        "SELECT name FROM sqlite_master WHERE name IN ('idx_ulasan_tempat', 'trg_ulasan_fts_insert')")}
+    if 'idx_ulasan_tempat' in suspended: cursor.execute("DROP INDEX idx_ulasan_tempat")
+    if 'trg_ulasan_fts_insert' in suspended: cursor.execute("DROP TRIGGER trg_ulasan_fts_insert")
+    return suspended
+
+def restore_ulasan_indexes(cursor, suspended):
+    """Membangun ulang sekaligus apa yang dilepas suspend_ulasan_indexes (jauh lebih cepat dari per baris)."""
+    if 'idx_ulasan_tempat' in suspended:
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_ulasan_tempat ON ulasan (tempat_id)")
+    if 'trg_ulasan_fts_insert' in suspended:
+        _v4_fts_ulasan(cursor) # Trigger dibuat lagi + index FTS di-rebuild dari tabel ulasan
+
+def bump_data_version(conn, tables=DETAIL_TABLES):
+    """Naikkan versi data secara eksplisit (dipanggil pipeline import di akhir transaksinya)."""
+    conn.executemany("UPDATE data_version SET versi = versi + 1 WHERE tabel = ?", [(t,) for t in tables])
+
+def get_schema_version(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            deskripsi TEXT,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+def migrate(conn):
+    """Menjalankan langkah migrasi yang belum tercatat. Mengembalikan versi skema akhir."""
+    current = get_schema_version(conn)
+    pending = [m for m in MIGRATIONS if m[0] > current]
+    if not pending:
+        return current
+
+    old_isolation = conn.isolation_level
+    conn.isolation_level = None # Transaksi diatur manual (DDL ikut di dalam transaksi)
+    try:
+        for version, deskripsi, step in pending:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Proses lain mungkin sudah menjalankan langkah ini selagi kita menunggu lock
+                if conn.execute("SELECT 1 FROM schema_version WHERE version = ?", (version,)).fetchone():
+                    conn.execute("COMMIT")
+                    continue
+                step(conn.cursor())
+                conn.execute("INSERT INTO schema_version (version, deskripsi) VALUES (?, ?)", (version, deskripsi))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            print(f"   🧱 Migrasi v{version}: {deskripsi}")
+            current = version
+        # Statistik baru untuk query planner setelah index berubah
+        conn.execute("ANALYZE")
+    finally:
+        conn.isolation_level = old_isolation
+    return current
+
+def create_tables(db_path=DB_PATH):
+    print(f"🔨 Membuat struktur database di: {db_path}")
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    version = migrate(conn)
+
     # --- SEED DATA (Admin Default) ---
     try:
         cursor.execute("SELECT * FROM users WHERE username='admin'")
@@ -118,7 +425,7 @@ def create_tables():
 
     conn.commit()
     conn.close()
-    print("✅ Tabel Database Berhasil Dibuat/Diperbarui.")
+    print(f"✅ Tabel Database Berhasil Dibuat/Diperbarui (skema v{version}).")
 
 if __name__ == "__main__":
     create_tables()
\ No newline at end of file
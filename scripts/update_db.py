@@ -3,12 +3,18 @@ import sqlite3
 import os
 import ast
 import csv
+import io
 import sys
+import time
+from collections import Counter
 
 # --- SETUP PATH ---
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 ROOT_DIR = os.path.dirname(CURRENT_DIR)
 sys.path.append(ROOT_DIR)
+sys.path.append(CURRENT_DIR)
+from src.log_writer import list_partitions
+import setup_db
 
 # CONFIG
 DOCS_DIR = os.path.join(ROOT_DIR, 'Documents')
@@ -19,130 +25,290 @@ FILE_INFO_TEMPAT = os.path.join(DOCS_DIR, 'info_tempat.csv')
 FILE_CORPUS_MASTER = os.path.join(DOCS_DIR, 'corpus_master.csv')
 FILE_INPUT_HARGA = os.path.join(DOCS_DIR, 'input_harga.csv')
 FILE_INPUT_FASILITAS = os.path.join(DOCS_DIR, 'input_fasilitas.csv')
-FILE_RIWAYAT = os.path.join(RIWAYAT_DIR, 'riwayat_pencarian.csv') 
+FILE_RIWAYAT = os.path.join(RIWAYAT_DIR, 'riwayat_pencarian.csv') # File lama + partisi harian riwayat_pencarian_YYYY-MM-DD.csv
 
-NAME_TO_ID_MAP = {}
+IMPORT_BATCH = 10_000 # Baris per executemany (semua tetap di dalam SATU transaksi)
+BULK_MIN_ROWS = 5_000 # Index ulasan hanya dilepas jika ulasan baru sebanyak ini (impor delta kecil: insert biasa)
+
+NAME_TO_ID_MAP = {}   # nama (standar) -> id, dimuat sekali dari tabel tempat
+PLACE_INFO = {}       # id -> [lokasi, rating_gmaps] untuk keputusan UPDATE tanpa SELECT
+CHANGED_ROWS = Counter() # tabel -> baris data tempat yang benar-benar berubah (penentu bump data_version)
 
 def get_db_connection(): return sqlite3.connect(DB_PATH)
 def standardize_name(name): return str(name).strip().title()
 
-def upsert_place(cursor, nama, lokasi="-", rating=0.0, gmaps="", photo="", buka=""):
+def canonical_name(nama):
     nama_clean = standardize_name(nama)
     if "Kaliurip Mount" in nama_clean: nama_clean = "Gunung Cilik Kaliurip"
     if "Gunung Cilik Kaliurip Wonosobo" in nama_clean: nama_clean = "Gunung Cilik Kaliurip"
+    return nama_clean
+
+def load_place_map(cursor):
+    """Satu SELECT untuk semua tempat; upsert_place selanjutnya cukup lookup dict."""
+    NAME_TO_ID_MAP.clear(); PLACE_INFO.clear()
+    for place_id, nama, lokasi, rating in cursor.execute("SELECT id, nama, lokasi, rating_gmaps FROM tempat"):
+        NAME_TO_ID_MAP[nama] = place_id
+        PLACE_INFO[place_id] = [lokasi, rating]
+
+def upsert_place(cursor, nama, lokasi="-", rating=0.0, gmaps="", photo="", buka=""):
+    nama_clean = canonical_name(nama)
+    place_id = NAME_TO_ID_MAP.get(nama_clean)
 
-    cursor.execute("SELECT id, lokasi, rating_gmaps FROM tempat WHERE nama = ?", (nama_clean,))
-    res = cursor.fetchone()
-    
-    if res:
-        place_id, db_lokasi, db_rating = res
+    if place_id is not None:
+        db_lokasi, db_rating = PLACE_INFO[place_id]
         update_query, update_vals = [], []
-        if (db_lokasi=="-" or db_lokasi=="") and (lokasi!="-" and lokasi!=""): update_query.append("lokasi = ?"); update_vals.append(lokasi)
-        if (db_rating==0.0) and (rating>0.0): update_query.append("rating_gmaps = ?"); update_vals.append(rating)
+        if (db_lokasi=="-" or db_lokasi=="") and (lokasi!="-" and lokasi!=""): update_query.append("lokasi = ?"); update_vals.append(lokasi); PLACE_INFO[place_id][0] = lokasi
+        if (db_rating==0.0) and (rating>0.0): update_query.append("rating_gmaps = ?"); update_vals.append(rating); PLACE_INFO[place_id][1] = rating
         if gmaps: update_query.append("gmaps_link = ?"); update_vals.append(gmaps)
         if photo: update_query.append("photo_url = ?"); update_vals.append(photo)
         if buka: update_query.append("waktu_buka = ?"); update_vals.append(buka)
 
         if update_query:
-            sql = f"UPDATE tempat SET {', '.join(update_query)} WHERE id = ?"
-            update_vals.append(place_id)
-            cursor.execute(sql, tuple(update_vals))
-        NAME_TO_ID_MAP[nama_clean] = place_id
+            # Hanya jika ada nilai yang berbeda (impor ulang file yang sama = tanpa tulis)
+            differs = " OR ".join(q.replace(" = ?", " IS NOT ?") for q in update_query)
+            sql = f"UPDATE tempat SET {', '.join(update_query)} WHERE id = ? AND ({differs})"
+            cursor.execute(sql, tuple(update_vals + [place_id] + update_vals))
+            CHANGED_ROWS['tempat'] += cursor.rowcount
         return place_id
     else:
         try:
             cursor.execute('INSERT INTO tempat (nama, lokasi, rating_gmaps, gmaps_link, photo_url, waktu_buka) VALUES (?, ?, ?, ?, ?, ?)', (nama_clean, lokasi, rating, gmaps, photo, buka))
             place_id = cursor.lastrowid
+            CHANGED_ROWS['tempat'] += 1
             NAME_TO_ID_MAP[nama_clean] = place_id
+            PLACE_INFO[place_id] = [lokasi, rating]
             return place_id
         except sqlite3.IntegrityError: return None
 
-def migrate_data():
+# ================= CHECKPOINT FILE SUMBER =================
+def _source_key(path): return os.path.relpath(path, ROOT_DIR).replace(os.sep, '/')
+
+def file_fingerprint(path):
+    st = os.stat(path)
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+def get_checkpoint(cursor, path):
+    """(sidik, byte_offset) terakhir yang sukses diimpor untuk file ini, atau (None, 0)."""
+    row = cursor.execute("SELECT sidik, byte_offset FROM import_checkpoint WHERE sumber = ?", (_source_key(path),)).fetchone()
+    return row if row else (None, 0)
+
+def save_checkpoint(cursor, path, sidik, byte_offset=0, baris=0):
+    # Ikut transaksi impor: data & checkpoint selalu berubah bersama
+    cursor.execute("""
+        INSERT INTO import_checkpoint (sumber, sidik, byte_offset, baris) VALUES (?, ?, ?, ?)
+        ON CONFLICT (sumber) DO UPDATE SET sidik = excluded.sidik, byte_offset = excluded.byte_offset,
+            baris = baris + excluded.baris, diperbarui = CURRENT_TIMESTAMP
+    """, (_source_key(path), sidik, byte_offset, baris))
+
+def source_changed(cursor, path, full=False):
+    """False jika file tidak berubah sejak impor terakhir (tahap ini dilewati)."""
+    if full or get_checkpoint(cursor, path)[0] != file_fingerprint(path): return True
+    print(f"   ⏭️ {os.path.basename(path)} tidak berubah sejak impor terakhir.")
+    return False
+
+def _first_valid(df, key, col, valid):
+    """Nilai pertama (urutan file) yang lolos `valid` per key -> dict."""
+    ok = df[valid(df[col])]
+    return ok.drop_duplicates(subset=key).set_index(key)[col].to_dict()
+
+def insert_batches(cursor, sql, rows, label):
+    """executemany per IMPORT_BATCH baris + progres baris/detik. Mengembalikan jumlah baris."""
+    start = time.time()
+    count = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= IMPORT_BATCH:
+            cursor.executemany(sql, batch); count += len(batch); batch = []
+            print(f"      ⏳ {count} {label} ({count / max(time.time() - start, 1e-9):,.0f} baris/detik)")
+    if batch:
+        cursor.executemany(sql, batch); count += len(batch)
+    elapsed = max(time.time() - start, 1e-9)
+    print(f"   ✅ {count} {label} dalam {elapsed:.2f} detik ({count / elapsed:,.0f} baris/detik)")
+    return count
+
+def migrate_data(full=False):
+    """
+    Impor inkremental & idempoten: file yang tidak berubah dilewati (checkpoint), ulasan dikenali
+    lewat sidik isi (tempat + teks + waktu), log riwayat dibaca mulai posisi terakhir.
+    full=True: CSV master dibaca ulang walau tidak berubah (ulasan/fasilitas yang sudah ada tetap tidak diduplikasi).
+    """
     conn = get_db_connection()
+    conn.isolation_level = None # Transaksi diatur manual: seluruh impor = SATU transaksi
     cursor = conn.cursor()
     cursor.execute("PRAGMA synchronous = OFF")
+    start_all = time.time()
+
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        CHANGED_ROWS.clear()
+        load_place_map(cursor)
+        suspended = set()
+
+        print("\n🚀 TAHAP 1: Migrasi Data TEMPAT (Master)...")
+        if os.path.exists(FILE_INFO_TEMPAT) and source_changed(cursor, FILE_INFO_TEMPAT, full):
+            df = pd.read_csv(FILE_INFO_TEMPAT).fillna("")
+            has_harga = {r[0] for r in cursor.execute("SELECT DISTINCT tempat_id FROM harga")}
+            harga_rows = []
+            for row in df.to_dict('records'):
+                p_id = upsert_place(cursor, row.get('Nama_Tempat'), gmaps=row.get('Gmaps_Link', ''), photo=row.get('Photo_URL', ''), buka=row.get('Waktu_Buka', ''))
+                if p_id and row.get('Price_Items') and p_id not in has_harga:
+                    try:
+                        items = ast.literal_eval(row['Price_Items'])
+                        if isinstance(items, list):
+                            harga_rows += [(p_id, it.get('item',''), it.get('harga',0), 'Umum') for it in items]
+                            has_harga.add(p_id)
+                    except: pass
+            cursor.executemany("INSERT INTO harga (tempat_id, item, harga, kategori) VALUES (?, ?, ?, ?)", harga_rows)
+            CHANGED_ROWS['harga'] += len(harga_rows)
+            save_checkpoint(cursor, FILE_INFO_TEMPAT, file_fingerprint(FILE_INFO_TEMPAT), baris=len(df))
+            print(f"   ✅ {len(df)} tempat, {len(harga_rows)} harga.")
 
-    print("\n🚀 TAHAP 1: Migrasi Data TEMPAT (Master)...")
-    if os.path.exists(FILE_INFO_TEMPAT):
-        df = pd.read_csv(FILE_INFO_TEMPAT).fillna("")
-        for _, row in df.iterrows():
-            upsert_place(cursor, row.get('Nama_Tempat'), gmaps=row.get('Gmaps_Link', ''), photo=row.get('Photo_URL', ''), buka=row.get('Waktu_Buka', ''))
-            p_id = NAME_TO_ID_MAP.get(standardize_name(row.get('Nama_Tempat')))
-            if p_id and row.get('Price_Items'):
+        print("\n🚀 TAHAP 2: Migrasi ULASAN...")
+        if os.path.exists(FILE_CORPUS_MASTER) and source_changed(cursor, FILE_CORPUS_MASTER, full):
+            sidik = file_fingerprint(FILE_CORPUS_MASTER)
+            df = pd.read_csv(FILE_CORPUS_MASTER).fillna("")
+            df['_nama'] = df['Nama_Tempat'].map(canonical_name)
+            df['_rating'] = pd.to_numeric(df['Rating'], errors='coerce').fillna(0.0) if 'Rating' in df else 0.0
+
+            # Tempat di-resolve SEKALI per nama unik (lokasi & rating pertama yang valid, sama seperti upsert per baris)
+            lokasi = _first_valid(df, '_nama', 'Lokasi', lambda s: ~s.astype(str).isin(['', '-'])) if 'Lokasi' in df else {}
+            rating = _first_valid(df, '_nama', '_rating', lambda s: s > 0.0)
+            for nama in df['_nama'].unique():
+                upsert_place(cursor, nama, lokasi=lokasi.get(nama, '-'), rating=rating.get(nama, 0.0))
+
+            df['_pid'] = df['_nama'].map(NAME_TO_ID_MAP)
+            df = df[df['_pid'].notna()]
+            raw = df['Teks_Mentah'] if 'Teks_Mentah' in df else pd.Series([''] * len(df), index=df.index)
+            waktu = df['Waktu'] if 'Waktu' in df else pd.Series([None] * len(df), index=df.index)
+            tgl_scrap = df['Tanggal_Scrap'] if 'Tanggal_Scrap' in df else pd.Series([None] * len(df), index=df.index)
+
+            # Hanya ulasan yang sidiknya belum ada di DB (dan belum muncul di baris sebelumnya pada file)
+            df['_hash'] = [setup_db.review_hash(n, t, w) for n, t, w in zip(df['_nama'], raw, waktu)]
+            known = {r[0] for r in cursor.execute("SELECT content_hash FROM ulasan")}
+            new = ~df['_hash'].isin(known) & ~df['_hash'].duplicated()
+            print(f"   🔎 {int(new.sum())} ulasan baru, {int((~new).sum())} sudah ada / duplikat dilewati.")
+            df, raw, waktu, tgl_scrap = df[new], raw[new], waktu[new], tgl_scrap[new]
+
+            if len(df) >= BULK_MIN_ROWS:
+                # Index & index FTS ulasan dilepas selama impor massal, dibangun ulang sekali di akhir
+                suspended = setup_db.suspend_ulasan_indexes(cursor)
+            rows = zip(df['_pid'].astype(int).tolist(), df['_rating'].astype(int).tolist(), raw.tolist(),
+                       raw.astype(str).str.lower().tolist(), waktu.tolist(), tgl_scrap.tolist(), df['_hash'].tolist())
+            CHANGED_ROWS['ulasan'] += insert_batches(cursor, 'INSERT INTO ulasan (tempat_id, rating_user, teks_mentah, teks_bersih, waktu_ulasan, tanggal_scrap, content_hash) VALUES (?, ?, ?, ?, ?, ?, ?)', rows, "ulasan")
+            save_checkpoint(cursor, FILE_CORPUS_MASTER, sidik, baris=len(df))
+
+        print("\n🚀 TAHAP 3: Data Harga & Fasilitas Manual...")
+        if os.path.exists(FILE_INPUT_HARGA) and source_changed(cursor, FILE_INPUT_HARGA, full):
+            df_hrg = pd.read_csv(FILE_INPUT_HARGA).fillna("")
+            rows = [(upsert_place(cursor, r.get('Nama_Tempat')), r.get('item'), r.get('harga', 0), r.get('kategori', '')) for r in df_hrg.to_dict('records')]
+            rows = [r for r in rows if r[0]]
+            # Harga lama tempat yang ada di file input diganti seluruhnya (hanya jika isinya berbeda)
+            old, new = {}, {}
+            for p_id, item, harga, kategori in cursor.execute("SELECT tempat_id, item, harga, kategori FROM harga ORDER BY id"):
+                old.setdefault(p_id, []).append((item, harga, kategori))
+            for p_id, item, harga, kategori in rows:
+                new.setdefault(p_id, []).append((item, harga, kategori))
+            changed = [p for p in new if old.get(p) != new[p]]
+            cursor.executemany("DELETE FROM harga WHERE tempat_id = ?", [(p,) for p in changed])
+            cursor.executemany("INSERT INTO harga (tempat_id, item, harga, kategori) VALUES (?, ?, ?, ?)",
+                               [(p,) + it for p in changed for it in new[p]])
+            CHANGED_ROWS['harga'] += len(changed)
+            save_checkpoint(cursor, FILE_INPUT_HARGA, file_fingerprint(FILE_INPUT_HARGA), baris=len(rows))
+            print(f"   ✅ {len(rows)} harga ({len(changed)} tempat berubah).")
+
+        if os.path.exists(FILE_INPUT_FASILITAS) and source_changed(cursor, FILE_INPUT_FASILITAS, full):
+            df_fas = pd.read_csv(FILE_INPUT_FASILITAS).fillna("")
+            rows = [(upsert_place(cursor, r.get('Nama_Tempat')), r.get('Fasilitas')) for r in df_fas.to_dict('records')]
+            rows = [r for r in rows if r[0]]
+            count_fas = lambda: cursor.execute("SELECT COUNT(*) FROM fasilitas").fetchone()[0]
+            before = count_fas()
+            cursor.executemany("INSERT OR IGNORE INTO fasilitas (tempat_id, nama_fasilitas) VALUES (?, ?)", rows) # UNIQUE (tempat, fasilitas)
+            CHANGED_ROWS['fasilitas'] += count_fas() - before
+            save_checkpoint(cursor, FILE_INPUT_FASILITAS, file_fingerprint(FILE_INPUT_FASILITAS), baris=len(rows))
+            print(f"   ✅ {CHANGED_ROWS['fasilitas']} fasilitas baru dari {len(rows)} baris.")
+
+        # --- TAHAP 4: RIWAYAT (MAPPING BENAR) ---
+        print("\n🚀 TAHAP 4: Migrasi Riwayat Pencarian...")
+        files_riwayat = [p for p in [FILE_RIWAYAT] if os.path.exists(p)] + list_partitions(RIWAYAT_DIR, 'riwayat_pencarian')
+        if files_riwayat:
+            count_riwayat, count_files = 0, 0
+            for file_riwayat in files_riwayat:
+                # Log hanya bertambah: selalu lanjut dari offset (juga saat --full, agar riwayat tidak dobel)
+                sidik, offset = get_checkpoint(cursor, file_riwayat)
+                if sidik == file_fingerprint(file_riwayat): continue # Partisi tidak berubah
                 try:
-                    items = ast.literal_eval(row['Price_Items'])
-                    if isinstance(items, list):
-                        if cursor.execute("SELECT COUNT(*) FROM harga WHERE tempat_id=?", (p_id,)).fetchone()[0] == 0:
-                            for it in items: cursor.execute("INSERT INTO harga (tempat_id, item, harga, kategori) VALUES (?, ?, ?, ?)", (p_id, it.get('item',''), it.get('harga',0), 'Umum'))
-                except: pass
-
-    print("\n🚀 TAHAP 2: Migrasi ULASAN...")
-    if os.path.exists(FILE_CORPUS_MASTER):
-        df = pd.read_csv(FILE_CORPUS_MASTER).fillna("")
-        count = 0
-        for _, row in df.iterrows():
-            p_id = upsert_place(cursor, row.get('Nama_Tempat'), lokasi=row.get('Lokasi', '-'), rating=row.get('Rating', 0.0))
-            if p_id:
-                raw = row.get('Teks_Mentah', '')
-                try: ur = int(float(row.get('Rating', 0)))
-                except: ur = 0
-                cursor.execute('INSERT INTO ulasan (tempat_id, rating_user, teks_mentah, teks_bersih, waktu_ulasan, tanggal_scrap) VALUES (?, ?, ?, ?, ?, ?)', (p_id, ur, raw, str(raw).lower(), row.get('Waktu'), row.get('Tanggal_Scrap', None)))
-                count += 1
-                if count % 2000 == 0: print(f"      ⏳ {count}...")
-
-    print("\n🚀 TAHAP 3: Data Harga & Fasilitas Manual...")
-    if os.path.exists(FILE_INPUT_HARGA):
-        df_hrg = pd.read_csv(FILE_INPUT_HARGA).fillna("")
-        p_ids = set()
-        for _, row in df_hrg.iterrows():
-            p_id = upsert_place(cursor, row.get('Nama_Tempat'))
-            if p_id:
-                if p_id not in p_ids: cursor.execute("DELETE FROM harga WHERE tempat_id = ?", (p_id,)); p_ids.add(p_id)
-                cursor.execute("INSERT INTO harga (tempat_id, item, harga, kategori) VALUES (?, ?, ?, ?)", (p_id, row.get('item'), row.get('harga', 0), row.get('kategori', '')))
-
-    if os.path.exists(FILE_INPUT_FASILITAS):
-        df_fas = pd.read_csv(FILE_INPUT_FASILITAS).fillna("")
-        for _, row in df_fas.iterrows():
-            p_id = upsert_place(cursor, row.get('Nama_Tempat'))
-            if p_id: cursor.execute("INSERT INTO fasilitas (tempat_id, nama_fasilitas) VALUES (?, ?)", (p_id, row.get('Fasilitas')))
-
-    # --- TAHAP 4: RIWAYAT (MAPPING BENAR) ---
-    print("\n🚀 TAHAP 4: Migrasi Riwayat Pencarian...")
-    if os.path.exists(FILE_RIWAYAT):
-        try:
-            with open(FILE_RIWAYAT, 'r', encoding='utf-8', errors='replace') as f:
-                reader = csv.DictReader(f)
-                count_riwayat = 0
-                for row in reader:
-                    # Mapping CSV -> DB
-                    waktu = row.get('timestamp')
-                    q_user = row.get('query_mentah')
-                    intent = row.get('intent_terdeteksi')
-                    region = row.get('region_terdeteksi')
-                    
-                    # Bersihkan 'None' string
-                    if str(intent).lower() == 'none': intent = None
-                    if str(region).lower() == 'none': region = None
-                    
-                    if waktu and q_user:
-                        # query_bersih bisa kita isi dengan query user yang sudah di-lowercase jika intent kosong
-                        q_clean = q_user.lower()
-                        
-                        cursor.execute("""
-                            INSERT INTO riwayat (waktu, query_user, query_bersih, intent, region, jumlah_hasil) 
-                            VALUES (?, ?, ?, ?, ?, 0)
-                        """, (waktu, q_user, q_clean, intent, region))
-                        count_riwayat += 1
-            print(f"   📜 Berhasil: {count_riwayat} log pencarian.")
-        except Exception as e: print(f"   ⚠️ Gagal baca riwayat: {e}")
-    else: print("   ⚠️ File riwayat_pencarian.csv tidak ditemukan.")
-
-    conn.commit(); conn.close()
-    print("\n✅ SEMUA MIGRASI SELESAI.")
+                    sidik = file_fingerprint(file_riwayat)
+                    rows, offset = read_riwayat_rows(file_riwayat, offset)
+                    cursor.executemany("""
+                        INSERT INTO riwayat (waktu, query_user, query_bersih, intent, region, jumlah_hasil, durasi_detik)
+                        VALUES (?, ?, ?, ?, ?, NULL, NULL) -- Log CSV tidak mencatat hasil & durasi
+                    """, rows)
+                    save_checkpoint(cursor, file_riwayat, sidik, offset, len(rows))
+                    count_riwayat += len(rows); count_files += 1
+                except Exception as e: print(f"   ⚠️ Gagal baca riwayat {os.path.basename(file_riwayat)}: {e}")
+            print(f"   📜 Berhasil: {count_riwayat} log pencarian baru dari {count_files} file berubah ({len(files_riwayat)} file).")
+        else: print("   ⚠️ File riwayat pencarian (CSV) tidak ditemukan.")
+
+        if suspended:
+            print("\n🧱 Membangun ulang index ulasan...")
+            t = time.time()
+            setup_db.restore_ulasan_indexes(cursor, suspended)
+            print(f"   ✅ Index selesai dalam {time.time() - t:.2f} detik.")
+
+        # Cache detail & nama tempat di aplikasi yang sedang berjalan langsung tahu datanya berubah.
+        # Impor yang hanya menambah riwayat / checkpoint tidak mengosongkan cache.
+        print(f"\n📦 Data tempat berubah: { {t: n for t, n in CHANGED_ROWS.items() if n} or 'tidak ada'}")
+        if sum(CHANGED_ROWS.values()) > 0:
+            try: setup_db.bump_data_version(cursor)
+            except sqlite3.OperationalError: pass # DB lama tanpa tabel data_version
+
+        cursor.execute("COMMIT")
+    except Exception:
+        cursor.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    print(f"\n✅ SEMUA MIGRASI SELESAI dalam {time.time() - start_all:.2f} detik.")
+
+def read_riwayat_rows(file_riwayat, offset=0):
+    """
+    Baris riwayat dari CSV log (file lama / partisi harian) mulai byte `offset` -> (tuple siap INSERT, offset baru).
+    Log hanya bertambah di akhir, jadi offset checkpoint = bagian yang sudah diimpor. Hanya baris lengkap
+    (diakhiri newline) yang diambil; baris yang sedang ditulis ikut impor berikutnya.
+    """
+    with open(file_riwayat, 'rb') as f:
+        header = f.readline()
+        if offset > os.fstat(f.fileno()).st_size: offset = 0 # File diganti / dipotong -> baca ulang
+        offset = max(offset, len(header))
+        f.seek(offset)
+        data = f.read()
+    data = data[:data.rfind(b'\n') + 1]
+    fieldnames = next(csv.reader([header.decode('utf-8-sig', errors='replace')]), [])
+
+    rows = []
+    for row in csv.DictReader(io.StringIO(data.decode('utf-8', errors='replace'), newline=''), fieldnames=fieldnames):
+        # Mapping CSV -> DB
+        waktu = row.get('timestamp')
+        q_user = row.get('query_mentah')
+        intent = row.get('intent_terdeteksi')
+        region = row.get('region_terdeteksi')
+
+        # Bersihkan 'None' string
+        if str(intent).lower() == 'none': intent = None
+        if str(region).lower() == 'none': region = None
+
+        if waktu and q_user:
+            # query_bersih bisa kita isi dengan query user yang sudah di-lowercase jika intent kosong
+            rows.append((waktu, q_user, q_user.lower(), intent, region))
+    return rows, offset + len(data)
 
 if __name__ == "__main__":
     try:
         from Asisten.db_handler import db
         db.init_tables()
     except: pass
-    migrate_data()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="Impor inkremental CSV -> camping.db")
+    parser.add_argument('--full', action='store_true', help="Baca ulang semua file (abaikan checkpoint)")
+    migrate_data(full=parser.parse_args().full)
@@ -0,0 +1,167 @@
+import os
+import sqlite3
+import hashlib
+from collections import deque
+import pandas as pd
+from . import preprocessing
+from . import utils
+
+# ======================================================================
+# KONFIGURASI
+# ======================================================================
+CORPUS_PATH = os.path.join(utils.BASE_DIR, 'Documents', 'corpus_master.csv')
+DB_PATH = os.path.join(utils.BASE_DIR, 'camping.db')
+TOKEN_CACHE_PATH = os.path.join(utils.BASE_DIR, 'Assets', 'corpus_tokens.txt')
+MARKER_TAIL = 50 # Jumlah ulasan terakhir (<= watermark) yang sidiknya ikut di marker training
+
+def _review_hash(nama, teks, waktu):
+    """Sidik isi ulasan (nama tempat + teks + waktu), rumus sama dengan setup_db.review_hash."""
+    parts = ['' if v is None else str(v) for v in (nama, teks, waktu)]
+    return hashlib.sha1("\x1f".join(parts).encode('utf-8')).hexdigest()
+
+def _pipeline_fingerprint():
+    """Hash aturan preprocessing (stemmer, phrase map, stopwords) untuk validasi cache token."""
+    h = hashlib.md5(preprocessing.STEMMER_VERSION.encode('utf-8'))
+    h.update(repr(sorted(preprocessing.PHRASE_MAP.items())).encode('utf-8'))
+    h.update(repr(sorted(preprocessing.STOPWORDS)).encode('utf-8'))
+    return h.hexdigest()[:12]
+
+# ======================================================================
+# CORPUS STREAMING (UNTUK WORD2VEC)
+# ======================================================================
+class ReviewCorpus:
+    """
+    Iterable kalimat ter-token yang bisa diulang (restartable) untuk gensim.
+    - Ulasan dibaca bertahap (chunk) dari CSV master atau tabel 'ulasan'.
+    - Iterasi pertama men-token secara lazy & menulis hasilnya ke file cache;
+      epoch berikutnya cukup membaca file tersebut baris per baris.
+    Memori tetap datar berapapun ukuran corpus.
+    """
+    def __init__(self, source='csv', path=None, chunksize=2000, cache_path=TOKEN_CACHE_PATH,
+                 workers=None, min_id=None):
+        if source not in ('csv', 'db'):
+            raise ValueError("source harus 'csv' atau 'db'")
+        self.source = source
+        self.path = path or (CORPUS_PATH if source == 'csv' else DB_PATH)
+        self.chunksize = chunksize
+        self.cache_path = cache_path
+        self.workers = workers
+        self.min_id = min_id # Hanya ulasan dengan Doc_ID / id > min_id (untuk update inkremental)
+
+    # --- SUMBER TEKS ---
+    def iter_texts(self):
+        """Menghasilkan teks mentah ulasan satu per satu (dibaca per chunk)."""
+        if self.source == 'csv':
+            if not os.path.exists(self.path): return
+            for chunk in pd.read_csv(self.path, usecols=['Doc_ID', 'Teks_Mentah'], chunksize=self.chunksize):
+                if self.min_id is not None:
+                    chunk = chunk[chunk['Doc_ID'] > self.min_id]
+                yield from chunk['Teks_Mentah'].fillna('').astype(str)
+        else:
+            conn = sqlite3.connect(self.path)
+            try:
+                cur = conn.execute(
+                    "SELECT teks_mentah FROM ulasan WHERE id > ? AND teks_mentah IS NOT NULL ORDER BY id",
+                    (self.min_id or 0,))
+                while True:
+                    rows = cur.fetchmany(self.chunksize)
+                    if not rows: break
+                    for (text,) in rows:
+                        yield text
+            finally:
+                conn.close()
+
+    def max_id(self):
+        """ID ulasan terakhir di sumber (dipakai sebagai watermark training)."""
+        if self.source == 'csv':
+            if not os.path.exists(self.path): return 0
+            last = 0
+            for chunk in pd.read_csv(self.path, usecols=['Doc_ID'], chunksize=self.chunksize):
+                if not chunk.empty: last = max(last, int(chunk['Doc_ID'].max()))
+            return last
+        conn = sqlite3.connect(self.path)
+        try:
+            return conn.execute("SELECT COALESCE(MAX(id), 0) FROM ulasan").fetchone()[0]
+        finally:
+            conn.close()
+
+    def marker(self, upto_id):
+        """
+        Penanda isi yang stabil untuk ulasan dengan id <= upto_id: jumlah baris + hash sidik
+        MARKER_TAIL ulasan terakhir. Doc_ID / ulasan.id bisa dinomori ulang (merge_corpus,
+        reset database); jika marker berubah, watermark lama tidak lagi bisa dipercaya.
+        """
+        count, tail = 0, deque(maxlen=MARKER_TAIL)
+        if self.source == 'csv':
+            if os.path.exists(self.path):
+                cols = ['Doc_ID', 'Nama_Tempat', 'Teks_Mentah', 'Waktu']
+                for chunk in pd.read_csv(self.path, usecols=cols, chunksize=self.chunksize):
+                    chunk = chunk[chunk['Doc_ID'] <= upto_id].fillna('')
+                    count += len(chunk)
+                    tail.extend(map(_review_hash, chunk['Nama_Tempat'], chunk['Teks_Mentah'], chunk['Waktu']))
+        else:
+            conn = sqlite3.connect(self.path)
+            try:
+                count = conn.execute("SELECT COUNT(*) FROM ulasan WHERE id <= ?", (upto_id,)).fetchone()[0]
+                rows = conn.execute("""
+                    SELECT t.nama, u.teks_mentah, u.waktu_ulasan FROM ulasan u
+                    LEFT JOIN tempat t ON t.id = u.tempat_id
+                    WHERE u.id <= ? ORDER BY u.id DESC LIMIT ?
+                """, (upto_id, MARKER_TAIL)).fetchall()
+            finally:
+                conn.close()
+            tail.extend(_review_hash(*r) for r in reversed(rows))
+        return {"count": int(count), "tail_hash": hashlib.sha1("".join(tail).encode('utf-8')).hexdigest()}
+
+    def cache_key(self):
+        """Kunci cache: identitas sumber + versi preprocessing."""
+        if self.source == 'csv':
+            st = os.stat(self.path) if os.path.exists(self.path) else None
+            src = f"csv:{os.path.basename(self.path)}:{st.st_mtime_ns if st else 0}:{st.st_size if st else 0}"
+        else:
+            conn = sqlite3.connect(self.path)
+            try:
+                n, last = conn.execute("SELECT COUNT(*), COALESCE(MAX(id), 0) FROM ulasan").fetchone()
+            finally:
+                conn.close()
+            src = f"db:{n}:{last}"
+        return f"{src}:min_id={self.min_id}:{_pipeline_fingerprint()}"
+
+    # --- ITERASI ---
+    def _cache_is_valid(self, key):
+        if not self.cache_path or not os.path.exists(self.cache_path): return False
+        with open(self.cache_path, 'r', encoding='utf-8') as f:
+            return f.readline().rstrip('\n') == f"# {key}"
+
+    def __iter__(self):
+        key = self.cache_key()
+        if self._cache_is_valid(key):
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                next(f) # Lewati header
+                for line in f:
+                    yield line.split()
+            return
+
+        if not self.cache_path:
+            for tokens in preprocessing.preprocess_many(self.iter_texts(), workers=self.workers):
+                if tokens: yield tokens
+            return
+
+        # Iterasi pertama: token-kan sambil menulis cache (tmp -> rename jika selesai)
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        completed = False
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(f"# {key}\n")
+                for tokens in preprocessing.preprocess_many(self.iter_texts(), workers=self.workers):
+                    if not tokens: continue
+                    f.write(" ".join(tokens) + "\n")
+                    yield tokens
+            completed = True
+        finally:
+            if completed:
+                os.replace(tmp_path, self.cache_path)
+                preprocessing.save_stem_cache()
+            elif os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -0,0 +1,242 @@
+import os
+import io
+import csv
+import glob
+import time
+import queue
+import atexit
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+# ======================================================================
+# KONFIGURASI
+# ======================================================================
+LOG_QUEUE_MAX = 10_000      # Batas antrean di memori
+LOG_BATCH_SIZE = 200        # Flush jika antrean sudah sebanyak ini...
+LOG_FLUSH_INTERVAL = 1.0    # ...atau setiap sekian detik
+LOG_POLICY = 'drop'         # 'drop' = buang log saat antrean penuh | 'block' = tunggu (maks LOG_BLOCK_TIMEOUT)
+LOG_BLOCK_TIMEOUT = 0.5
+LOG_RETENTION_DAYS = 90     # Partisi / baris riwayat lebih tua dari ini dihapus saat rotasi
+
+# ======================================================================
+# SINK (TUJUAN TULIS, DIPANGGIL DARI THREAD PENULIS)
+# ======================================================================
+class CsvLogSink:
+    """Menulis satu batch baris ke CSV dengan sekali buka file (header jika file baru)."""
+    def __init__(self, path, columns):
+        self.path = path
+        self.columns = columns
+
+    def write_batch(self, rows):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        file_exists = os.path.exists(self.path)
+        with open(self.path, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            if not file_exists:
+                writer.writerow(self.columns)
+            writer.writerows(rows)
+
+class DailyCsvLogSink:
+    """
+    CSV yang dipartisi per hari: <folder>/<prefix>_YYYY-MM-DD.csv (tanggal dari kolom pertama).
+    Saat hari berganti, partisi yang lebih tua dari retention_days dihapus (rotasi).
+    """
+    def __init__(self, folder, prefix, columns, retention_days=LOG_RETENTION_DAYS):
+        self.folder = folder
+        self.prefix = prefix
+        self.columns = columns
+        self.retention_days = retention_days
+        self._last_day = None
+
+    def partition_path(self, day):
+        return os.path.join(self.folder, f"{self.prefix}_{day}.csv")
+
+    def write_batch(self, rows):
+        by_day = {}
+        for row in rows:
+            # Baris log harus 1 baris fisik agar bisa dibaca dari ekor file
+            clean = [str(v).replace('\r', ' ').replace('\n', ' ') if isinstance(v, str) else v for v in row]
+            by_day.setdefault(str(row[0])[:10], []).append(clean)
+        for day, day_rows in sorted(by_day.items()):
+            CsvLogSink(self.partition_path(day), self.columns).write_batch(day_rows)
+            if day != self._last_day:
+                self._last_day = day
+                self.rotate(day)
+
+    def rotate(self, today):
+        if not self.retention_days: return
+        cutoff = (datetime.strptime(today, '%Y-%m-%d') - timedelta(days=self.retention_days)).strftime('%Y-%m-%d')
+        for path in list_partitions(self.folder, self.prefix):
+            if _partition_day(path, self.prefix) < cutoff:
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    print(f"⚠️ Gagal menghapus partisi lama {os.path.basename(path)}: {e}")
+
+class SqliteLogSink:
+    """
+    Menulis satu batch dengan executemany dalam SATU transaksi.
+    Jika retention_sql diisi ("DELETE ... WHERE waktu < ?"), dijalankan sekali per hari baru.
+    """
+    def __init__(self, db_path, insert_sql, retention_sql=None, retention_days=LOG_RETENTION_DAYS):
+        self.db_path = db_path
+        self.insert_sql = insert_sql
+        self.retention_sql = retention_sql
+        self.retention_days = retention_days
+        self._last_day = None
+
+    def write_batch(self, rows):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            with conn:
+                conn.executemany(self.insert_sql, rows)
+                day = str(rows[-1][0])[:10]
+                if self.retention_sql and self.retention_days and day != self._last_day:
+                    cutoff = datetime.strptime(day, '%Y-%m-%d') - timedelta(days=self.retention_days)
+                    conn.execute(self.retention_sql, (cutoff.strftime('%Y-%m-%d'),))
+                    self._last_day = day
+        finally:
+            conn.close()
+
+# ======================================================================
+# BACA RIWAYAT TERBARU (DARI EKOR FILE)
+# ======================================================================
+def _partition_day(path, prefix):
+    return os.path.basename(path)[len(prefix) + 1:-len('.csv')]
+
+def list_partitions(folder, prefix):
+    """Semua partisi harian, urut dari yang terlama (nama file YYYY-MM-DD urut leksikal)."""
+    return sorted(glob.glob(os.path.join(folder, f"{prefix}_????-??-??.csv")))
+
+def tail_csv_rows(path, n, block_size=8192):
+    """
+    Mengambil n baris data terakhir sebuah CSV (terbaru dulu) dengan membaca blok dari
+    akhir file, jadi biayanya sebanding n, bukan ukuran file.
+    """
+    if n <= 0 or not os.path.exists(path): return []
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        data = b''
+        while pos > 0 and data.count(b'\n') <= n + 1:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    lines = data.decode('utf-8', errors='replace').splitlines()
+    lines = lines[1:] # Buang header (awal file) atau baris yang terpotong (tengah file)
+    lines = [line for line in lines if line.strip()][-n:]
+    return list(reversed(list(csv.reader(io.StringIO("\n".join(lines))))))
+
+def read_latest_rows(folder, prefix, n, legacy_path=None):
+    """n baris terbaru dari partisi harian (terbaru dulu), lanjut ke file lama jika kurang."""
+    paths = list(reversed(list_partitions(folder, prefix)))
+    if legacy_path: paths.append(legacy_path)
+    rows = []
+    for path in paths:
+        if len(rows) >= n: break
+        rows += tail_csv_rows(path, n - len(rows))
+    return rows
+
+# ======================================================================
+# PENULIS LATAR BELAKANG
+# ======================================================================
+class BackgroundLogWriter:
+    """
+    Antrean log berbatas + satu thread penulis. Jalur pencarian hanya memasukkan baris
+    ke antrean (mikrodetik); thread penulis menulis per batch saat antrean mencapai
+    batch_size atau flush_interval terlewati. Sisa antrean ditulis saat program berhenti.
+    """
+    def __init__(self, sink, max_queue=LOG_QUEUE_MAX, batch_size=LOG_BATCH_SIZE,
+                 flush_interval=LOG_FLUSH_INTERVAL, policy=LOG_POLICY, block_timeout=LOG_BLOCK_TIMEOUT,
+                 name="log-writer"):
+        if policy not in ('drop', 'block'):
+            raise ValueError("policy harus 'drop' atau 'block'")
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.dropped = 0
+        self.written = 0
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._flush_requests = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, row):
+        """Masukkan satu baris log. Mengembalikan False jika log dibuang (antrean penuh)."""
+        if self._closed: return False
+        try:
+            if self.policy == 'block':
+                self._queue.put(row, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(row)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def flush(self, timeout=5.0):
+        """Tunggu sampai semua baris yang sudah masuk antrean tertulis."""
+        if self._closed or not self._thread.is_alive(): return
+        done = threading.Event()
+        self._flush_requests.put(done)
+        done.wait(timeout)
+
+    def close(self, timeout=5.0):
+        """Tulis sisa antrean lalu hentikan thread penulis (aman dipanggil berkali-kali)."""
+        if self._closed: return
+        self._closed = True # Thread penulis menguras antrean lalu berhenti
+        self._thread.join(timeout)
+
+    def _drain(self, limit=None):
+        batch = []
+        while limit is None or len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, rows):
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            try:
+                self.sink.write_batch(batch)
+                self.written += len(batch)
+            except Exception as e:
+                print(f"⚠️ GAGAL menulis {len(batch)} log: {e}")
+
+    def _run(self):
+        pending = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                wait = max(0.0, min(deadline - time.monotonic(), 0.05))
+                pending.append(self._queue.get(timeout=wait))
+                pending += self._drain(self.batch_size - len(pending))
+            except queue.Empty:
+                pass
+
+            requests = []
+            while not self._flush_requests.empty():
+                requests.append(self._flush_requests.get_nowait())
+            stopping = self._closed
+            if requests or stopping:
+                pending += self._drain()
+
+            now = time.monotonic()
+            if pending and (len(pending) >= self.batch_size or now >= deadline or requests or stopping):
+                self._write(pending)
+                pending = []
+            if now >= deadline:
+                deadline = now + self.flush_interval
+            for done in requests:
+                done.set()
+            if stopping and self._queue.empty():
+                return
@@ -1,22 +1,19 @@
 import pandas as pd
 import numpy as np
 import os
+import threading
 import urllib.parse
 import joblib
+from types import MappingProxyType
 import streamlit as st
-from gensim.models import Word2Vec
 from sklearn.metrics.pairwise import cosine_similarity
 from . import preprocessing
 from . import utils
+from . import query_expansion
 
 # ======================================================================
-# 1. VARIABEL GLOBAL (OTAK AI)
+# 1. KONFIGURASI
 # ======================================================================
-MODEL_W2V = None      # Otak Kecerdasan Buatan
-DF_CORPUS = None      # Data Teks Ulasan
-DOC_VECTORS = None    # Matriks Vektor Dokumen (Cache agar cepat)
-DF_METADATA = None    # Data Harga/Foto
-
 # Konfigurasi Path
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 MODEL_PATH = os.path.join(BASE_DIR, 'Assets', 'word2vec.model')
@@ -26,46 +23,222 @@ CORPUS_PATH = os.path.join(BASE_DIR, 'Documents', 'corpus_master.csv')
 BOBOT_AI = 0.7        # 70% Kecocokan Makna
 BOBOT_RATING = 0.3    # 30% Kualitas Tempat (Bintang)
 
+# Ekspansi Query (sinonim dari tabel tetangga model, bobot di src/query_expansion.py)
+# Nonaktif sampai evaluasi (evaluation.py / advanced_evaluation.py) menunjukkan akurasi tidak turun
+EKSPANSI_QUERY = False
+
 # ======================================================================
-# 2. FUNGSI INISIALISASI (Dipanggil saat aplikasi mulai)
+# 2. SEARCH INDEX (OTAK AI, READ-ONLY)
 # ======================================================================
-def initialize_mesin():
-    """Memuat Model AI, Corpus, dan Metadata."""
-    global MODEL_W2V, DF_CORPUS, DOC_VECTORS, DF_METADATA
-    
+class SearchIndex:
+    """
+    Snapshot lengkap yang dibutuhkan untuk mencari: Model, Corpus, Vektor, Metadata.
+    Dibuat utuh oleh build_index() lalu tidak pernah diubah, sehingga aman dibaca
+    banyak thread sekaligus. Beberapa index (per region / per versi model) boleh hidup
+    berdampingan dalam satu proses.
+    """
+    __slots__ = ('wv', 'df_corpus', 'doc_vectors', 'df_metadata',
+                 'place_records', 'all_places_order', 'version', 'region',
+                 'expander', '_all_places_cache')
+
+    def __init__(self, wv, df_corpus, doc_vectors, df_metadata, version=None, region=None, expander=None):
+        place_records, all_places_order = _compile_metadata(df_metadata)
+        if doc_vectors is not None:
+            doc_vectors.setflags(write=False)
+
+        for attr, value in (('wv', wv), ('df_corpus', df_corpus),
+                            ('doc_vectors', doc_vectors), ('df_metadata', df_metadata),
+                            ('place_records', place_records), ('all_places_order', all_places_order),
+                            ('version', version), ('region', region),
+                            ('expander', expander), ('_all_places_cache', {})):
+            object.__setattr__(self, attr, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("SearchIndex bersifat read-only. Buat index baru dengan build_index().")
+
+    def __repr__(self):
+        n_docs = 0 if self.df_corpus is None else len(self.df_corpus)
+        return f"SearchIndex(version={self.version!r}, region={self.region!r}, docs={n_docs})"
+
+    @property
+    def is_ready(self):
+        return self.wv is not None and self.df_corpus is not None
+
+    def text_vector(self, text):
+        return _get_text_vector(text, self.wv)
+
+    def query_vector(self, query_tokens):
+        """Vektor query; diperluas dengan kata tetangga jika tabelnya tersedia."""
+        if self.expander is None:
+            return self.text_vector(query_tokens)
+        return self.expander.vector(query_tokens)
+
+    def search(self, query_tokens, special_intent, region_filter):
+        """Pencarian murni (tanpa logging) di atas snapshot ini."""
+        # --- JALUR 1: REKOMENDASI UMUM (INTENT 'ALL') ---
+        if special_intent == 'ALL':
+            return _get_all_places(self, region_filter)
+
+        # --- JALUR 2: PENCARIAN DEEP LEARNING (VECTOR SEARCH) ---
+        if not self.is_ready:
+            return []
+
+        # 1. Ubah Query jadi Vektor
+        query_vector = self.query_vector(query_tokens)
+        
+        if np.all(query_vector == 0): return [] # Kata tidak dikenali AI
+
+        # 2. Hitung Kemiripan (Cosine Similarity)
+        # Bandingkan 1 vektor query vs Ribuan vektor dokumen
+        similarities = cosine_similarity([query_vector], self.doc_vectors)[0]
+        
+        # 3. Ranking & Formatting
+        candidates = []
+        
+        for idx, score_sim in enumerate(similarities):
+            # Threshold: Hanya ambil yang agak mirip (> 0.1)
+            if score_sim > 0.1:
+                row = self.df_corpus.iloc[idx]
+                
+                # Filter Region (Kabupaten)
+                if region_filter and region_filter not in str(row['Lokasi']).lower():
+                    continue
+
+                # Skor Gabungan (AI + Rating)
+                # Normalisasi Rating 0-5 menjadi 0-1
+                rating_norm = float(row['Rating']) / 5.0
+                final_score = (score_sim * BOBOT_AI) + (rating_norm * BOBOT_RATING)
+                
+                candidates.append({
+                    'name': row['Nama_Tempat'],
+                    'location': row['Lokasi'],
+                    'avg_rating': float(row['Rating']),
+                    'top_vsm_score': float(final_score), # Kita pakai nama 'vsm_score' biar frontend gak error
+                    'ai_score': float(score_sim),        # Info tambahan debug
+                    'snippet': str(row['Teks_Mentah'])[:100] + "..."
+                })
+        
+        # 4. Urutkan Ranking
+        candidates = sorted(candidates, key=lambda x: x['top_vsm_score'], reverse=True)
+        
+        # 5. Grouping (Ambil Metadata Lengkap)
+        final_results = _enrich_with_metadata(self, candidates)
+        
+        # Sorting Tambahan jika User minta
+        if special_intent == 'RATING_TOP':
+            final_results.sort(key=lambda x: x['avg_rating'], reverse=True)
+        elif special_intent == 'RATING_BOTTOM':
+            final_results.sort(key=lambda x: x['avg_rating'], reverse=False)
+
+        return final_results
+
+def build_index(model_path=MODEL_PATH, corpus_path=CORPUS_PATH, region=None, version=None, df_metadata=None,
+                expand_query=EKSPANSI_QUERY):
+    """
+    Factory: Memuat Model AI, Corpus, dan Metadata menjadi SearchIndex baru.
+    - region       : jika diisi, corpus hanya berisi ulasan dari lokasi tersebut.
+    - version      : label bebas (mis. nama file model) untuk perbandingan A/B.
+    - expand_query : perluas query dengan tabel tetangga model (jika ada).
+    Mengembalikan SearchIndex (is_ready=False jika model/corpus tidak ada).
+    """
     print("--- 🚀 Memuat Mesin Deep Learning (Word2Vec)... ---")
     
     # 1. Load Metadata (Harga/Foto)
-    DF_METADATA = utils.load_metadata()
+    if df_metadata is None:
+        df_metadata = utils.load_metadata()
+    if version is None:
+        version = os.path.basename(model_path)
     
-    # 2. Load Model Word2Vec
-    if os.path.exists(MODEL_PATH):
-        MODEL_W2V = Word2Vec.load(MODEL_PATH)
+    # 2. Load Vektor Kata (KeyedVectors di-mmap, berbagi memori antar proses)
+    wv = utils.load_word_vectors(model_path)
+    if wv is not None:
         print("✅ Model AI Loaded.")
     else:
         print("❌ FATAL: Model AI tidak ditemukan. Jalankan 'train_w2v.py' dulu!")
-        return
+        return SearchIndex(None, None, None, df_metadata, version=version, region=region)
 
     # 3. Load Corpus & Pre-calculate Vectors
-    if os.path.exists(CORPUS_PATH):
-        DF_CORPUS = pd.read_csv(CORPUS_PATH)
-        
-        # Hitung vektor untuk semua dokumen SEKARANG (biar pencarian ngebut)
-        print("⚙️ Menghitung vektor dokumen...")
-        DF_CORPUS['Vector'] = DF_CORPUS['Teks_Mentah'].apply(_get_text_vector)
-        
-        # Simpan sebagai matrix numpy
-        DOC_VECTORS = np.array(DF_CORPUS['Vector'].tolist())
-        print(f"✅ Siap mencari di {len(DF_CORPUS)} ulasan.")
-    else:
+    if not os.path.exists(corpus_path):
         print("❌ FATAL: Corpus master tidak ditemukan!")
+        return SearchIndex(wv, None, None, df_metadata, version=version, region=region)
+
+    expander = query_expansion.load_expander(wv, model_path) if expand_query else None
+    if expander is not None:
+        print("✅ Tabel tetangga dimuat (ekspansi query aktif).")
+
+    df_corpus = pd.read_csv(corpus_path)
+    if region:
+        df_corpus = df_corpus[df_corpus['Lokasi'].astype(str).str.lower().str.contains(region, regex=False)]
+        df_corpus = df_corpus.reset_index(drop=True)
+    
+    # Hitung vektor untuk semua dokumen SEKARANG (biar pencarian ngebut)
+    print("⚙️ Menghitung vektor dokumen...")
+    vectors = [_get_text_vector(tokens, wv) for tokens in preprocessing.preprocess_many(df_corpus['Teks_Mentah'])]
+    preprocessing.save_stem_cache()
+    
+    # Simpan sebagai matrix numpy
+    if vectors:
+        doc_vectors = np.vstack(vectors)
+    else:
+        doc_vectors = np.zeros((0, wv.vector_size))
+    print(f"✅ Siap mencari di {len(df_corpus)} ulasan.")
+    return SearchIndex(wv, df_corpus, doc_vectors, df_metadata, version=version, region=region, expander=expander)
 
 # ======================================================================
-# 3. FUNGSI PENDUKUNG (VECTORIZATION)
+# 3. SEARCH SERVICE (PEMEGANG INDEX AKTIF)
 # ======================================================================
-def _get_text_vector(text):
+class SearchService:
+    """
+    Memegang satu SearchIndex aktif. Index baru dibangun di luar lock lalu ditukar
+    sekaligus, jadi pembaca selalu melihat index lama yang utuh atau index baru yang utuh.
+    """
+    def __init__(self, index=None):
+        self._index = index
+        self._lock = threading.Lock()
+
+    @property
+    def index(self):
+        return self._index
+
+    def swap(self, index):
+        """Mengganti index aktif, mengembalikan index lama."""
+        with self._lock:
+            old, self._index = self._index, index
+        return old
+
+    def reload(self, **build_kwargs):
+        """Membangun index baru (lambat, tanpa lock) lalu menukarnya."""
+        return self.swap(build_index(**build_kwargs))
+
+    def search(self, query_tokens, special_intent, region_filter):
+        index = self._index # Ambil referensi sekali agar konsisten selama 1 query
+        if index is None: return []
+
+        final_results = index.search(query_tokens, special_intent, region_filter)
+            
+        # Logging
+        if special_intent != 'ALL':
+            try:
+                query_str = " ".join(query_tokens)
+                utils.log_pencarian_csv(query_str, query_tokens, intent="search", region=region_filter or "all")
+            except: pass
+
+        return final_results
+
+# Service bawaan untuk kode lama yang memanggil fungsi tingkat modul
+DEFAULT_SERVICE = SearchService()
+
+# ======================================================================
+# 4. FUNGSI INISIALISASI & PENCARIAN (KOMPATIBEL DENGAN KODE LAMA)
+# ======================================================================
+def initialize_mesin():
+    """Memuat Model AI, Corpus, dan Metadata ke DEFAULT_SERVICE."""
+    DEFAULT_SERVICE.reload()
+    return DEFAULT_SERVICE.index
+
+def _get_text_vector(text, wv):
     """Mengubah teks menjadi vektor matematika (Rata-rata vektor kata)."""
-    if MODEL_W2V is None: return np.zeros(100)
+    if wv is None: return np.zeros(100)
     
     # Gunakan preprocessing yang sama
     # Jika input berupa list token, pakai langsung. Jika string, split dulu.
@@ -74,99 +247,97 @@ def _get_text_vector(text):
     else:
         tokens = preprocessing.full_preprocessing(str(text))
     
-    if not tokens: return np.zeros(MODEL_W2V.vector_size)
+    if not tokens: return np.zeros(wv.vector_size)
     
     # Ambil vektor tiap kata
-    vectors = [MODEL_W2V.wv[word] for word in tokens if word in MODEL_W2V.wv]
+    vectors = [wv[word] for word in tokens if word in wv]
     
     if vectors:
         return np.mean(vectors, axis=0) # Rata-rata vektor
     else:
-        return np.zeros(MODEL_W2V.vector_size)
+        return np.zeros(wv.vector_size)
 
 # Wrapper agar kompatibel dengan kode lama yang memanggil 'analyze_full_query'
 def analyze_full_query(query_text):
     """Sama seperti lama: deteksi intent & region."""
-    query_after_intent, special_intent = preprocessing.detect_intent(query_text)
-    final_vsm_text, region_filter = preprocessing.detect_region_and_filter_query(query_after_intent)
+    final_vsm_text, special_intent, region_filter = preprocessing.analyze_query(query_text)
     vsm_tokens = preprocessing.full_preprocessing(final_vsm_text)
     return vsm_tokens, special_intent, region_filter
 
-# ======================================================================
-# 4. FUNGSI PENCARIAN UTAMA
-# ======================================================================
 def search_by_keyword(query_tokens, special_intent, region_filter):
     """
     Fungsi Utama. Menerima token, mengembalikan rekomendasi format UI.
     """
-    # --- JALUR 1: REKOMENDASI UMUM (INTENT 'ALL') ---
-    if special_intent == 'ALL':
-        return _get_all_places(region_filter)
+    return DEFAULT_SERVICE.search(query_tokens, special_intent, region_filter)
 
-    # --- JALUR 2: PENCARIAN DEEP LEARNING (VECTOR SEARCH) ---
-    if MODEL_W2V is None or DF_CORPUS is None:
-        return []
+# ======================================================================
+# 5. HELPER: FORMATTING OUTPUT
+# ======================================================================
+def _placeholder_photo(name):
+    """URL gambar pengganti jika tempat tidak punya foto."""
+    safe_name = urllib.parse.quote(str(name))
+    return f"https://placehold.co/400x200/2E8B57/FFFFFF?text={safe_name}&font=poppins"
 
-    # 1. Ubah Query jadi Vektor
-    # Gabungkan tokens kembali jadi string karena kita butuh konteks (opsional)
-    query_vector = _get_text_vector(query_tokens)
-    
-    if np.all(query_vector == 0): return [] # Kata tidak dikenali AI
+def _compile_metadata(df_meta):
+    """
+    Mengubah DataFrame metadata menjadi dict record siap tampil (sekali saat init).
+    Hasil: (MappingProxy {nama: record}, tuple urutan nama).
+    """
+    if df_meta is None or df_meta.empty:
+        return MappingProxyType({}), ()
 
-    # 2. Hitung Kemiripan (Cosine Similarity)
-    # Bandingkan 1 vektor query vs Ribuan vektor dokumen
-    similarities = cosine_similarity([query_vector], DOC_VECTORS)[0]
-    
-    # 3. Ranking & Formatting
-    candidates = []
-    
-    for idx, score_sim in enumerate(similarities):
-        # Threshold: Hanya ambil yang agak mirip (> 0.1)
-        if score_sim > 0.1:
-            row = DF_CORPUS.iloc[idx]
-            
-            # Filter Region (Kabupaten)
-            if region_filter and region_filter not in str(row['Lokasi']).lower():
-                continue
+    records = {}
+    order = []
+    for row in df_meta.reset_index().to_dict('records'):
+        name = row.get('Nama_Tempat')
+        if name in records: continue # Sama seperti drop_duplicates (ambil yang pertama)
 
-            # Skor Gabungan (AI + Rating)
-            # Normalisasi Rating 0-5 menjadi 0-1
-            rating_norm = float(row['Rating']) / 5.0
-            final_score = (score_sim * BOBOT_AI) + (rating_norm * BOBOT_RATING)
-            
-            candidates.append({
-                'name': row['Nama_Tempat'],
-                'location': row['Lokasi'],
-                'avg_rating': float(row['Rating']),
-                'top_vsm_score': float(final_score), # Kita pakai nama 'vsm_score' biar frontend gak error
-                'ai_score': float(score_sim),        # Info tambahan debug
-                'snippet': str(row['Teks_Mentah'])[:100] + "..."
-            })
-    
-    # 4. Urutkan Ranking
-    candidates = sorted(candidates, key=lambda x: x['top_vsm_score'], reverse=True)
-    
-    # 5. Grouping (Ambil Metadata Lengkap)
-    final_results = _enrich_with_metadata(candidates)
-    
-    # Sorting Tambahan jika User minta
-    if special_intent == 'RATING_TOP':
-        final_results.sort(key=lambda x: x['avg_rating'], reverse=True)
-    elif special_intent == 'RATING_BOTTOM':
-        final_results.sort(key=lambda x: x['avg_rating'], reverse=False)
-        
-    # Logging
-    try:
-        query_str = " ".join(query_tokens)
-        utils.log_pencarian_csv(query_str, intent="search", region=region_filter or "all")
-    except: pass
+        photo_url = row.get('Photo_URL', '')
+        if not isinstance(photo_url, str) or not photo_url:
+            photo_url = _placeholder_photo(name)
 
-    return final_results
+        price_items = row.get('Price_Items', [])
+        # Cek jika price masih string / NaN (kadang terjadi)
+        if not isinstance(price_items, list): price_items = []
 
-# ======================================================================
-# 5. HELPER: FORMATTING OUTPUT
-# ======================================================================
-def _enrich_with_metadata(candidates):
+        gmaps_link = row.get('Gmaps_Link', '')
+        facilities = row.get('Facilities', '')
+        waktu_buka = row.get('Waktu_Buka', 'Info tidak tersedia')
+
+        records[name] = MappingProxyType({
+            'location': row.get('Lokasi', ''),
+            'location_lower': str(row.get('Lokasi', '')).lower(),
+            'avg_rating': row.get('Avg_Rating', 0.0),
+            'photo_url': photo_url,
+            'gmaps_link': gmaps_link if isinstance(gmaps_link, str) else '',
+            'facilities': facilities if isinstance(facilities, str) else '',
+            'price_items': tuple(price_items),
+            'waktu_buka': waktu_buka if isinstance(waktu_buka, str) else 'Info tidak tersedia',
+        })
+        order.append(name)
+
+    return MappingProxyType(records), tuple(order)
+
+def _display_fields(index, name):
+    """Field tampilan (foto, harga, fasilitas) untuk satu tempat. O(1)."""
+    rec = index.place_records.get(name)
+    if rec is None:
+        return {
+            'photo_url': _placeholder_photo(name),
+            'gmaps_link': "",
+            'facilities': "",
+            'price_items': [],
+            'waktu_buka': "Info tidak tersedia",
+        }
+    return {
+        'photo_url': rec['photo_url'],
+        'gmaps_link': rec['gmaps_link'],
+        'facilities': rec['facilities'],
+        'price_items': list(rec['price_items']),
+        'waktu_buka': rec['waktu_buka'],
+    }
+
+def _enrich_with_metadata(index, candidates):
     """Menggabungkan hasil pencarian dengan Foto, Harga, Fasilitas."""
     unique_results = []
     seen_places = set()
@@ -175,40 +346,7 @@ def _enrich_with_metadata(candidates):
         name = item['name']
         if name in seen_places: continue
         
-        # Ambil Metadata
-        meta_row = None
-        if not DF_METADATA.empty and name in DF_METADATA.index:
-            meta_row = DF_METADATA.loc[name]
-        
-        # Siapkan Data Tampilan
-        photo_url = ""
-        gmaps_link = ""
-        facilities = ""
-        price_items = []
-        waktu_buka = "Info tidak tersedia"
-        
-        if meta_row is not None:
-            photo_url = meta_row.get('Photo_URL', '')
-            gmaps_link = meta_row.get('Gmaps_Link', '')
-            facilities = meta_row.get('Facilities', '')
-            price_items = meta_row.get('Price_Items', [])
-            waktu_buka = meta_row.get('Waktu_Buka', 'Info tidak tersedia')
-            
-            # Cek jika price masih string (kadang terjadi)
-            if isinstance(price_items, str): price_items = []
-        
-        # Fallback Image
-        if not photo_url or pd.isna(photo_url):
-            safe_name = urllib.parse.quote(name)
-            photo_url = f"https://placehold.co/400x200/2E8B57/FFFFFF?text={safe_name}&font=poppins"
-            
-        item.update({
-            'photo_url': photo_url,
-            'gmaps_link': gmaps_link,
-            'facilities': facilities,
-            'price_items': price_items,
-            'waktu_buka': waktu_buka
-        })
+        item.update(_display_fields(index, name))
         
         unique_results.append(item)
         seen_places.add(name)
@@ -217,23 +355,30 @@ def _enrich_with_metadata(candidates):
         
     return unique_results
 
-def _get_all_places(region_filter):
+def _get_all_places(index, region_filter):
     """Mengembalikan semua tempat (Logika 'Lihat Semua')."""
-    if DF_METADATA.empty: return []
+    if not index.place_records: return []
     
-    df_show = DF_METADATA.reset_index().drop_duplicates(subset='Nama_Tempat')
+    key = region_filter or ""
+    cached = index._all_places_cache.get(key)
+    if cached is None:
+        # Format agar sama dengan output search (dibangun sekali per region)
+        results = []
+        for name in index.all_places_order:
+            rec = index.place_records[name]
+            if region_filter and region_filter not in rec['location_lower']:
+                continue
+            item = {
+                'name': name,
+                'location': rec['location'],
+                'avg_rating': rec['avg_rating'],
+                'top_vsm_score': 0.0,
+            }
+            item.update(_display_fields(index, name))
+            results.append(item)
+            if len(results) >= 20: break # Batasi 20 hasil (sama seperti enrich)
+        cached = tuple(MappingProxyType(r) for r in results)
+        index._all_places_cache[key] = cached
     
-    if region_filter:
-        df_show = df_show[df_show['Lokasi'].str.lower().str.contains(region_filter, na=False)]
-        
-    # Format agar sama dengan output search
-    results = []
-    for _, row in df_show.iterrows():
-        results.append({
-            'name': row['Nama_Tempat'],
-            'location': row['Lokasi'],
-            'avg_rating': row['Avg_Rating'],
-            'top_vsm_score': 0.0,
-        })
-        
-    return _enrich_with_metadata(results)
\ No newline at end of file
+    # Salinan dangkal agar pemanggil bebas mengubah/mengurutkan hasil
+    return [dict(r, price_items=list(r['price_items'])) for r in cached]
@@ -1,5 +1,10 @@
 import re
 import os
+import json
+import atexit
+import hashlib
+import itertools
+import multiprocessing
 import pandas as pd
 from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
 from . import utils 
@@ -49,10 +54,92 @@ try:
     stemmer = factory.create_stemmer()
 except:
     # Dummy jika Sastrawi error (jarang terjadi)
+    factory = None
     class Dummy: 
         def stem(self, t): return t
     stemmer = Dummy()
 
+# ======================================================================
+# 2b. CACHE STEMMING (MEMORI + DISK)
+# ======================================================================
+# Stemming Sastrawi adalah langkah paling lambat, padahal kosakata ulasan sangat berulang.
+# Level 1: dict di memori (dibatasi STEM_CACHE_MAX). Level 2: tabel kata->stem di Assets/
+# yang dimuat saat import dan ditulis ulang jika ada kata baru.
+STEM_CACHE_PATH = os.path.join(utils.BASE_DIR, 'Assets', 'stem_cache.json')
+STEM_CACHE_MAX = 200_000
+STEM_CACHE_FORMAT = 1 # Naikkan jika aturan preprocessing sebelum stemming berubah
+
+def _stemmer_version():
+    """Sidik jari stemmer: versi Sastrawi + hash kamus kata dasar."""
+    if factory is None: return "dummy"
+    try:
+        from importlib.metadata import version
+        lib_version = version('Sastrawi')
+    except Exception:
+        lib_version = "unknown"
+    try:
+        words = factory.get_words()
+        dict_hash = hashlib.md5("\n".join(sorted(words)).encode('utf-8')).hexdigest()[:12]
+    except Exception:
+        dict_hash = "nodict"
+    return f"{STEM_CACHE_FORMAT}:{lib_version}:{dict_hash}"
+
+STEMMER_VERSION = _stemmer_version()
+STEM_CACHE = {}
+_stem_cache_dirty = False
+_new_stems = None # Diisi dict di worker preprocess_many agar stem baru bisa dikirim ke proses utama
+
+def load_stem_cache(path=STEM_CACHE_PATH):
+    """Memuat tabel stem dari disk. Diabaikan jika versi stemmer berbeda."""
+    global _stem_cache_dirty
+    try:
+        if not os.path.exists(path): return 0
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != STEMMER_VERSION:
+            print("⚠️ Cache stem kadaluarsa (stemmer/kamus berubah). Dibangun ulang.")
+            _stem_cache_dirty = True
+            return 0
+        stems = data.get('stems', {})
+        for word, stem in list(stems.items())[:STEM_CACHE_MAX]:
+            STEM_CACHE[word] = stem
+        return len(STEM_CACHE)
+    except Exception as e:
+        print(f"⚠️ Gagal memuat cache stem: {e}")
+        return 0
+
+def save_stem_cache(path=STEM_CACHE_PATH):
+    """Menulis cache stem ke disk (atomic) hanya jika ada kata baru."""
+    global _stem_cache_dirty
+    if not _stem_cache_dirty: return False
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': STEMMER_VERSION, 'stems': STEM_CACHE}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        _stem_cache_dirty = False
+        return True
+    except Exception as e:
+        print(f"⚠️ Gagal menyimpan cache stem: {e}")
+        return False
+
+def stem_cached(word):
+    """stemmer.stem() dengan memoization."""
+    global _stem_cache_dirty
+    stem = STEM_CACHE.get(word)
+    if stem is None:
+        stem = stemmer.stem(word)
+        if len(STEM_CACHE) >= STEM_CACHE_MAX:
+            STEM_CACHE.pop(next(iter(STEM_CACHE))) # Buang entri tertua (FIFO)
+        STEM_CACHE[word] = stem
+        _stem_cache_dirty = True
+        if _new_stems is not None: _new_stems[word] = stem
+    return stem
+
+load_stem_cache()
+atexit.register(save_stem_cache)
+
 # Muat Kamus Mapping
 print("--- Memuat Kamus Mapping ---")
 PHRASE_MAP = utils.load_map_from_csv('config_phrase_map.csv')
@@ -71,6 +158,37 @@ else:
 def replace_phrase(match):
     return PHRASE_MAP[match.group(0)]
 
+# --- OPTIMALISASI: Pre-compile Regex untuk Intent & Region ---
+# Dibangun sekali saat import (bukan diurutkan ulang tiap query). Batas kata memakai
+# lookaround agar "yk" tidak cocok di dalam kata lain & key bertitik ("kab. semarang") aman.
+def _compile_matcher(keys):
+    keys = sorted({k for k in keys if k}, key=len, reverse=True)
+    if not keys: return None
+    return re.compile(r'(?<!\w)(' + '|'.join(map(re.escape, keys)) + r')(?!\w)')
+
+INTENT_LOOKUP = {k.lower(): v for k, v in INTENT_MAP.items() if k}
+REGION_LOOKUP = {k.lower(): v for k, v in REGION_MAP.items() if k}
+INTENT_PATTERN = _compile_matcher(INTENT_LOOKUP)
+REGION_PATTERN = _compile_matcher(REGION_LOOKUP)
+QUERY_PATTERN = _compile_matcher(list(INTENT_LOOKUP) + list(REGION_LOOKUP))
+
+def _longest(matches):
+    """Ambil teks match terpanjang (seri: yang paling kiri)."""
+    best = None
+    for m in matches:
+        if best is None or len(m.group(0)) > len(best): best = m.group(0)
+    return best
+
+def _remove_phrase(query, matches, phrase):
+    """Hapus semua kemunculan phrase (berdasarkan posisi match yang sudah ada)."""
+    parts, last = [], 0
+    for m in matches:
+        if m.group(0) == phrase:
+            parts.append(query[last:m.start()])
+            last = m.end()
+    parts.append(query[last:])
+    return "".join(parts)
+
 # ======================================================================
 # 3. FUNGSI PREPROCESSING UTAMA
 # ======================================================================
@@ -102,7 +220,7 @@ def full_preprocessing(text):
         if t not in STOPWORDS and len(t) > 1:
             # Stemming kita AKTIFKAN KEMBALI agar data latih lebih padat
             # "makanan" -> "makan", "berkemah" -> "kemah"
-            stemmed_word = stemmer.stem(t)
+            stemmed_word = stem_cached(t)
             
             # Cek lagi panjang kata setelah distem (kadang jadi kpendekan)
             if len(stemmed_word) > 1:
@@ -110,35 +228,103 @@ def full_preprocessing(text):
             
     return final_tokens
 
+# ======================================================================
+# 3b. PREPROCESSING PARALEL (BATCH)
+# ======================================================================
+def _init_worker():
+    """Initializer worker: regex & stemmer sudah siap saat modul ini di-import."""
+    global _new_stems
+    _new_stems = {}
+
+def _preprocess_chunk(chunk):
+    """Memproses satu potongan teks di worker. Mengembalikan (hasil, stem_baru)."""
+    results = [full_preprocessing(text) for text in chunk]
+    new_stems = dict(_new_stems)
+    _new_stems.clear()
+    return results, new_stems
+
+def _chunked(iterable, size):
+    it = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk: return
+        yield chunk
+
+def preprocess_many(texts, workers=None, chunksize=256):
+    """
+    Versi batch dari full_preprocessing untuk banyak teks sekaligus.
+    - Potongan (chunk) teks dikirim ke process pool, tiap worker hanya sekali
+      menyiapkan regex & stemmer.
+    - Urutan hasil sama dengan urutan input.
+    - Berupa generator: hasil bisa dipakai sedikit demi sedikit.
+    - Input kecil (kurang dari workers * chunksize teks) diproses serial: biaya start
+      pool jauh lebih mahal, dan tidak ada fork di proses server (Streamlit).
+    Stem baru dari worker digabung ke STEM_CACHE proses utama.
+    """
+    global _stem_cache_dirty
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+
+    it = iter(texts)
+    head = list(itertools.islice(it, workers * chunksize)) if workers > 1 else []
+    if workers <= 1 or len(head) < workers * chunksize:
+        for text in itertools.chain(head, it):
+            yield full_preprocessing(text)
+        return
+
+    with multiprocessing.Pool(processes=workers, initializer=_init_worker) as pool:
+        for results, new_stems in pool.imap(_preprocess_chunk, _chunked(itertools.chain(head, it), chunksize)):
+            for word, stem in new_stems.items():
+                if word not in STEM_CACHE and len(STEM_CACHE) < STEM_CACHE_MAX:
+                    STEM_CACHE[word] = stem
+                    _stem_cache_dirty = True
+            yield from results
+
 # ======================================================================
 # 4. FUNGSI DETEKSI INTENT & REGION
 # ======================================================================
 
+def analyze_query(query):
+    """
+    Satu kali scan: deteksi intent + region sekaligus.
+    Mengembalikan (query_bersih, intent, region). Frase intent dihapus dari query,
+    nama wilayah dibiarkan (sama seperti detect_intent + detect_region_and_filter_query).
+    """
+    query = query.lower()
+    if QUERY_PATTERN is None: return query, None, None
+
+    matches = list(QUERY_PATTERN.finditer(query))
+    intent_phrase = _longest(m for m in matches if m.group(0) in INTENT_LOOKUP)
+    region_term = _longest(m for m in matches if m.group(0) in REGION_LOOKUP and m.group(0) != intent_phrase)
+
+    detected_intent = INTENT_LOOKUP.get(intent_phrase) if intent_phrase else None
+    detected_region = REGION_LOOKUP.get(region_term) if region_term else None
+    if intent_phrase:
+        query = _remove_phrase(query, matches, intent_phrase)
+    return query, detected_intent, detected_region
+
 def detect_intent(query):
     query = query.lower()
     detected_intent = None
+    if INTENT_PATTERN is None: return query, detected_intent
     
-    # Urutkan key terpanjang dulu
-    sorted_intents = sorted(INTENT_MAP.items(), key=lambda x: len(x[0]), reverse=True)
-    
-    for phrase, code in sorted_intents:
-        if phrase in query:
-            detected_intent = code
-            query = query.replace(phrase, "")
-            break
+    # Key terpanjang yang muncul di query
+    matches = list(INTENT_PATTERN.finditer(query))
+    phrase = _longest(matches)
+    if phrase:
+        detected_intent = INTENT_LOOKUP[phrase]
+        query = _remove_phrase(query, matches, phrase)
     return query, detected_intent
 
 def detect_region_and_filter_query(query):
     query_lower = query.lower()
     detected_region = None
+    if REGION_PATTERN is None: return query_lower, detected_region
     
-    # Urutkan key terpanjang dulu
-    sorted_regions = sorted(REGION_MAP.items(), key=lambda x: len(x[0]), reverse=True)
-    
-    for term, region_code in sorted_regions:
-        if term in query_lower:
-            detected_region = region_code
-            # Opsional: hapus nama kota dari query agar bersih
-            # query_lower = query_lower.replace(term, "") 
-            break
-    return query_lower, detected_region
\ No newline at end of file
+    # Key terpanjang yang muncul di query
+    term = _longest(REGION_PATTERN.finditer(query_lower))
+    if term:
+        detected_region = REGION_LOOKUP[term]
+        # Opsional: hapus nama kota dari query agar bersih
+        # query_lower = query_lower.replace(term, "") 
+    return query_lower, detected_region
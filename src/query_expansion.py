@@ -0,0 +1,122 @@
+import os
+import numpy as np
+
+# ======================================================================
+# KONFIGURASI
+# ======================================================================
+NEIGHBOUR_K = 10          # Tetangga yang disimpan per kata saat training
+EXPANSION_TOPN = 3        # Tetangga yang dipakai per kata query
+EXPANSION_WEIGHT = 0.5    # Bobot kata tetangga relatif terhadap kata asli (1.0)
+EXPANSION_MIN_SIM = 0.6   # Tetangga dengan kemiripan di bawah ini diabaikan
+TABLE_FORMAT = 1          # Naikkan jika struktur file tabel berubah
+
+def neighbours_path_for(model_path):
+    """ Lokasi tabel tetangga pasangan sebuah model (.model / .kv). """
+    return os.path.splitext(model_path)[0] + '.neighbours.npz'
+
+# ======================================================================
+# MEMBANGUN TABEL (SAAT TRAINING)
+# ======================================================================
+def build_neighbour_table(wv, k=NEIGHBOUR_K, block=1024):
+    """
+    Menghitung top-k tetangga (cosine) untuk SETIAP kata di vocabulary.
+    Hasil: (ids int32 [V, k], sims float16 [V, k]), urut dari yang paling mirip.
+    Dihitung per blok baris agar memori tidak sampai V x V.
+    """
+    vectors = np.asarray(wv.vectors, dtype=np.float32)
+    n = len(vectors)
+    k = max(0, min(k, n - 1))
+    ids = np.zeros((n, k), dtype=np.int32)
+    sims = np.zeros((n, k), dtype=np.float16)
+    if k == 0: return ids, sims
+
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    unit = vectors / norms
+
+    for start in range(0, n, block):
+        scores = unit[start:start + block] @ unit.T
+        rows = np.arange(len(scores))
+        scores[rows, rows + start] = -np.inf # Kata tidak boleh jadi tetangga dirinya sendiri
+
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        ids[start:start + len(rows)] = np.take_along_axis(top, order, axis=1)
+        sims[start:start + len(rows)] = np.take_along_axis(top_scores, order, axis=1)
+
+    return ids, sims
+
+def save_neighbour_table(path, ids, sims):
+    """Menyimpan tabel (tmp -> rename) agar pembaca tidak pernah melihat file setengah jadi."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, ids=ids, sims=sims, format=np.int32(TABLE_FORMAT))
+    os.replace(tmp_path, path)
+
+# ======================================================================
+# EKSPANSI QUERY (SAAT PENCARIAN)
+# ======================================================================
+class QueryExpander:
+    """
+    Ekspansi kata query dari tabel tetangga yang sudah dihitung saat training.
+    Tiap kata cukup 1 lookup index + potong baris tabel (O(k)), tanpa scan vocabulary
+    seperti wv.most_similar(). Bobot bisa diubah lewat atribut topn/weight/min_sim.
+    """
+    def __init__(self, wv, ids, sims, topn=EXPANSION_TOPN, weight=EXPANSION_WEIGHT, min_sim=EXPANSION_MIN_SIM):
+        self.wv = wv
+        self.ids = ids
+        self.sims = sims
+        self.topn = topn
+        self.weight = weight
+        self.min_sim = min_sim
+
+    def neighbours(self, word, topn=None):
+        """Daftar (kata, kemiripan) tetangga terdekat sebuah kata."""
+        idx = self.wv.key_to_index.get(word)
+        if idx is None: return []
+        topn = self.ids.shape[1] if topn is None else topn
+        return [(self.wv.index_to_key[j], float(s))
+                for j, s in zip(self.ids[idx, :topn], self.sims[idx, :topn])]
+
+    def expand(self, tokens):
+        """
+        Mengembalikan list (kata, bobot): kata asli berbobot 1.0, tetangga berbobot
+        weight * kemiripan. Kata yang muncul dua kali memakai bobot terbesar.
+        """
+        weights = {}
+        for token in tokens:
+            if token in self.wv.key_to_index:
+                weights[token] = 1.0
+        if self.weight > 0 and self.topn > 0:
+            for token in list(weights):
+                for word, sim in self.neighbours(token, self.topn):
+                    if sim < self.min_sim: break # Tabel sudah urut menurun
+                    weights[word] = max(weights.get(word, 0.0), self.weight * sim)
+        return list(weights.items())
+
+    def vector(self, tokens):
+        """Rata-rata berbobot vektor kata query + tetangganya."""
+        expanded = self.expand(tokens)
+        if not expanded: return np.zeros(self.wv.vector_size)
+        words, weights = zip(*expanded)
+        return np.average(np.vstack([self.wv[w] for w in words]), axis=0, weights=weights)
+
+def load_expander(wv, model_path, **kwargs):
+    """Memuat tabel tetangga milik model. None jika belum ada / tidak cocok dengan vocabulary."""
+    if wv is None: return None
+    path = neighbours_path_for(model_path)
+    if not os.path.exists(path): return None
+    try:
+        with np.load(path) as data:
+            if int(data['format']) != TABLE_FORMAT:
+                print("⚠️ Format tabel tetangga lama, ekspansi query dimatikan (jalankan train_w2v.py).")
+                return None
+            ids, sims = data['ids'], data['sims']
+    except Exception as e:
+        print(f"⚠️ Gagal memuat tabel tetangga: {e}")
+        return None
+    if len(ids) != len(wv.index_to_key):
+        print("⚠️ Tabel tetangga tidak cocok dengan vocabulary model, ekspansi query dimatikan.")
+        return None
+    return QueryExpander(wv, ids, sims, **kwargs)
@@ -1,8 +1,9 @@
 import pandas as pd
 import os
-import joblib
+import json
 import streamlit as st
 from datetime import datetime
+from .log_writer import BackgroundLogWriter, DailyCsvLogSink, read_latest_rows
 
 # ==============================================================================
 # KONFIGURASI PATH
@@ -10,28 +11,148 @@ from datetime import datetime
 SRC_DIR = os.path.dirname(os.path.abspath(__file__))
 BASE_DIR = os.path.dirname(SRC_DIR)
 
-# Path untuk Log CSV
-LOG_FILE_PATH = os.path.join(BASE_DIR, 'Riwayat', 'riwayat_pencarian.csv')
+# Path untuk Log CSV (satu file per hari: riwayat_pencarian_YYYY-MM-DD.csv)
+LOG_DIR = os.path.join(BASE_DIR, 'Riwayat')
+LOG_PREFIX = 'riwayat_pencarian'
+LOG_FILE_PATH = os.path.join(LOG_DIR, 'riwayat_pencarian.csv') # File tunggal lama (sebelum partisi), tetap dibaca
 # Kita kembalikan kolom 'tokens' agar sesuai dengan format lama
 LOG_COLS = ['timestamp', 'query_mentah', 'tokens', 'intent_terdeteksi', 'region_terdeteksi']
 
 # ==============================================================================
 # FUNGSI PEMUAT ASET
 # ==============================================================================
-def load_metadata():
-    """ Memuat Metadata (df_metadata.pkl) untuk UI. """
-    assets_dir = os.path.join(BASE_DIR, 'Assets')
-    metadata_path = os.path.join(assets_dir, 'df_metadata.pkl')
-    
+# Metadata tempat: Arrow IPC (Feather v2) tanpa kompresi agar bisa di-mmap
+METADATA_PATH = os.path.join(BASE_DIR, 'Assets', 'df_metadata.arrow')
+LEGACY_METADATA_PATH = os.path.join(BASE_DIR, 'Assets', 'df_metadata.pkl')
+METADATA_SCHEMA_VERSION = 1 # Naikkan jika kolom/tipe berubah (build_metadata.py akan build ulang)
+
+def metadata_schema():
+    """ Skema kolom metadata. Price_Items disimpan sebagai list<struct> (bukan string/pickle). """
+    import pyarrow as pa
+    price_item = pa.struct([('item', pa.string()), ('harga', pa.int64()), ('kategori', pa.string())])
+    return pa.schema([
+        ('Nama_Tempat', pa.string()),
+        ('Lokasi', pa.string()),
+        ('Avg_Rating', pa.float64()),
+        ('Photo_URL', pa.string()),
+        ('Gmaps_Link', pa.string()),
+        ('Facilities', pa.string()),
+        ('Price_Items', pa.list_(price_item)),
+        ('Waktu_Buka', pa.string()),
+    ], metadata={'schema_version': str(METADATA_SCHEMA_VERSION)})
+
+def save_metadata(df_meta, path=METADATA_PATH):
+    """ Menyimpan metadata (index = Nama_Tempat) sebagai file Arrow. Tulis ke .tmp lalu rename. """
+    import pyarrow as pa
+    schema = metadata_schema()
+    df = df_meta.reset_index()[schema.names]
+    table = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+
+    tmp_path = path + ".tmp"
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+def read_metadata_schema_version(path=METADATA_PATH):
+    """ Versi skema yang tercatat di file (None jika file tidak ada / tidak terbaca). """
+    import pyarrow as pa
     try:
-        if os.path.exists(metadata_path):
-            return joblib.load(metadata_path)
-        else:
+        with pa.memory_map(path, 'r') as source:
+            meta = pa.ipc.open_file(source).schema.metadata or {}
+        return int(meta.get(b'schema_version', 0))
+    except Exception:
+        return None
+
+def load_metadata(path=METADATA_PATH):
+    """ Memuat Metadata tempat untuk UI (di-mmap, kolom numerik tanpa salin). """
+    try:
+        if not os.path.exists(path):
+            if os.path.exists(LEGACY_METADATA_PATH):
+                # File lama dari versi sebelumnya; jalankan build_metadata.py untuk format baru
+                import joblib
+                print("⚠️ Memakai df_metadata.pkl lama. Jalankan 'python build_metadata.py'.")
+                return joblib.load(LEGACY_METADATA_PATH)
             return pd.DataFrame()
+
+        import pyarrow as pa
+        with pa.memory_map(path, 'r') as source:
+            table = pa.ipc.open_file(source).read_all()
+
+        version = int((table.schema.metadata or {}).get(b'schema_version', 0))
+        if version != METADATA_SCHEMA_VERSION:
+            print(f"❌ Skema metadata v{version} tidak didukung (butuh v{METADATA_SCHEMA_VERSION}). "
+                  "Jalankan 'python build_metadata.py --force'.")
+            return pd.DataFrame()
+
+        # list<struct> -> list of dict (format yang dipakai UI); kolom lain lewat to_pandas
+        price_items = table.column('Price_Items').to_pylist()
+        df = table.drop_columns(['Price_Items']).to_pandas()
+        df['Price_Items'] = [items or [] for items in price_items]
+        return df.set_index('Nama_Tempat')
     except Exception as e:
         print(f"❌ ERROR saat memuat metadata: {e}")
         return pd.DataFrame()
 
+def kv_path_for(model_path):
+    """ Lokasi artefak KeyedVectors (.kv) pasangan sebuah file model (.model). """
+    return os.path.splitext(model_path)[0] + '.kv'
+
+ACTIVE_MODEL_PATH = os.path.join(BASE_DIR, 'Assets', 'word2vec.model')
+MODELS_MANIFEST_PATH = os.path.join(BASE_DIR, 'Assets', 'models', 'manifest.json')
+
+def current_kv_path():
+    """
+    Artefak .kv versi model aktif menurut manifest (train_w2v.py). File per versi tidak pernah
+    ditimpa & manifest diganti atomik, jadi pembaca tidak pernah melihat .kv dan .npy yang campur.
+    """
+    try:
+        with open(MODELS_MANIFEST_PATH, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        entry = next(v for v in manifest['versions'] if v['version'] == manifest['current'])
+        path = kv_path_for(os.path.join(os.path.dirname(MODELS_MANIFEST_PATH), entry['file']))
+        return path if os.path.exists(path) else None
+    except Exception:
+        return None
+
+def _load_kv_checked(kv_path):
+    """KeyedVectors.load mmap + cek vocabulary cocok dengan ukuran matriks vektor."""
+    from gensim.models import KeyedVectors
+    wv = KeyedVectors.load(kv_path, mmap='r')
+    if len(wv.index_to_key) != wv.vectors.shape[0]:
+        raise ValueError(f"{os.path.basename(kv_path)}: {len(wv.index_to_key)} kata vs {wv.vectors.shape[0]} vektor")
+    return wv
+
+def load_word_vectors(model_path=None):
+    """
+    Memuat vektor kata untuk pencarian.
+    Prioritas: artefak KeyedVectors (.kv + .npy) di-mmap read-only, sehingga banyak
+    proses berbagi satu salinan di page cache. Untuk model aktif, .kv versi dari manifest
+    dipakai lebih dulu (aman saat train_w2v.py sedang publish). Fallback: Word2Vec.load(...).wv lengkap.
+    """
+    from gensim.models import Word2Vec
+
+    if model_path is None:
+        model_path = ACTIVE_MODEL_PATH
+    kv_path = model_path if model_path.endswith('.kv') else kv_path_for(model_path)
+    candidates = [kv_path]
+    if os.path.abspath(kv_path) == os.path.abspath(kv_path_for(ACTIVE_MODEL_PATH)):
+        candidates.insert(0, current_kv_path())
+
+    for path in candidates:
+        if not path or not os.path.exists(path): continue
+        try:
+            return _load_kv_checked(path)
+        except Exception as e:
+            print(f"⚠️ Artefak .kv tidak bisa dipakai ({e}), mencoba sumber berikutnya.")
+    try:
+        if os.path.exists(model_path):
+            print("⚠️ Artefak .kv belum ada, memuat model Word2Vec lengkap (jalankan train_w2v.py).")
+            return Word2Vec.load(model_path).wv
+    except Exception as e:
+        print(f"❌ ERROR saat memuat vektor kata: {e}")
+    return None
+
 def load_map_from_csv(filename):
     """ Memuat file CSV Kamus. """
     filepath = os.path.join(BASE_DIR, 'Kamus', filename)
@@ -52,13 +173,22 @@ def load_map_from_csv(filename):
 # FUNGSI LOGGING (PERBAIKAN COMPATIBILITY)
 # ==============================================================================
 
+# Penulis CSV latar belakang (dibuat saat log pertama)
+_csv_log_writer = None
+
+def get_csv_log_writer():
+    global _csv_log_writer
+    if _csv_log_writer is None:
+        _csv_log_writer = BackgroundLogWriter(DailyCsvLogSink(LOG_DIR, LOG_PREFIX, LOG_COLS), name="csv-log-writer")
+    return _csv_log_writer
+
 def log_pencarian_csv(query, tokens, intent, region):
     """
     Mencatat riwayat ke CSV.
     DIPERBAIKI: Menerima 4 argumen (query, tokens, intent, region) agar tidak crash.
+    Baris hanya dimasukkan ke antrean; penulisan ke file dilakukan per batch di thread lain.
     """
     try:
-        os.makedirs(os.path.dirname(LOG_FILE_PATH), exist_ok=True)
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         
         # Ubah list tokens jadi string agar bisa disimpan di CSV
@@ -67,30 +197,16 @@ def log_pencarian_csv(query, tokens, intent, region):
         else:
             tokens_str = str(tokens)
         
-        # Simpan data lengkap
-        data_baru = pd.DataFrame(
-            [[timestamp, query, tokens_str, str(intent), str(region)]], 
-            columns=LOG_COLS
-        )
-        
-        file_exists = os.path.exists(LOG_FILE_PATH)
-        
-        data_baru.to_csv(
-            LOG_FILE_PATH, 
-            mode='a', 
-            header=not file_exists, 
-            index=False
-        )
+        get_csv_log_writer().submit((timestamp, query, tokens_str, str(intent), str(region)))
     except Exception as e:
         print(f"⚠️ GAGAL mencatat riwayat ke CSV: {e}")
 
 def baca_riwayat_csv(limit=50):
-    """ Membaca log untuk Admin Dashboard """
+    """ Membaca log terbaru untuk Admin Dashboard (dari ekor partisi terbaru, terbaru dulu) """
     try:
-        if not os.path.exists(LOG_FILE_PATH):
-            return pd.DataFrame(columns=LOG_COLS)
-        df = pd.read_csv(LOG_FILE_PATH)
-        return df.iloc[::-1].head(limit)
+        if _csv_log_writer is not None: _csv_log_writer.flush() # Tampilkan juga log yang masih antre
+        rows = read_latest_rows(LOG_DIR, LOG_PREFIX, limit, legacy_path=LOG_FILE_PATH)
+        return pd.DataFrame([r[:len(LOG_COLS)] for r in rows], columns=LOG_COLS)
     except:
         return pd.DataFrame(columns=LOG_COLS)
 
@@ -4,6 +4,9 @@ import base64
 import os
 import urllib.parse
 import time
+import uuid
+import hashlib
+import sqlite3
 from datetime import datetime
 
 # --- 1. CONFIG & UTILS ---
@@ -18,6 +21,15 @@ def get_img_as_base64(file):
 def format_rp(angka): 
     return f"Rp {int(angka):,}".replace(",", ".")
 
+def set_booking_status(bids, status):
+    """Ubah status pesanan (admin). Database sibuk setelah semua retry -> pesan error, halaman tidak crash."""
+    try:
+        db.update_booking_status_many(bids, status)
+    except sqlite3.OperationalError as e:
+        st.error(f"Gagal memperbarui pesanan (database sibuk), silakan coba lagi. ({e})")
+        return
+    st.rerun()
+
 def create_ticket_html(ticket_data, username):
     """HTML E-Ticket Generator"""
     html = f"""
@@ -49,14 +61,21 @@ def create_ticket_html(ticket_data, username):
 
 # --- 2. LOAD RESOURCES ---
 try:
-    from Asisten.db_handler import db
+    from Asisten.db_handler import db, ADMIN_PAGE_SIZE
     from Asisten.smart_search import SmartSearchEngine
 except ImportError: 
     st.error("Gagal memuat modul Asisten. Pastikan folder Asisten ada.")
     st.stop()
 
+# Backend pencarian: 'smart' (Word2Vec, default) | 'fts' (FTS5 bm25, hemat RAM & startup instan)
+SEARCH_BACKEND = os.environ.get('CARIKEMAH_SEARCH', 'smart').lower()
+
 @st.cache_resource
-def init_engine(): return SmartSearchEngine()
+def init_engine():
+    if SEARCH_BACKEND == 'fts':
+        from Asisten.fts_search import FtsSearchEngine
+        return FtsSearchEngine()
+    return SmartSearchEngine()
 engine = init_engine()
 
 # --- 3. SESSION STATE ---
@@ -65,6 +84,7 @@ if 'show_login' not in st.session_state: st.session_state.show_login = False
 if 'query_input' not in st.session_state: st.session_state.query_input = ""
 if 'page' not in st.session_state: st.session_state.page = "home"
 if 'last_logged' not in st.session_state: st.session_state.last_logged = ""
+if 'adm_pages' not in st.session_state: st.session_state.adm_pages = [None] # Kursor keyset halaman pesanan admin
 
 # --- ASSETS ---
 bg_img = get_img_as_base64("tent-night-wide.jpg") if os.path.exists("tent-night-wide.jpg") else ""
@@ -193,8 +213,22 @@ def show_details(row, detail, sc_data):
             
             if st.button("✅ Konfirmasi Booking", type="primary", use_container_width=True):
                 tid = detail['info'].get('id') or db.get_place_by_name(row['Nama Tempat'])
-                if db.add_booking(st.session_state.user['id'], tid, str(dt), qt, tot):
-                    st.success("🎉 Berhasil! Cek Tiket Saya."); time.sleep(2); st.rerun()
+                # Kunci idempotensi: nonce tetap selama dialog terbuka (diganti di open_details),
+                # jadi klik ganda / submit ulang dengan isian sama -> tetap 1 pesanan
+                nonce = st.session_state.setdefault('booking_nonce', uuid.uuid4().hex)
+                idem = hashlib.sha256(f"{nonce}|{st.session_state.user['id']}|{tid}|{dt}|{qt}|{sel}".encode()).hexdigest()
+                done = st.session_state.get('booking_done')
+                bid = done[1] if done and done[0] == idem else db.add_booking(st.session_state.user['id'], tid, str(dt), qt, tot, idempotency_key=idem)
+                if bid:
+                    st.session_state.booking_done = (idem, bid)
+                    st.success(f"🎉 Berhasil! Pesanan #{bid} tersimpan, cek Tiket Saya."); time.sleep(2); st.rerun()
+                else: st.error("Gagal menyimpan pesanan, silakan coba lagi.")
+
+def open_details(row, detail, sc_data):
+    """Buka dialog detail dengan kunci idempotensi booking baru (berlaku selama dialog ini terbuka)."""
+    st.session_state.booking_nonce = uuid.uuid4().hex
+    st.session_state.booking_done = None
+    show_details(row, detail, sc_data)
 
 # --- 5. MAIN LOGIC ---
 render_navbar()
@@ -253,9 +287,13 @@ if st.session_state.page == "home":
         
         if res.empty: st.warning("Tidak ditemukan.")
         else:
-            for i, row in res.iterrows():
-                pid = db.get_place_by_name(row['Nama Tempat'])
-                det = db.get_place_details(pid)
+            # Hasil engine sudah membawa id tempat; lookup nama hanya untuk hasil lama
+            pids = [int(row['ID Tempat']) if 'ID Tempat' in row else db.get_place_by_name(row['Nama Tempat'])
+                    for _, row in res.iterrows()]
+            # Detail semua kartu diambil sekaligus (3 query), bukan 3 query per kartu
+            details = db.get_places_details_many(pids)
+            for (i, row), pid in zip(res.iterrows(), pids):
+                det = details.get(pid, {'info': {}, 'harga': [], 'fasilitas': []})
                 inf = det['info']
                 
                 with st.container(border=True):
@@ -274,7 +312,7 @@ if st.session_state.page == "home":
                         if det['harga']: mp = min([int(x['harga']) for x in det['harga']])
                         st.markdown(f"<div class='card-price-label'>Mulai</div><div class='card-price-value'>{format_rp(mp)}</div>", unsafe_allow_html=True)
                         st.write("")
-                        if st.button("Pilih", key=f"b_{i}", type="primary", use_container_width=True): show_details(row, det, {})
+                        if st.button("Pilih", key=f"b_{i}", type="primary", use_container_width=True): open_details(row, det, {})
     else:
         # --- LANDING PAGE: KATEGORI CEPAT (FITUR BARU) ---
         st.markdown("<br><br>", unsafe_allow_html=True)
@@ -295,16 +333,17 @@ if st.session_state.page == "home":
         
         # --- REKOMENDASI POPULER ---
         st.write(""); st.subheader("🔥 Destinasi Terpopuler")
-        conn = db.get_connection()
+        conn = db.connection() # Koneksi awet milik thread ini (tidak di-close)
         # Ambil 4 tempat dengan rating tertinggi yang memiliki foto (biar cantik)
         df_top = pd.read_sql_query("SELECT * FROM tempat WHERE photo_url != '' ORDER BY rating_gmaps DESC LIMIT 4", conn)
         # Jika kosong, ambil apa adanya
         if df_top.empty:
             df_top = pd.read_sql_query("SELECT * FROM tempat ORDER BY rating_gmaps DESC LIMIT 4", conn)
-        conn.close()
         
+        details_top = db.get_places_details_many(df_top['id'].tolist())
         cols = st.columns(4)
         for i, row in df_top.iterrows():
+            det = details_top.get(int(row['id']), {'info': {}, 'harga': [], 'fasilitas': []})
             with cols[i]:
                 with st.container(border=True):
                     img = row['photo_url'] or f"https://placehold.co/400x300/2ecc71/ffffff?text={urllib.parse.quote(row['nama'][:10])}"
@@ -315,24 +354,16 @@ if st.session_state.page == "home":
                     
                     # Harga Preview
                     sp = "Rp 15.000"
-                    conn2 = db.get_connection()
                     try:
-                        # Coba ambil harga terendah dari tabel harga
-                        min_p = conn2.execute("SELECT MIN(harga) FROM harga WHERE tempat_id=?", (row['id'],)).fetchone()[0]
-                        if min_p and min_p > 0: sp = f"Rp {min_p:,}".replace(",", ".")
-                        else:
-                            # Fallback ke JSON jika tabel kosong
-                            import json
-                            hl = json.loads(row['harga_json']) if row['harga_json'] else []
-                            if hl: sp = f"Rp {min([int(x['harga']) for x in hl]):,}".replace(",", ".")
+                        # Harga terendah dari detail batch (tabel harga, fallback JSON sudah di db_handler)
+                        min_p = min([int(x['harga']) for x in det['harga']]) if det['harga'] else 0
+                        if min_p > 0: sp = f"Rp {min_p:,}".replace(",", ".")
                     except: pass
-                    conn2.close()
                     
                     st.markdown(f"<div style='color:#e67e22; font-weight:bold'>{sp}</div>", unsafe_allow_html=True)
                     if st.button("Detail", key=f"d_{row['id']}", use_container_width=True):
-                        det = db.get_place_details(row['id'])
                         dummy = {'Nama Tempat': row['nama'], 'Isi Ulasan': "Destinasi populer.", 'Lokasi': row['lokasi']}
-                        show_details(dummy, det, {})
+                        open_details(dummy, det, {})
 
 # === PAGE: TIKET ===
 elif st.session_state.page == "tickets":
@@ -391,32 +422,66 @@ elif st.session_state.page == "admin":
                     },
                     use_container_width=True
                 )
-                
-                st.write("")
-                st.subheader("📈 Tren Pencarian")
+            else: st.info("Belum ada data pencarian.")
+        except Exception as e: st.error(f"Error load history: {e}")
+
+        # TREN PENCARIAN: dibaca dari tabel rollup (riwayat baru dimasukkan dulu, inkremental)
+        st.write("")
+        st.subheader("📈 Tren Pencarian")
+        try:
+            db.refresh_search_analytics()
+            gran = st.radio("Per", ["hari", "jam"], horizontal=True, key="adm_gran")
+            trend = db.get_search_trend(gran, limit=30 if gran == "hari" else 48)
+            if trend.empty: st.info("Belum ada data analitik.")
+            else:
+                since = trend['periode'].iloc[0]
+                trend = trend.set_index('periode')
                 col_chart1, col_chart2 = st.columns(2)
                 with col_chart1:
-                    st.caption("Frekuensi Kata Kunci")
-                    if 'jumlah_hasil' in df_hist.columns:
-                        st.bar_chart(df_hist.set_index('query_user')['jumlah_hasil'])
+                    st.caption("Jumlah Pencarian")
+                    st.bar_chart(trend['jumlah'])
                 with col_chart2:
+                    st.caption("Latensi p50 / p95 (detik)")
+                    st.line_chart(trend[['durasi_p50', 'durasi_p95']])
+                col_chart3, col_chart4 = st.columns(2)
+                with col_chart3:
+                    st.caption("Frekuensi Kata Kunci")
+                    df_q = db.get_search_breakdown('query', gran, since)
+                    if not df_q.empty: st.bar_chart(df_q.set_index('nilai')['jumlah'])
+                with col_chart4:
                     st.caption("Sebaran Region")
-                    if 'region' in df_hist.columns and not df_hist['region'].isna().all():
-                        region_counts = df_hist['region'].value_counts()
-                        st.bar_chart(region_counts)
-                        
-            else: st.info("Belum ada data pencarian.")
-        except Exception as e: st.error(f"Error load history: {e}")
+                    df_r = db.get_search_breakdown('region', gran, since)
+                    if not df_r.empty: st.bar_chart(df_r.set_index('nilai')['jumlah'])
+                col_chart5, col_chart6 = st.columns(2)
+                with col_chart5:
+                    st.caption("Sebaran Intent")
+                    df_i = db.get_search_breakdown('intent', gran, since)
+                    if not df_i.empty: st.bar_chart(df_i.set_index('nilai')['jumlah'])
+                with col_chart6:
+                    st.caption("Pencarian Tanpa Hasil (%)")
+                    st.line_chart(trend['nol_hasil_pct'])
+        except Exception as e: st.error(f"Error load analitik: {e}")
 
         st.divider()
-        df = db.get_all_bookings_admin()
+        # Ringkasan dari tabel booking_summary (tidak membaca semua pesanan)
+        summary = db.get_booking_summary()
         c1, c2, c3 = st.columns(3)
-        with c1: st.metric("Total Pesanan", len(df))
-        with c2: st.metric("Pendapatan", format_rp(df[df['status']=='CONFIRMED']['total_harga'].sum()))
-        with c3: st.metric("Perlu Konfirmasi", len(df[df['status']=='PENDING']))
+        with c1: st.metric("Total Pesanan", summary['total'])
+        with c2: st.metric("Pendapatan", format_rp(summary['pendapatan']))
+        with c3: st.metric("Perlu Konfirmasi", summary['pending'])
         
         st.divider()
         st.subheader("Daftar Pesanan Masuk")
+        f_status = st.selectbox("Status", ["Semua", "PENDING", "CONFIRMED", "REJECTED", "CANCELLED"], key="adm_status",
+                                on_change=lambda: st.session_state.update(adm_pages=[None]))
+        # Satu halaman per render (keyset: id < id terkecil halaman sebelumnya)
+        df = db.get_bookings_admin_page(before_id=st.session_state.adm_pages[-1],
+                                        status=None if f_status == "Semua" else f_status)
+        if df.empty: st.info("Belum ada pesanan.")
+        pending_ids = df.loc[df['status'] == 'PENDING', 'id'].tolist() if not df.empty else []
+        if pending_ids and st.button(f"✅ Terima {len(pending_ids)} pesanan PENDING di halaman ini", key="acc_all"):
+            # Satu transaksi untuk semua pesanan
+            set_booking_status(pending_ids, 'CONFIRMED')
         for i, r in df.iterrows():
             with st.container(border=True):
                 c1, c2, c3, c4 = st.columns([0.5, 2, 1, 1.5])
@@ -429,12 +494,21 @@ elif st.session_state.page == "admin":
                     if r['status'] == 'PENDING':
                         ca, cb = st.columns(2)
                         with ca:
-                            if st.button("✅", key=f"acc_{i}", type="primary"): db.update_booking_status(r['id'], 'CONFIRMED'); st.rerun()
+                            if st.button("✅", key=f"acc_{r['id']}", type="primary"): set_booking_status([r['id']], 'CONFIRMED')
                         with cb:
-                            if st.button("❌", key=f"rej_{i}"): db.update_booking_status(r['id'], 'REJECTED'); st.rerun()
+                            if st.button("❌", key=f"rej_{r['id']}"): set_booking_status([r['id']], 'REJECTED')
                     else:
                         color = "green" if r['status']=='CONFIRMED' else "red"
                         st.markdown(f"<span style='color:{color}; font-weight:bold'>{r['status']}</span>", unsafe_allow_html=True)
+
+        p_prev, p_info, p_next = st.columns([1, 2, 1])
+        with p_prev:
+            if len(st.session_state.adm_pages) > 1 and st.button("⬅️ Sebelumnya", use_container_width=True):
+                st.session_state.adm_pages.pop(); st.rerun()
+        with p_info: st.caption(f"Halaman {len(st.session_state.adm_pages)}")
+        with p_next:
+            if len(df) >= ADMIN_PAGE_SIZE and st.button("Berikutnya ➡️", use_container_width=True):
+                st.session_state.adm_pages.append(int(df['id'].min())); st.rerun()
     else:
         st.error("Akses Ditolak."); st.button("Kembali", on_click=lambda: st.session_state.update(page="home"))
 
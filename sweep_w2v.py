@@ -0,0 +1,139 @@
+import os
+import time
+import shutil
+import argparse
+import itertools
+import tempfile
+import multiprocessing
+import pandas as pd
+from gensim.models import Word2Vec
+from src.corpus_stream import ReviewCorpus, TOKEN_CACHE_PATH
+
+# ================= KONFIGURASI =================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULT_PATH = os.path.join(BASE_DIR, 'Documents', 'sweep_w2v_results.csv')
+TRAIN_SOURCE = 'csv'
+
+# Grid hyperparameter yang diuji (kombinasi penuh)
+GRID = {
+    'vector_size': [10, 50, 100],
+    'window': [3, 5],
+    'min_count': [2, 5],
+    'epochs': [20, 50],
+}
+
+def build_configs(grid=GRID):
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+# ================= METRIK =================
+def _token_recall(reference, candidate):
+    """Porsi kata referensi yang muncul di ulasan hasil (mirip ROUGE-1 recall, tanpa library)."""
+    ref = set(reference.lower().split())
+    cand = set(str(candidate).lower().split())
+    return len(ref & cand) / len(ref) if ref else 0.0
+
+def _f1_ground_truth(df_res, keywords):
+    """Rumus P/R/F1 yang sama dengan advanced_evaluation.py."""
+    retrieved = df_res['Nama Tempat'].tolist() if not df_res.empty else []
+    tp = sum(1 for r in retrieved if any(k.lower() in r.lower() for k in keywords))
+    precision = tp / len(retrieved) if retrieved else 0
+    recall = tp / 3
+    return 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0
+
+# ================= WORKER =================
+def _run_config(job):
+    """Dijalankan di proses worker: latih 1 konfigurasi lalu evaluasi dengan batched search."""
+    config_id, config, cache_path, out_dir, threads = job
+
+    # Import di worker agar proses utama tidak memuat DB/engine
+    from advanced_evaluation import GROUND_TRUTH
+    from evaluation import TEST_CASES
+    from cek_akurasi import TEST_QUERIES
+    from Asisten.smart_search import SmartSearchEngine
+
+    # 1. Training (corpus ter-token dibaca dari cache bersama, tidak di-preprocess ulang)
+    sentences = ReviewCorpus(source=TRAIN_SOURCE, cache_path=cache_path, workers=1)
+    start = time.time()
+    model = Word2Vec(vector_size=config['vector_size'], window=config['window'],
+                     min_count=config['min_count'], workers=threads, sg=1, epochs=config['epochs'])
+    model.build_vocab(sentences)
+    model.train(sentences, total_examples=model.corpus_count, epochs=config['epochs'])
+    train_sec = time.time() - start
+
+    kv_path = os.path.join(out_dir, f"sweep_{config_id:03d}.kv")
+    model.wv.save(kv_path, separately=['vectors'])
+    model_mb = sum(os.path.getsize(p) for p in (kv_path, kv_path + ".vectors.npy")) / (1024 * 1024)
+    vocab = len(model.wv.index_to_key)
+    del model
+
+    # 2. Evaluasi (semua query sekaligus lewat search_many)
+    engine = SmartSearchEngine(model_path=kv_path)
+    gt_queries = list(GROUND_TRUTH)
+    case_queries = [c['query'] for c in TEST_CASES]
+    queries = gt_queries + case_queries + list(TEST_QUERIES)
+
+    start = time.time()
+    results = engine.search_many(queries, top_k=5)
+    latency_ms = (time.time() - start) * 1000 / len(queries)
+
+    gt_results = results[:len(gt_queries)]
+    case_results = results[len(gt_queries):len(gt_queries) + len(case_queries)]
+    f1 = sum(_f1_ground_truth(df, GROUND_TRUTH[q]) for q, (df, _) in zip(gt_queries, gt_results)) / len(gt_queries)
+    overlap = sum(_token_recall(c['reference'], df.iloc[0]['Isi Ulasan'] if not df.empty else "")
+                  for c, (df, _) in zip(TEST_CASES, case_results)) / len(TEST_CASES)
+
+    return dict(config_id=config_id, **config, vocab=vocab, train_sec=round(train_sec, 2),
+                model_mb=round(model_mb, 3), latency_ms=round(latency_ms, 2),
+                f1=round(f1, 3), overlap=round(overlap, 3))
+
+# ================= MAIN =================
+def run_sweep(processes=None, min_f1=None):
+    print("\n" + "="*60)
+    print("🧪 SWEEP HYPERPARAMETER WORD2VEC (BIAYA vs KUALITAS)")
+    print("="*60)
+
+    configs = build_configs()
+    processes = processes or max(1, multiprocessing.cpu_count() // 2)
+    threads = max(1, multiprocessing.cpu_count() // processes)
+
+    # 1. Pre-tokenisasi SEKALI (menulis cache token yang dibaca semua worker)
+    print("🧹 Menyiapkan corpus ter-token bersama...")
+    n_sentences = sum(1 for _ in ReviewCorpus(source=TRAIN_SOURCE, cache_path=TOKEN_CACHE_PATH))
+    print(f"   ✅ {n_sentences} kalimat siap.")
+
+    # 2. Latih & evaluasi semua konfigurasi secara paralel
+    print(f"🚀 {len(configs)} konfigurasi | {processes} proses x {threads} thread gensim")
+    out_dir = tempfile.mkdtemp(prefix="sweep_w2v_")
+    jobs = [(i, cfg, TOKEN_CACHE_PATH, out_dir, threads) for i, cfg in enumerate(configs, 1)]
+    rows = []
+    try:
+        with multiprocessing.Pool(processes=processes) as pool:
+            for row in pool.imap_unordered(_run_config, jobs):
+                rows.append(row)
+                print(f"   [{len(rows)}/{len(configs)}] #{row['config_id']:03d} selesai: F1={row['f1']} | {row['train_sec']}s")
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+    # 3. Laporan
+    df = pd.DataFrame(rows).sort_values(['f1', 'train_sec'], ascending=[False, True])
+    df.to_csv(RESULT_PATH, index=False)
+    print("\n" + df.to_string(index=False))
+    print(f"\n💾 Hasil disimpan di: {RESULT_PATH}")
+
+    if min_f1 is not None:
+        lolos = df[df['f1'] >= min_f1]
+        if lolos.empty:
+            print(f"⚠️ Tidak ada konfigurasi dengan F1 >= {min_f1}.")
+        else:
+            best = lolos.sort_values(['train_sec', 'model_mb', 'latency_ms']).iloc[0]
+            print(f"🏆 Model termurah dengan F1 >= {min_f1}: #{int(best['config_id']):03d} "
+                  f"(vector_size={best['vector_size']}, window={best['window']}, "
+                  f"min_count={best['min_count']}, epochs={best['epochs']})")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep hyperparameter Word2Vec")
+    parser.add_argument('--processes', type=int, default=None, help="Jumlah proses worker paralel")
+    parser.add_argument('--min-f1', type=float, default=None, help="Ambang kualitas untuk memilih model termurah")
+    args = parser.parse_args()
+    run_sweep(processes=args.processes, min_f1=args.min_f1)
@@ -1,12 +1,14 @@
-import pandas as pd
 import os
-import joblib
 import multiprocessing
 import json
-import ast # Library untuk baca string list "[...]" dengan aman
+import time
+import shutil
+import argparse
 import logging
+from datetime import datetime
 from gensim.models import Word2Vec
-from src.preprocessing import full_preprocessing
+from src.corpus_stream import ReviewCorpus
+from src import query_expansion
 
 # ================= KONFIGURASI =================
 logging.basicConfig(format='%(asctime)s : %(levelname)s : %(message)s', level=logging.INFO)
@@ -15,41 +17,104 @@ DOCS_DIR = os.path.join(BASE_DIR, 'Documents')
 ASSETS_DIR = os.path.join(BASE_DIR, 'Assets')
 
 CORPUS_PATH = os.path.join(DOCS_DIR, 'corpus_master.csv')
-INFO_PATH = os.path.join(DOCS_DIR, 'info_tempat.csv') # <--- File Foto/Harga
+TRAIN_SOURCE = 'csv' # 'csv' = corpus_master.csv | 'db' = tabel ulasan di camping.db
 
-def parse_price_safe(price_str):
-    """Mengubah string "[{'item':...}]" menjadi List Python asli."""
+# Model aktif (dibaca mesin pencari) + arsip versi & manifest-nya
+MODEL_PATH = os.path.join(ASSETS_DIR, 'word2vec.model')
+KV_PATH = os.path.join(ASSETS_DIR, 'word2vec.kv') # Vektor saja (+ .npy) untuk dibaca dengan mmap
+MODELS_DIR = os.path.join(ASSETS_DIR, 'models')
+MANIFEST_PATH = os.path.join(MODELS_DIR, 'manifest.json')
+
+TRAIN_EPOCHS = 50        # Epoch training penuh
+INCREMENTAL_EPOCHS = 10  # Epoch default untuk update inkremental
+
+# ================= EKSPOR KEYEDVECTORS =================
+def export_keyed_vectors(model, kv_path):
+    """
+    Ekspor model.wv saja (tanpa state training) dengan matriks vektor sebagai .npy terpisah,
+    agar pembaca bisa membukanya dengan mmap='r'. Ditulis ke file sementara lalu di-rename.
+    Pasangan .kv/.npy tidak bisa diganti atomik bersama: pembaca model aktif memakai .kv
+    versi lewat manifest (utils.current_kv_path), salinan di Assets hanya fallback yang dicek ukurannya.
+    """
+    tmp_path = kv_path + ".tmp"
+    model.wv.save(tmp_path, separately=['vectors'])
+    # Rename (bukan tulis ulang) agar proses yang sedang mmap file lama tetap memegang salinan lamanya.
+    # .kv diganti terakhir: selama jeda, .kv lama + .npy baru ditolak oleh cek ukuran di load_word_vectors.
+    os.replace(tmp_path + ".vectors.npy", kv_path + ".vectors.npy")
+    os.replace(tmp_path, kv_path)
+
+# ================= MANIFEST & VERSI MODEL =================
+def load_manifest():
+    """Membaca manifest versi model. Kosong jika belum pernah training versioned."""
     try:
-        if pd.isna(price_str) or price_str == "":
-            return []
-        # Jika sudah berupa list, kembalikan
-        if isinstance(price_str, list):
-            return price_str
-        # Parsing string menjadi struktur data (list/dict)
-        return ast.literal_eval(str(price_str))
-    except:
-        return []
-
-def train_model():
-    print("\n" + "="*60)
-    print("🚀 MEMULAI TRAINING MODEL & INTEGRASI DATA")
-    print("="*60)
+        if os.path.exists(MANIFEST_PATH):
+            with open(MANIFEST_PATH, 'r', encoding='utf-8') as f:
+                return json.load(f)
+    except Exception as e:
+        print(f"⚠️ Manifest rusak, diabaikan: {e}")
+    return {"current": None, "versions": []}
 
-    # 1. LOAD CORPUS (ULASAN)
-    if not os.path.exists(CORPUS_PATH):
-        print(f"❌ Error: Corpus tidak ditemukan di {CORPUS_PATH}")
-        return
+def publish_model(model, mode, watermark, marker, epochs, wall_time, parent=None):
+    """Menyimpan model sebagai versi baru, menjadikannya model aktif & mencatat di manifest."""
+    manifest = load_manifest()
+    version = len(manifest['versions']) + 1
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    filename = f"word2vec_v{version:03d}_{mode}_{stamp}.model"
 
-    print("📖 Membaca Ulasan (Corpus)...")
-    df_corpus = pd.read_csv(CORPUS_PATH)
-    df_corpus['Teks_Mentah'] = df_corpus['Teks_Mentah'].fillna('')
-    
-    # 2. TRAINING AI (Word2Vec)
-    print("🧹 Preprocessing Teks...")
-    tokenized_sentences = df_corpus['Teks_Mentah'].apply(full_preprocessing).tolist()
-    tokenized_sentences = [s for s in tokenized_sentences if len(s) > 0]
+    os.makedirs(MODELS_DIR, exist_ok=True)
+    versioned_path = os.path.join(MODELS_DIR, filename)
+    model.save(versioned_path)
+
+    # Model aktif tetap di Assets/word2vec.model agar pembaca lama tidak perlu diubah
+    for src in [versioned_path] + [versioned_path + ext for ext in ('.wv.vectors.npy', '.syn1neg.npy')]:
+        if os.path.exists(src):
+            shutil.copyfile(src, MODEL_PATH + src[len(versioned_path):])
+
+    # Artefak ringan untuk proses pencari (Streamlit, CLI, evaluasi)
+    export_keyed_vectors(model, os.path.splitext(versioned_path)[0] + '.kv')
+    export_keyed_vectors(model, KV_PATH)
+
+    # Tabel tetangga (top-k per kata) untuk ekspansi query O(k) saat pencarian
+    print(f"🔗 Menghitung {query_expansion.NEIGHBOUR_K} tetangga terdekat untuk tiap kata...")
+    ids, sims = query_expansion.build_neighbour_table(model.wv)
+    query_expansion.save_neighbour_table(query_expansion.neighbours_path_for(versioned_path), ids, sims)
+    query_expansion.save_neighbour_table(query_expansion.neighbours_path_for(MODEL_PATH), ids, sims)
+
+    entry = {
+        "version": version,
+        "file": filename,
+        "mode": mode,
+        "parent": parent,
+        "source": TRAIN_SOURCE,
+        "watermark": int(watermark),
+        "marker": marker, # Jumlah + sidik ulasan terakhir <= watermark (deteksi penomoran ulang id)
+        "corpus_count": int(model.corpus_count),
+        "vocab_size": len(model.wv.index_to_key),
+        "epochs": int(epochs),
+        "wall_time_sec": round(wall_time, 2),
+        "created_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    manifest['versions'].append(entry)
+    manifest['current'] = version
+
+    tmp_path = MANIFEST_PATH + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, MANIFEST_PATH)
+    print(f"✅ Model AI disimpan sebagai versi v{version:03d} ({mode}).")
+    return entry
+
+# ================= TRAINING =================
+def train_full():
+    """Training dari nol: vocabulary baru + seluruh corpus."""
+    # Corpus di-stream per chunk & di-token secara lazy (cache token ditulis di iterasi pertama),
+    # jadi memori tidak ikut membesar bersama jumlah ulasan.
+    print(f"📖 Streaming Ulasan (Corpus) dari sumber '{TRAIN_SOURCE}'...")
+    sentences = ReviewCorpus(source=TRAIN_SOURCE)
+    watermark = sentences.max_id()
+    marker = sentences.marker(watermark)
     
-    print(f"🧠 Melatih AI dengan {len(tokenized_sentences)} kalimat...")
+    start = time.time()
     model = Word2Vec(
         vector_size=10,      # KECILKAN: Dari 100 ke 10. Agar dia fokus ke inti makna saja.
         window=3,            # PERSEMPIT: Dari 5 ke 3. Agar dia fokus ke kata tetangga terdekat.
@@ -58,70 +123,69 @@ def train_model():
         sg=1, 
         epochs=200           # TINGKATKAN: Dari 50 ke 200. Suruh dia baca berulang-ulang sampai paham.
     )
-    model.build_vocab(tokenized_sentences)
-    model.train(tokenized_sentences, total_examples=model.corpus_count, epochs=50)
-    
-    os.makedirs(ASSETS_DIR, exist_ok=True)
-    model.save(os.path.join(ASSETS_DIR, "word2vec.model"))
-    print("✅ Model AI disimpan.")
-
-    # ==========================================================
-    # 3. MEMBANGUN METADATA (GABUNGAN AI + INFO MANUAL)
-    # ==========================================================
-    print("\n📦 Menggabungkan Data Foto & Harga...")
+    print("🧹 Preprocessing Teks & Membangun Kosakata...")
+    model.build_vocab(sentences)
+    print(f"🧠 Melatih AI dengan {model.corpus_count} kalimat...")
+    model.train(sentences, total_examples=model.corpus_count, epochs=TRAIN_EPOCHS)
     
-    # A. Hitung Rating Rata-rata dari Corpus
-    avg_ratings = df_corpus.groupby('Nama_Tempat')['Rating'].mean().reset_index()
-    avg_ratings.rename(columns={'Rating': 'Avg_Rating'}, inplace=True)
-    
-    # B. Ambil Lokasi (Baris pertama per tempat)
-    df_locations = df_corpus.drop_duplicates(subset='Nama_Tempat')[['Nama_Tempat', 'Lokasi']]
+    return publish_model(model, 'full', watermark, marker, TRAIN_EPOCHS, time.time() - start)
+
+def train_incremental(epochs=INCREMENTAL_EPOCHS):
+    """
+    Update model aktif hanya dengan ulasan baru (setelah watermark training terakhir).
+    Jatuh ke training penuh jika belum ada manifest / model dasar.
+    """
+    manifest = load_manifest()
+    base = next((v for v in manifest['versions'] if v['version'] == manifest['current']), None)
+    if base is None or base.get('source') != TRAIN_SOURCE or not os.path.exists(os.path.join(MODELS_DIR, base['file'])):
+        print("⚠️ Belum ada model dasar yang cocok di manifest. Menjalankan training penuh...")
+        return train_full()
+
+    new_sentences = ReviewCorpus(source=TRAIN_SOURCE, min_id=base['watermark'], cache_path=None)
+    # Watermark berupa id: hanya sah jika ulasan <= watermark masih persis sama (tidak dinomori ulang)
+    if base.get('marker') != new_sentences.marker(base['watermark']):
+        print(f"⚠️ Isi corpus s.d. watermark {base['watermark']} berubah (id dinomori ulang / database di-reset). Menjalankan training penuh...")
+        return train_full()
+
+    watermark = new_sentences.max_id()
+    if watermark <= base['watermark']:
+        print(f"ℹ️ Tidak ada ulasan baru sejak v{base['version']:03d} (watermark {base['watermark']}).")
+        return base
+
+    start = time.time()
+    print(f"📖 Memuat model dasar v{base['version']:03d}...")
+    model = Word2Vec.load(os.path.join(MODELS_DIR, base['file']))
     
-    # C. Gabungkan (Base Metadata)
-    df_meta_final = df_locations.merge(avg_ratings, on='Nama_Tempat', how='left')
+    print(f"🧹 Menambah kosakata dari ulasan baru (ID > {base['watermark']})...")
+    model.build_vocab(new_sentences, update=True)
+    print(f"🧠 Melanjutkan training dengan {model.corpus_count} kalimat baru ({epochs} epoch)...")
+    model.train(new_sentences, total_examples=model.corpus_count, epochs=epochs)
     
-    # D. INTEGRASI FILE INFO_TEMPAT.CSV (FOTO & HARGA)
-    if os.path.exists(INFO_PATH):
-        print("   📂 Ditemukan file 'info_tempat.csv', membaca data...")
-        df_info = pd.read_csv(INFO_PATH)
-        
-        # Pastikan kolom kunci (Nama_Tempat) bertipe string & bersih
-        df_info['Nama_Tempat'] = df_info['Nama_Tempat'].str.strip()
-        df_meta_final['Nama_Tempat'] = df_meta_final['Nama_Tempat'].str.strip()
-        
-        # Gabungkan (Merge)
-        # Kita gunakan Left Join: Semua tempat di Corpus tetap ada, 
-        # kalau di Info ada datanya, kita ambil.
-        df_meta_final = df_meta_final.merge(
-            df_info[['Nama_Tempat', 'Photo_URL', 'Gmaps_Link', 'Facilities', 'Price_Items', 'Waktu_Buka']], 
-            on='Nama_Tempat', 
-            how='left'
-        )
-        
-        # E. Parsing Kolom Harga (PENTING!)
-        if 'Price_Items' in df_meta_final.columns:
-            df_meta_final['Price_Items'] = df_meta_final['Price_Items'].apply(parse_price_safe)
-            
-        print(f"   ✅ Berhasil menggabungkan info untuk {len(df_info)} tempat.")
-        
+    return publish_model(model, 'incremental', watermark, new_sentences.marker(watermark), epochs,
+                         time.time() - start, parent=base['version'])
+
+def train_model(mode='full', epochs=None):
+    print("\n" + "="*60)
+    print("🚀 MEMULAI TRAINING MODEL")
+    print("="*60)
+
+    # 1. LOAD CORPUS (ULASAN)
+    if TRAIN_SOURCE == 'csv' and not os.path.exists(CORPUS_PATH):
+        print(f"❌ Error: Corpus tidak ditemukan di {CORPUS_PATH}")
+        return
+
+    # 2. TRAINING AI (Word2Vec)
+    if mode == 'incremental':
+        train_incremental(epochs or INCREMENTAL_EPOCHS)
     else:
-        print("⚠️ WARNING: 'info_tempat.csv' tidak ditemukan. Foto/Harga akan kosong.")
-        # Isi default jika file tidak ada
-        df_meta_final['Photo_URL'] = ""
-        df_meta_final['Price_Items'] = [[] for _ in range(len(df_meta_final))]
-        df_meta_final['Facilities'] = ""
-        df_meta_final['Waktu_Buka'] = "Info belum tersedia"
-
-    # Isi NaN (Kosong) dengan default
-    df_meta_final['Photo_URL'] = df_meta_final['Photo_URL'].fillna('https://via.placeholder.com/400x300?text=No+Image')
-    df_meta_final['Facilities'] = df_meta_final['Facilities'].fillna('Fasilitas standar')
-    df_meta_final['Waktu_Buka'] = df_meta_final['Waktu_Buka'].fillna('Cek Gmaps')
-    
-    # Simpan
-    df_meta_final.set_index('Nama_Tempat', inplace=True)
-    joblib.dump(df_meta_final, os.path.join(ASSETS_DIR, "df_metadata.pkl"))
-    
-    print("🎉 SELESAI! Metadata baru siap digunakan.")
+        train_full()
+
+    # Metadata (foto/harga/rating) kini tahap terpisah: python build_metadata.py
 
 if __name__ == "__main__":
-    train_model()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Training Word2Vec")
+    parser.add_argument('--mode', choices=['full', 'incremental'], default='full',
+                        help="full = latih ulang dari nol | incremental = lanjutkan model aktif dengan ulasan baru")
+    parser.add_argument('--epochs', type=int, default=None, help="Jumlah epoch untuk mode incremental")
+    args = parser.parse_args()
+    train_model(mode=args.mode, epochs=args.epochs)
\ No newline at end of file